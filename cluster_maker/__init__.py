@@ -26,18 +26,48 @@ from .preprocessing import select_features, standardise_features, apply_pca
 # --- Clustering algorithms ---
 from .algorithms import (
     kmeans,
+    kmeans_out_of_core,
+    kmeans_kdtree,
+    kmeans_batched,
+    bisecting_kmeans,
+    BisectingTree,
     sklearn_kmeans,
+    minibatch_kmeans,
+    MiniBatchKMeans,
     init_centroids,
+    save_centroids,
+    load_centroids,
     assign_clusters,
+    nearest_centroids,
     update_centroids,
+    summarise_clusters,
+    DEFAULT_MEMORY_BUDGET,
 )
 
+# --- Clustering summaries ---
+from .summary import ClusterStats, ClusterSummary
+
+# --- Approximate nearest-centroid search ---
+from .ann import IVFIndex, kmeans_ivf
+
+# --- Fitted models ---
+from .model import KMeansModel
+
+# --- Coresets ---
+from .coreset import build_coreset
+
 # --- Evaluation ---
 from .evaluation import (
     compute_inertia,
     silhouette_score_sklearn,
+    compute_silhouette,
     elbow_curve,
+    incremental_elbow_curve,
+    find_knee,
     compute_davies_bouldin,
+    compute_calinski_harabasz,
+    compute_dunn,
+    cluster_stats,
 )
 
 # --- Plotting ---
@@ -69,16 +99,48 @@ __all__ = [
 
     # Algorithms
     "kmeans",
+    "kmeans_out_of_core",
+    "kmeans_kdtree",
+    "kmeans_batched",
+    "bisecting_kmeans",
+    "BisectingTree",
     "sklearn_kmeans",
+    "minibatch_kmeans",
+    "MiniBatchKMeans",
     "init_centroids",
+    "save_centroids",
+    "load_centroids",
     "assign_clusters",
+    "nearest_centroids",
     "update_centroids",
+    "summarise_clusters",
+    "DEFAULT_MEMORY_BUDGET",
+
+    # Clustering summaries
+    "ClusterSummary",
+    "ClusterStats",
+
+    # Approximate search
+    "IVFIndex",
+    "kmeans_ivf",
+
+    # Fitted models
+    "KMeansModel",
+
+    # Coresets
+    "build_coreset",
 
     # Evaluation
     "compute_inertia",
     "silhouette_score_sklearn",
+    "compute_silhouette",
     "elbow_curve",
+    "incremental_elbow_curve",
+    "find_knee",
     "compute_davies_bouldin",
+    "compute_calinski_harabasz",
+    "compute_dunn",
+    "cluster_stats",
 
     # Plotting
     "plot_clusters_2d",
@@ -6,90 +6,2348 @@
 
 from __future__ import annotations
 
-from typing import Tuple, Optional
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional, Union
 
 import numpy as np
+from scipy import sparse
 from sklearn.cluster import KMeans
 
+from .shared import resolve, shared_input
+from .summary import ClusterStats, ClusterSummary
+
+# Default working-memory budget (in bytes) for blocked distance computations.
+DEFAULT_MEMORY_BUDGET = 64 * 1024 ** 2
+
+
+_INIT_METHODS = ("random", "k-means++", "k-means||")
+
+
+def _sample_rows(n_samples: int, k: int, rng: np.random.RandomState) -> np.ndarray:
+    """
+    k distinct row indices drawn uniformly at random.
+
+    Indices are drawn with ``rng.randint`` and duplicates are redrawn, so
+    unlike ``rng.choice(n_samples, k, replace=False)`` no permutation of all
+    n_samples indices is built. When k is more than half of n_samples the
+    output is about as large as such a permutation, which is then used.
+    """
+    if 2 * k > n_samples:
+        return rng.permutation(n_samples)[:k]
+    picked = np.empty(0, dtype=np.intp)
+    while picked.size < k:
+        picked = np.concatenate([picked, rng.randint(0, n_samples, size=k - picked.size)])
+        _, first = np.unique(picked, return_index=True)
+        picked = picked[np.sort(first)]
+    return picked
+
+
+def _seeding_blocks(X: np.ndarray, n_centres: int, memory_budget: int):
+    """
+    Row blocks of X sized for a distance pass against ``n_centres`` centres.
+    """
+    bytes_per_row = X.shape[1] * X.dtype.itemsize + 2 * max(1, n_centres) * 8
+    return _row_blocks(X.shape[0], bytes_per_row, memory_budget)
+
+
+def _blocked_min_sq(
+    X: np.ndarray,
+    centres: np.ndarray,
+    rows: slice,
+    sample_weight: Optional[np.ndarray],
+    memory_budget: int,
+) -> np.ndarray:
+    """
+    (Weighted) squared distance of the rows of one block to their closest centre.
+    """
+    _, min_sq = nearest_centroids(X[rows], centres, memory_budget=memory_budget)
+    if sample_weight is not None:
+        min_sq = min_sq * sample_weight[rows]
+    return min_sq
+
+
+def _draw_proportional_blocked(
+    X: np.ndarray,
+    centres: np.ndarray,
+    rng: np.random.RandomState,
+    sample_weight: Optional[np.ndarray],
+    memory_budget: int,
+) -> int:
+    """
+    Draw one row with probability proportional to its (weighted) squared
+    distance to the closest of ``centres``, in a single blocked pass.
+
+    Each block proposes one of its rows and replaces the current pick with
+    probability ``block total / running total``, so no per-sample vector
+    longer than one block is kept.
+    """
+    total = 0.0
+    pick = -1
+    for rows in _seeding_blocks(X, centres.shape[0], memory_budget):
+        score = _blocked_min_sq(X, centres, rows, sample_weight, memory_budget)
+        cumulative = np.cumsum(score)
+        block_total = float(cumulative[-1])
+        total += block_total
+        if block_total > 0 and rng.uniform() * total < block_total:
+            idx = np.searchsorted(cumulative, rng.uniform() * block_total, side="right")
+            pick = rows.start + min(int(idx), score.shape[0] - 1)
+    if pick < 0:
+        # Every sample already coincides with a centre
+        pick = rng.randint(0, X.shape[0])
+    return pick
+
+
+def _kmeans_plusplus(
+    X: np.ndarray,
+    k: int,
+    rng: np.random.RandomState,
+    sample_weight: Optional[np.ndarray] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    low_memory: bool = False,
+) -> np.ndarray:
+    """
+    k-means++ seeding: draw each new centre with probability proportional to
+    the (weighted) squared distance to the closest centre chosen so far.
+
+    The closest-centre distances are updated incrementally against the one
+    new centre only, so each draw costs a single pass over X. With
+    ``low_memory`` no per-sample vector is kept: every draw recomputes the
+    distances to all chosen centres block by block instead, which costs
+    O(n k^2) distance evaluations in total rather than O(n k).
+    """
+    n_samples = X.shape[0]
+    centres = np.empty((k, X.shape[1]), dtype=np.result_type(X.dtype, np.float32))
+    if sample_weight is None:
+        # Same draw as a search in cumsum(ones(n)), without building it
+        first = int(rng.uniform() * n_samples)
+    else:
+        cumulative = np.cumsum(sample_weight)
+        first = np.searchsorted(cumulative, rng.uniform() * cumulative[-1], side="right")
+    centres[0] = _dense_rows(X, [min(first, n_samples - 1)])[0]
+
+    if low_memory:
+        for i in range(1, k):
+            idx = _draw_proportional_blocked(X, centres[:i], rng, sample_weight, memory_budget)
+            centres[i] = _dense_rows(X, [idx])[0]
+        return centres
+
+    _, closest = nearest_centroids(X, centres[:1], memory_budget=memory_budget)
+
+    for i in range(1, k):
+        score = closest if sample_weight is None else sample_weight * closest
+        cumulative = np.cumsum(score)
+        total = cumulative[-1]
+        if total > 0:
+            idx = np.searchsorted(cumulative, rng.uniform() * total, side="right")
+            idx = min(idx, n_samples - 1)
+        else:
+            # Every sample already coincides with a centre
+            idx = rng.randint(0, n_samples)
+        centres[i] = _dense_rows(X, [idx])[0]
+        _, new_sq = nearest_centroids(X, centres[i:i + 1], memory_budget=memory_budget)
+        np.minimum(closest, new_sq, out=closest)
+
+    return centres
+
+
+def _kmeans_parallel(
+    X: np.ndarray,
+    k: int,
+    rng: np.random.RandomState,
+    oversampling: Optional[float] = None,
+    n_rounds: int = 5,
+    sample_weight: Optional[np.ndarray] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    low_memory: bool = False,
+) -> np.ndarray:
+    """
+    Scalable k-means|| seeding (Bahmani et al.).
+
+    Each of ``n_rounds`` passes samples every point independently with
+    probability ``oversampling * d^2 / phi``, so about ``oversampling``
+    candidates are added per pass. The candidates are then weighted by the
+    number of samples closest to them and reduced to k centres with weighted
+    k-means++. Every pass is a blocked scan, so X may be a memory-mapped array.
+
+    With ``low_memory`` the closest-candidate distances are not kept across
+    passes: each round makes one pass for phi and one for the draws, both
+    computing distances to the whole candidate set block by block.
+    """
+    n_samples = X.shape[0]
+    oversampling = 2.0 * k if oversampling is None else oversampling
+
+    candidates = _dense_rows(X, [rng.randint(0, n_samples)])
+    closest = None
+    if not low_memory:
+        _, closest = nearest_centroids(X, candidates, memory_budget=memory_budget)
+
+    for _ in range(n_rounds):
+        if low_memory:
+            phi = sum(
+                float(_blocked_min_sq(X, candidates, rows, sample_weight, memory_budget).sum())
+                for rows in _seeding_blocks(X, candidates.shape[0], memory_budget)
+            )
+        elif sample_weight is None:
+            phi = float(closest.sum())
+        else:
+            phi = float(np.dot(sample_weight, closest))
+        if phi <= 0:
+            break
+        picked = []
+        for rows in _seeding_blocks(X, candidates.shape[0], memory_budget):
+            if low_memory:
+                score = _blocked_min_sq(X, candidates, rows, sample_weight, memory_budget)
+            elif sample_weight is None:
+                score = closest[rows]
+            else:
+                score = sample_weight[rows] * closest[rows]
+            prob = oversampling * score / phi
+            hits = np.flatnonzero(rng.uniform(size=prob.shape[0]) < prob)
+            picked.append(hits + rows.start)
+        picked = np.concatenate(picked)
+        if picked.size == 0:
+            continue
+        new_candidates = _dense_rows(X, picked)
+        candidates = np.vstack([candidates, new_candidates])
+        if not low_memory:
+            _, new_sq = nearest_centroids(X, new_candidates, memory_budget=memory_budget)
+            np.minimum(closest, new_sq, out=closest)
+
+    if candidates.shape[0] < k:
+        return _kmeans_plusplus(
+            X, k, rng, sample_weight=sample_weight, memory_budget=memory_budget,
+            low_memory=low_memory,
+        )
+
+    n_candidates = candidates.shape[0]
+    candidate_weight = np.zeros(n_candidates)
+    for rows in _seeding_blocks(X, n_candidates, memory_budget):
+        labels, _ = nearest_centroids(X[rows], candidates, memory_budget=memory_budget)
+        weight = None if sample_weight is None else sample_weight[rows]
+        candidate_weight += np.bincount(labels, weights=weight, minlength=n_candidates)
+    return _kmeans_plusplus(
+        candidates, k, rng, sample_weight=candidate_weight, memory_budget=memory_budget
+    )
+
+
+def save_centroids(
+    path: str,
+    centroids: np.ndarray,
+    n_iter: Optional[int] = None,
+    cold_n_iter: Optional[int] = None,
+) -> None:
+    """
+    Save fitted centroids to an ``.npz`` file for later warm starts.
+
+    Parameters
+    ----------
+    path : str
+        Output filename.
+    centroids : ndarray of shape (k, n_features)
+    n_iter : int or None
+        Iterations the fit took.
+    cold_n_iter : int or None
+        Iterations of the cold-started fit this model descends from. Defaults
+        to n_iter, i.e. the fit is assumed to be a cold start.
+    """
+    if cold_n_iter is None:
+        cold_n_iter = n_iter
+    np.savez(
+        path,
+        centroids=np.asarray(centroids),
+        n_iter=-1 if n_iter is None else n_iter,
+        cold_n_iter=-1 if cold_n_iter is None else cold_n_iter,
+    )
+
+
+def load_centroids(path: str) -> Tuple[np.ndarray, Dict[str, Optional[int]]]:
+    """
+    Load centroids saved by ``save_centroids``.
+
+    Returns
+    -------
+    centroids : ndarray of shape (k, n_features)
+    info : dict
+        ``{"n_iter": int or None, "cold_n_iter": int or None}``.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No such file: '{path}'")
+    with np.load(path) as data:
+        centroids = data["centroids"]
+        info = {
+            key: (int(data[key]) if key in data and int(data[key]) >= 0 else None)
+            for key in ("n_iter", "cold_n_iter")
+        }
+    return centroids, info
+
 
 def init_centroids(
     X: np.ndarray,
     k: int,
     random_state: Optional[int] = None,
+    init: Union[str, np.ndarray] = "random",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    sample_weight: Optional[np.ndarray] = None,
+    low_memory: bool = False,
+) -> np.ndarray:
+    """
+    Initialise centroids from the rows of X, or from given centroids.
+
+    Parameters
+    ----------
+    X : ndarray of shape (n_samples, n_features)
+    k : int
+        Number of clusters.
+    random_state : int or None
+    init : {"random", "k-means++", "k-means||"}, ndarray or str, default "random"
+        "random" samples k distinct rows uniformly. "k-means++" draws rows
+        with probability proportional to the squared distance to the centres
+        chosen so far. "k-means||" is the oversampling variant of k-means++
+        that needs only a handful of passes over X. An ndarray of shape
+        (k, n_features), or the path of a file written by ``save_centroids``,
+        is used as the starting centroids (warm start).
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Working-memory budget in bytes for the distance passes.
+    sample_weight : ndarray of shape (n_samples,) or None
+        Non-negative sample weights; rows are drawn in proportion to them.
+    low_memory : bool, default False
+        If True, keep no per-sample arrays: "k-means++" and "k-means||"
+        recompute distances to the chosen centres block by block instead of
+        keeping the closest distance of every sample. Used for memory-mapped
+        X, at the price of extra distance passes.
+
+    Returns
+    -------
+    centroids : ndarray of shape (k, n_features)
+    """
+    if k <= 0:
+        raise ValueError("k must be a positive integer.")
+    n_samples = X.shape[0]
+
+    if isinstance(init, (str, os.PathLike)) and init not in _INIT_METHODS:
+        if str(init).endswith(".npz"):
+            init, _ = load_centroids(init)
+    if isinstance(init, np.ndarray):
+        if init.shape != (k, X.shape[1]):
+            raise ValueError(
+                f"init centroids must have shape ({k}, {X.shape[1]}), got {init.shape}."
+            )
+        return np.array(init, dtype=np.result_type(X.dtype, np.float32))
+
+    if k > n_samples:
+        raise ValueError("k cannot be larger than the number of samples.")
+    if init not in _INIT_METHODS:
+        raise ValueError(f"Unknown init '{init}'. Use one of {_INIT_METHODS}.")
+
+    rng = np.random.RandomState(random_state)
+    if init == "k-means++":
+        return _kmeans_plusplus(
+            X, k, rng, sample_weight=sample_weight, memory_budget=memory_budget,
+            low_memory=low_memory,
+        )
+    if init == "k-means||":
+        return _kmeans_parallel(
+            X, k, rng, sample_weight=sample_weight, memory_budget=memory_budget,
+            low_memory=low_memory,
+        )
+    if sample_weight is None:
+        indices = _sample_rows(n_samples, k, rng)
+    else:
+        if np.count_nonzero(sample_weight) < k:
+            raise ValueError("At least k samples must have a positive weight.")
+        p = sample_weight / sample_weight.sum()
+        indices = rng.choice(n_samples, size=k, replace=False, p=p)
+    return _dense_rows(X, indices)
+
+
+def _check_sample_weight(
+    sample_weight: Optional[np.ndarray],
+    n_samples: int,
+) -> Optional[np.ndarray]:
+    """
+    Validate sample weights and return them as a float64 array (or None).
+    """
+    if sample_weight is None:
+        return None
+    sample_weight = np.asarray(sample_weight, dtype=np.float64)
+    if sample_weight.shape != (n_samples,):
+        raise ValueError("sample_weight must have shape (n_samples,).")
+    if np.any(sample_weight < 0) or not np.all(np.isfinite(sample_weight)):
+        raise ValueError("sample_weight must contain finite, non-negative values.")
+    return sample_weight
+
+
+def _row_blocks(
+    n_samples: int,
+    bytes_per_row: int,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+):
+    """
+    Yield row slices whose temporaries fit inside ``memory_budget`` bytes.
+    """
+    if memory_budget <= 0:
+        raise ValueError("memory_budget must be a positive number of bytes.")
+    step = int(max(1, min(n_samples, memory_budget // max(1, bytes_per_row))))
+    for start in range(0, n_samples, step):
+        yield slice(start, min(start + step, n_samples))
+
+
+def _row_sq_norms(X: np.ndarray) -> np.ndarray:
+    """
+    Squared Euclidean norm of every row of X (dense or scipy.sparse).
+    """
+    if sparse.issparse(X):
+        return np.asarray(X.multiply(X).sum(axis=1)).ravel()
+    return np.einsum("ij,ij->i", X, X)
+
+
+def _dense_rows(X: np.ndarray, rows) -> np.ndarray:
+    """
+    The given rows of X as a dense floating ndarray (X may be scipy.sparse or
+    a memmap). Integer rows are cast so that they can serve as centroids.
+    """
+    dtype = np.result_type(X.dtype, np.float32)
+    if sparse.issparse(X):
+        return X[rows].toarray().astype(dtype, copy=False)
+    return np.asarray(X[rows], dtype=dtype)
+
+
+def _check_input(X, name: str = "X"):
+    """
+    Accept a NumPy array or a scipy.sparse matrix (converted to CSR).
+    """
+    if sparse.issparse(X):
+        return X.tocsr()
+    if not isinstance(X, np.ndarray):
+        raise TypeError(f"{name} must be a NumPy array or a scipy.sparse matrix.")
+    return X
+
+
+def nearest_centroids(
+    X: np.ndarray,
+    centroids: np.ndarray,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    x_sq_norms: Optional[np.ndarray] = None,
+    c_sq_norms: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the nearest centroid of every sample and its squared distance.
+
+    Distances are computed blockwise through the expansion
+    ``||x||^2 - 2 x.c + ||c||^2`` so that only a ``(block, k)`` matrix is
+    held in memory at any time, instead of the full
+    ``(n_samples, k, n_features)`` difference tensor. For scipy.sparse X
+    the product is sparse-dense and X is never densified.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse CSR matrix of shape (n_samples, n_features)
+    centroids : ndarray of shape (k, n_features)
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Approximate number of bytes the per-block temporaries may use.
+    x_sq_norms : ndarray of shape (n_samples,) or None
+        Precomputed squared row norms of X. Computed on the fly if None.
+    c_sq_norms : ndarray of shape (k,) or None
+        Precomputed squared norms of the centroids. Computed if None.
+
+    Returns
+    -------
+    labels : ndarray of shape (n_samples,)
+    min_sq_distances : ndarray of shape (n_samples,)
+        Squared Euclidean distance from each sample to its nearest centroid.
+    """
+    if X.ndim != 2 or centroids.ndim != 2:
+        raise ValueError("X and centroids must be 2D arrays.")
+    if X.shape[1] != centroids.shape[1]:
+        raise ValueError("X and centroids must have the same number of features.")
+
+    n_samples = X.shape[0]
+    k = centroids.shape[0]
+    dtype = np.result_type(X.dtype, centroids.dtype, np.float32)
+    if c_sq_norms is None:
+        c_sq_norms = _row_sq_norms(centroids)
+
+    labels = np.empty(n_samples, dtype=np.intp)
+    min_sq_distances = np.empty(n_samples, dtype=dtype)
+
+    # One (block, k) distance matrix plus the GEMM output per row
+    bytes_per_row = 2 * k * dtype.itemsize
+    for rows in _row_blocks(n_samples, bytes_per_row, memory_budget):
+        block = X[rows]
+        # ||x||^2 does not change the argmin, so it is only added afterwards
+        dist = np.asarray(block @ centroids.T, dtype=dtype)
+        dist *= -2.0
+        dist += c_sq_norms
+        block_labels = np.argmin(dist, axis=1)
+        block_min = dist[np.arange(block.shape[0]), block_labels]
+        block_min += _row_sq_norms(block) if x_sq_norms is None else x_sq_norms[rows]
+        # Cancellation in the expansion can produce tiny negative values
+        np.maximum(block_min, 0.0, out=block_min)
+        labels[rows] = block_labels
+        min_sq_distances[rows] = block_min
+
+    return labels, min_sq_distances
+
+
+def assign_clusters(
+    X: np.ndarray,
+    centroids: np.ndarray,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> np.ndarray:
+    """
+    Assign each sample to the nearest centroid (Euclidean distance).
+
+    X may be a NumPy array or a scipy.sparse matrix. See
+    ``nearest_centroids`` for the blocked distance computation.
+    """
+    X = _check_input(X)
+    labels, _ = nearest_centroids(X, centroids, memory_budget=memory_budget)
+    return labels
+
+
+def _cluster_sums(
+    X: np.ndarray,
+    labels: np.ndarray,
+    k: int,
+    sample_weight: Optional[np.ndarray] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-cluster feature sums and sample counts in a single pass over X.
+
+    The sums are obtained as a sparse one-hot ``(k, block)`` matrix times
+    each row block of X, so no per-cluster mask or copy of X is ever built.
+    Sums are accumulated in float64, but only one block at a time is
+    upcast, so float32 X is never copied to float64 as a whole. With
+    ``sample_weight`` the sums are weighted and the counts are total weights.
+    """
+    n_samples, n_features = X.shape
+    weight = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+    counts = np.bincount(labels, weights=weight, minlength=k)
+    sums = np.zeros((k, n_features))
+    for rows in _row_blocks(n_samples, n_features * 8, memory_budget):
+        block = X[rows].astype(np.float64, copy=False)
+        n_block = block.shape[0]
+        one_hot = sparse.csr_matrix(
+            (
+                np.ones(n_block) if weight is None else weight[rows],
+                (labels[rows], np.arange(n_block)),
+            ),
+            shape=(k, n_block),
+        )
+        block_sums = one_hot @ block
+        if sparse.issparse(block_sums):
+            block_sums = block_sums.toarray()
+        sums += block_sums
+    return sums, counts
+
+
+def update_centroids(
+    X: np.ndarray,
+    labels: np.ndarray,
+    k: int,
+    random_state: Optional[int] = None,
+    min_sq_distances: Optional[np.ndarray] = None,
+    return_stats: bool = False,
+    sample_weight: Optional[np.ndarray] = None,
+):
+    """
+    Update centroids by taking the mean of points in each cluster.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse CSR matrix of shape (n_samples, n_features)
+    labels : ndarray of shape (n_samples,)
+    k : int
+        Number of clusters.
+    random_state : int or None
+        Only used to re-seed empty clusters when ``min_sq_distances`` is None.
+    min_sq_distances : ndarray of shape (n_samples,) or None
+        Squared distance of each sample to its current centroid, as returned
+        by ``nearest_centroids``. If given, empty clusters are re-seeded at
+        the samples farthest from their centroids instead of at random.
+    return_stats : bool, default False
+        If True, also return the per-cluster counts and feature sums.
+    sample_weight : ndarray of shape (n_samples,) or None
+        If given, centroids are weighted means and counts are total weights.
+
+    Returns
+    -------
+    centroids : ndarray of shape (k, n_features)
+        If return_stats=True, a tuple ``(centroids, counts, sums)`` is
+        returned, where counts and sums describe the clusters as given by
+        ``labels`` (empty clusters keep a count of zero).
+    """
+    sums, counts = _cluster_sums(X, labels, k, sample_weight=sample_weight)
+    new_centroids = _centroids_from_sums(X, sums, counts, min_sq_distances, random_state)
+
+    if return_stats:
+        return new_centroids, counts, sums
+    return new_centroids
+
+
+def _centroids_from_sums(
+    X: np.ndarray,
+    sums: np.ndarray,
+    counts: np.ndarray,
+    min_sq_distances: Optional[np.ndarray] = None,
+    random_state: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Turn per-cluster sums and counts into centroids, re-seeding empty clusters.
+
+    Sums are accumulated in float64; the centroids are returned in the
+    floating dtype of X so that float32 data stays float32.
+    """
+    new_centroids = np.zeros_like(sums)
+    non_empty = counts > 0
+    new_centroids[non_empty] = sums[non_empty] / counts[non_empty, np.newaxis]
+
+    empty = np.flatnonzero(~non_empty)
+    if empty.size > 0:
+        if min_sq_distances is not None:
+            # Re-seed at the worst-served samples: one distinct point per cluster
+            m = min(empty.size, X.shape[0])
+            far = np.argpartition(min_sq_distances, -m)[-m:]
+            far = far[np.argsort(min_sq_distances[far])[::-1]]
+            far = np.resize(far, empty.size)
+        else:
+            rng = np.random.RandomState(random_state)
+            far = rng.randint(0, X.shape[0], size=empty.size)
+        new_centroids[empty] = _dense_rows(X, far)
+
+    return new_centroids.astype(np.result_type(X.dtype, np.float32), copy=False)
+
+
+def summarise_clusters(
+    X,
+    centroids: np.ndarray,
+    labels: Optional[np.ndarray] = None,
+    sample_weight: Optional[np.ndarray] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> ClusterSummary:
+    """
+    Assign samples and collect a ClusterSummary in one blocked pass over X.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+    centroids : ndarray of shape (k, n_features)
+    labels : ndarray of shape (n_samples,) or None
+        Cluster of every sample, as indices into ``centroids``. If None,
+        every sample is assigned to its nearest centroid.
+    sample_weight : ndarray of shape (n_samples,) or None
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+
+    Returns
+    -------
+    summary : ClusterSummary
+    """
+    X = _check_input(X)
+    centroids = np.asarray(centroids)
+    if centroids.ndim != 2 or centroids.shape[1] != X.shape[1]:
+        raise ValueError(f"centroids must be a 2D array with {X.shape[1]} features.")
+    n_samples, k = X.shape[0], centroids.shape[0]
+    sample_weight = _check_sample_weight(sample_weight, n_samples)
+    given = labels is not None
+    if given:
+        labels = np.asarray(labels, dtype=np.intp)
+        if labels.shape != (n_samples,):
+            raise ValueError("labels must have shape (n_samples,).")
+        if n_samples and (labels.min() < 0 or labels.max() >= k):
+            raise ValueError("labels must be indices into centroids.")
+    else:
+        labels = np.empty(n_samples, dtype=np.intp)
+
+    dtype = np.result_type(X.dtype, centroids.dtype, np.float32)
+    c_sq_norms = _row_sq_norms(centroids)
+    min_sq = np.empty(n_samples, dtype=dtype)
+    second_sq = np.full(n_samples, np.inf, dtype=dtype)
+    stats = ClusterStats(centroids)
+
+    for rows in _row_blocks(n_samples, 2 * k * dtype.itemsize, memory_budget):
+        Xb = X[rows]
+        sq = np.asarray(Xb @ centroids.T, dtype=dtype)
+        sq *= -2.0
+        sq += c_sq_norms
+        sq += _row_sq_norms(Xb)[:, np.newaxis]
+        np.maximum(sq, 0.0, out=sq)
+        local = np.arange(sq.shape[0])
+        if not given:
+            labels[rows] = np.argmin(sq, axis=1)
+        own = labels[rows]
+        min_sq[rows] = sq[local, own]
+        if k > 1:
+            sq[local, own] = np.inf
+            second_sq[rows] = sq.min(axis=1)
+        weight = None if sample_weight is None else sample_weight[rows]
+        block_sums, block_counts = _cluster_sums(
+            Xb, own, k, sample_weight=weight, memory_budget=memory_budget
+        )
+        stats._add(own, min_sq[rows], block_sums, block_counts, weight)
+
+    return ClusterSummary(labels, min_sq, second_sq, stats, sample_weight)
+
+
+def _row_shards(n_samples: int, n_shards: int) -> List[slice]:
+    """
+    Split ``range(n_samples)`` into at most ``n_shards`` contiguous slices.
+    """
+    bounds = np.linspace(0, n_samples, min(n_shards, max(1, n_samples)) + 1).astype(int)
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _assign_and_accumulate(
+    X: np.ndarray,
+    centroids: np.ndarray,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    pool: Optional[Executor] = None,
+    n_shards: int = 1,
+    sample_weight: Optional[np.ndarray] = None,
+    x_sq_norms: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Assignment step plus per-cluster accumulation, optionally sharded.
+
+    X is split into ``n_shards`` row shards; each shard computes its nearest
+    centroids and partial sums/counts on ``pool`` (NumPy's BLAS calls release
+    the GIL, so a thread pool runs them concurrently). The partials are then
+    reduced into per-cluster totals.
+
+    Returns labels, min squared distances, sums and counts.
+    """
+    n_samples, k = X.shape[0], centroids.shape[0]
+    labels = np.empty(n_samples, dtype=np.intp)
+    min_sq = np.empty(n_samples, dtype=np.result_type(X.dtype, centroids.dtype, np.float32))
+    shards = _row_shards(n_samples, n_shards if pool is not None else 1)
+    # Shards run concurrently, so they share the memory budget
+    shard_budget = max(1, memory_budget // len(shards))
+
+    def work(rows: slice) -> Tuple[np.ndarray, np.ndarray]:
+        labels[rows], min_sq[rows] = nearest_centroids(
+            X[rows], centroids, memory_budget=shard_budget,
+            x_sq_norms=None if x_sq_norms is None else x_sq_norms[rows],
+        )
+        weight = None if sample_weight is None else sample_weight[rows]
+        return _cluster_sums(
+            X[rows], labels[rows], k, sample_weight=weight, memory_budget=shard_budget
+        )
+
+    if pool is None or len(shards) == 1:
+        partials = [work(rows) for rows in shards]
+    else:
+        partials = list(pool.map(work, shards))
+
+    sums = np.sum([p[0] for p in partials], axis=0)
+    counts = np.sum([p[1] for p in partials], axis=0)
+    return labels, min_sq, sums, counts
+
+
+def _pair_distances(
+    X: np.ndarray,
+    centroids: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> np.ndarray:
+    """
+    Euclidean distances between the sample/centroid pairs ``(rows[i], cols[i])``.
+    """
+    out = np.empty(rows.shape[0], dtype=np.result_type(X.dtype, centroids.dtype))
+    bytes_per_row = 2 * X.shape[1] * X.dtype.itemsize
+    for block in _row_blocks(rows.shape[0], bytes_per_row, memory_budget):
+        if sparse.issparse(X):
+            Xr, C = X[rows[block]], centroids[cols[block]]
+            dot = np.asarray(Xr.multiply(C).sum(axis=1)).ravel()
+            sq = _row_sq_norms(Xr) - 2.0 * dot + _row_sq_norms(C)
+            out[block] = np.sqrt(np.maximum(sq, 0.0))
+        else:
+            diff = X[rows[block]] - centroids[cols[block]]
+            out[block] = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    return out
+
+
+def _centroid_distances(centroids: np.ndarray) -> np.ndarray:
+    """
+    Matrix of Euclidean distances between centroids.
+    """
+    sq_norms = _row_sq_norms(centroids)
+    sq = sq_norms[:, np.newaxis] - 2.0 * centroids @ centroids.T + sq_norms[np.newaxis, :]
+    np.maximum(sq, 0.0, out=sq)
+    np.fill_diagonal(sq, 0.0)
+    return np.sqrt(sq)
+
+
+def _half_separation(cc: np.ndarray) -> np.ndarray:
+    """
+    Half the distance from each centroid to its closest other centroid.
+    """
+    if cc.shape[0] < 2:
+        return np.full(cc.shape[0], np.inf)
+    masked = cc + np.diag(np.full(cc.shape[0], np.inf))
+    return 0.5 * masked.min(axis=1)
+
+
+def _max_other(values: np.ndarray) -> np.ndarray:
+    """
+    For every entry j, the maximum of ``values`` over all entries other than j.
+    """
+    if values.shape[0] < 2:
+        return np.zeros_like(values)
+    order = np.argsort(values)
+    out = np.full_like(values, values[order[-1]])
+    out[order[-1]] = values[order[-2]]
+    return out
+
+
+def _two_nearest(
+    X: np.ndarray,
+    centroids: np.ndarray,
+    rows: np.ndarray,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Nearest centroid, and distances to the nearest and second-nearest
+    centroid, for the samples ``X[rows]``.
+    """
+    k = centroids.shape[0]
+    c_sq_norms = _row_sq_norms(centroids)
+    labels = np.empty(rows.shape[0], dtype=np.intp)
+    first = np.empty(rows.shape[0])
+    second = np.full(rows.shape[0], np.inf)
+
+    bytes_per_row = 2 * k * 8 + X.shape[1] * X.dtype.itemsize
+    for block in _row_blocks(rows.shape[0], bytes_per_row, memory_budget):
+        Xb = X[rows[block]]
+        sq = Xb @ centroids.T
+        sq *= -2.0
+        sq += c_sq_norms
+        sq += _row_sq_norms(Xb)[:, np.newaxis]
+        np.maximum(sq, 0.0, out=sq)
+        block_labels = np.argmin(sq, axis=1)
+        idx = np.arange(Xb.shape[0])
+        labels[block] = block_labels
+        first[block] = sq[idx, block_labels]
+        if k > 1:
+            sq[idx, block_labels] = np.inf
+            second[block] = sq.min(axis=1)
+
+    return labels, np.sqrt(first), np.sqrt(second)
+
+
+class _IterationTrace:
+    """
+    Per-iteration record of a K-means run.
+
+    Every ``record`` call stores the inertia, the centroid shift, the number
+    of samples whose label changed and the wall time since the previous
+    call (or since the trace was created, for the first iteration).
+    """
+
+    def __init__(self) -> None:
+        self.inertia: List[float] = []
+        self.shift: List[float] = []
+        self.n_changed: List[int] = []
+        self.time: List[float] = []
+        self._last = time.perf_counter()
+
+    def record(self, inertia: float, shift: float, n_changed: int) -> None:
+        now = time.perf_counter()
+        self.inertia.append(float(inertia))
+        self.shift.append(float(shift))
+        self.n_changed.append(int(n_changed))
+        self.time.append(now - self._last)
+        self._last = now
+
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            "inertia": np.array(self.inertia),
+            "shift": np.array(self.shift),
+            "n_changed": np.array(self.n_changed, dtype=np.intp),
+            "time": np.array(self.time),
+        }
+
+
+def _weighted_sum(values: np.ndarray, sample_weight: Optional[np.ndarray]) -> float:
+    """Sum of ``values``, weighted by sample_weight if given, in float64."""
+    if sample_weight is None:
+        return float(values.sum(dtype=np.float64))
+    return float(np.dot(sample_weight, values))
+
+
+def _inertia_from_stats(
+    x_sq_total: float,
+    centroids: np.ndarray,
+    sums: np.ndarray,
+    counts: np.ndarray,
+) -> float:
+    """
+    Exact inertia of an assignment from its per-cluster sums and counts.
+
+    Uses ``sum w ||x||^2 - 2 sum_j c_j . s_j + sum_j n_j ||c_j||^2``, so it
+    costs O(k * n_features) given the (weighted) total ``x_sq_total``.
+    """
+    centroids = np.asarray(centroids, dtype=np.float64)
+    inertia = (
+        x_sq_total
+        - 2.0 * float(np.einsum("ij,ij->", centroids, sums))
+        + float(np.dot(counts, _row_sq_norms(centroids)))
+    )
+    # Cancellation can leave a tiny negative value for a perfect fit
+    return max(inertia, 0.0)
+
+
+def _should_stop(
+    shift: float,
+    tol: float,
+    n_changed: int,
+    n_samples: int,
+    label_change_tol: Optional[float],
+) -> bool:
+    """Convergence test shared by the K-means loops."""
+    if shift < tol:
+        return True
+    return label_change_tol is not None and n_changed <= label_change_tol * n_samples
+
+
+def _kmeans_hamerly(
+    X: np.ndarray,
+    centroids: np.ndarray,
+    max_iter: int,
+    tol: float,
+    memory_budget: int,
+    sample_weight: Optional[np.ndarray] = None,
+    label_change_tol: Optional[float] = None,
+    trace: Optional[_IterationTrace] = None,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Lloyd iterations accelerated with Hamerly's bounds.
+
+    Each sample keeps an upper bound on the distance to its own centroid and
+    a single lower bound on the distance to every other centroid. Samples
+    whose bounds prove the label cannot change are skipped entirely.
+
+    The inertia recorded in ``trace`` is exact: it is derived from the
+    per-cluster sums and counts of the centroid update.
+    """
+    n_samples, k = X.shape[0], centroids.shape[0]
+    if trace is None:
+        trace = _IterationTrace()
+    all_rows = np.arange(n_samples)
+    labels, upper, lower = _two_nearest(X, centroids, all_rows, memory_budget)
+    n_changed = n_samples
+    x_sq_total = _weighted_sum(_row_sq_norms(X), sample_weight)
+
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        new_centroids, counts, sums = update_centroids(
+            X, labels, k, min_sq_distances=upper ** 2, return_stats=True,
+            sample_weight=sample_weight,
+        )
+        inertia = _inertia_from_stats(x_sq_total, centroids, sums, counts)
+        move = np.sqrt(_row_sq_norms(new_centroids - centroids))
+        shift = np.linalg.norm(new_centroids - centroids)
+        centroids = new_centroids
+        trace.record(inertia, shift, n_changed)
+        if _should_stop(shift, tol, n_changed, n_samples, label_change_tol):
+            break
+        n_changed = 0
+
+        upper += move[labels]
+        lower -= _max_other(move)[labels]
+
+        bound = np.maximum(_half_separation(_centroid_distances(centroids))[labels], lower)
+        cand = np.flatnonzero(upper > bound)
+        if cand.size == 0:
+            continue
+        # Tighten the upper bound before paying for a full distance row
+        upper[cand] = _pair_distances(X, centroids, cand, labels[cand], memory_budget)
+        cand = cand[upper[cand] > bound[cand]]
+        if cand.size == 0:
+            continue
+        old_labels = labels[cand]
+        labels[cand], upper[cand], lower[cand] = _two_nearest(
+            X, centroids, cand, memory_budget
+        )
+        n_changed = int(np.count_nonzero(labels[cand] != old_labels))
+
+    return labels, centroids, n_iter
+
+
+def _kmeans_elkan(
+    X: np.ndarray,
+    centroids: np.ndarray,
+    max_iter: int,
+    tol: float,
+    memory_budget: int,
+    sample_weight: Optional[np.ndarray] = None,
+    label_change_tol: Optional[float] = None,
+    trace: Optional[_IterationTrace] = None,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Lloyd iterations accelerated with Elkan's bounds.
+
+    Each sample keeps an upper bound on the distance to its own centroid and
+    one lower bound per centroid, so only the sample/centroid pairs that the
+    triangle inequality cannot rule out are recomputed. The lower bounds take
+    ``n_samples * k`` floats; prefer Hamerly's variant when that is too much.
+
+    The inertia recorded in ``trace`` is exact: it is derived from the
+    per-cluster sums and counts of the centroid update.
+    """
+    n_samples, k = X.shape[0], centroids.shape[0]
+    if trace is None:
+        trace = _IterationTrace()
+
+    lower = np.empty((n_samples, k))
+    for rows in _row_blocks(n_samples, 2 * k * 8, memory_budget):
+        Xb = X[rows]
+        sq = Xb @ centroids.T
+        sq *= -2.0
+        sq += _row_sq_norms(centroids)
+        sq += _row_sq_norms(Xb)[:, np.newaxis]
+        np.maximum(sq, 0.0, out=sq)
+        lower[rows] = np.sqrt(sq)
+    labels = np.argmin(lower, axis=1)
+    upper = lower[np.arange(n_samples), labels]
+    n_changed = n_samples
+    x_sq_total = _weighted_sum(_row_sq_norms(X), sample_weight)
+
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        new_centroids, counts, sums = update_centroids(
+            X, labels, k, min_sq_distances=upper ** 2, return_stats=True,
+            sample_weight=sample_weight,
+        )
+        inertia = _inertia_from_stats(x_sq_total, centroids, sums, counts)
+        move = np.sqrt(_row_sq_norms(new_centroids - centroids))
+        shift = np.linalg.norm(new_centroids - centroids)
+        centroids = new_centroids
+        trace.record(inertia, shift, n_changed)
+        if _should_stop(shift, tol, n_changed, n_samples, label_change_tol):
+            break
+        n_changed = 0
+
+        upper += move[labels]
+        lower -= move
+        np.maximum(lower, 0.0, out=lower)
+
+        cc = _centroid_distances(centroids)
+        cand = np.flatnonzero(upper > _half_separation(cc)[labels])
+
+        for block in _row_blocks(cand.shape[0], 4 * k * 8, memory_budget):
+            idx = cand[block]
+            lab = labels[idx]
+            local = np.arange(idx.shape[0])
+
+            u = upper[idx][:, np.newaxis]
+            mask = (u > lower[idx]) & (u > 0.5 * cc[lab])
+            mask[local, lab] = False
+            keep = mask.any(axis=1)
+            idx, lab, mask = idx[keep], lab[keep], mask[keep]
+            if idx.size == 0:
+                continue
+            local = np.arange(idx.shape[0])
+
+            # Tighten the upper bound, then re-test the remaining pairs
+            u = _pair_distances(X, centroids, idx, lab, memory_budget)
+            lower[idx, lab] = u
+            mask &= (u[:, np.newaxis] > lower[idx]) & (u[:, np.newaxis] > 0.5 * cc[lab])
+
+            ii, jj = np.nonzero(mask)
+            d = _pair_distances(X, centroids, idx[ii], jj, memory_budget)
+            lower[idx[ii], jj] = d
+
+            dist = np.full(mask.shape, np.inf)
+            dist[ii, jj] = d
+            dist[local, lab] = u
+            best = np.argmin(dist, axis=1)
+            n_changed += int(np.count_nonzero(best != lab))
+            labels[idx] = best
+            upper[idx] = dist[local, best]
+
+    return labels, centroids, n_iter
+
+
+_KMEANS_ALGORITHMS = ("lloyd", "elkan", "hamerly")
+
+
+def _kmeans_single(
+    X: np.ndarray,
+    k: int,
+    max_iter: int,
+    tol: float,
+    random_state: Optional[int],
+    memory_budget: int,
+    algorithm: str,
+    init: Union[str, np.ndarray],
+    n_jobs: int = 1,
+    sample_weight: Optional[np.ndarray] = None,
+    label_change_tol: Optional[float] = None,
+) -> Tuple[np.ndarray, int, Dict[str, np.ndarray]]:
+    """
+    One K-means run from one initialisation.
+
+    With n_jobs > 1 the Lloyd assignment step is sharded over a thread pool.
+
+    X may be a SharedArrayHandle when called in a process-pool worker.
+
+    Returns centroids, the number of iterations and the per-iteration trace.
+    No per-sample array is returned, so restarts on a process pool only send
+    O(k * n_features) data back; the final assignment is left to the caller.
+    """
+    X = resolve(X)
+    centroids = init_centroids(
+        X, k, random_state=random_state, init=init, memory_budget=memory_budget,
+        sample_weight=sample_weight,
+    )
+    trace = _IterationTrace()
+    bounded_args = (
+        X, centroids, max_iter, tol, memory_budget, sample_weight, label_change_tol, trace
+    )
+    if algorithm == "elkan":
+        _, centroids, n_iter = _kmeans_elkan(*bounded_args)
+    elif algorithm == "hamerly":
+        _, centroids, n_iter = _kmeans_hamerly(*bounded_args)
+    else:
+        pool = ThreadPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+        x_sq_norms = _row_sq_norms(X)
+        previous = None
+        try:
+            n_iter = 0
+            for n_iter in range(1, max_iter + 1):
+                labels, min_sq, sums, counts = _assign_and_accumulate(
+                    X, centroids, memory_budget, pool=pool, n_shards=n_jobs,
+                    sample_weight=sample_weight, x_sq_norms=x_sq_norms,
+                )
+                new_centroids = _centroids_from_sums(X, sums, counts, min_sq)
+                shift = np.linalg.norm(new_centroids - centroids)
+                centroids = new_centroids
+                n_changed = (
+                    X.shape[0] if previous is None
+                    else int(np.count_nonzero(labels != previous))
+                )
+                previous = labels
+                trace.record(_weighted_sum(min_sq, sample_weight), shift, n_changed)
+                if _should_stop(shift, tol, n_changed, X.shape[0], label_change_tol):
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    return centroids, n_iter, trace.as_dict()
+
+
+def _final_inertia(run: Tuple[np.ndarray, int, Dict[str, np.ndarray]]) -> float:
+    """
+    Inertia of the last assignment of a run, used to rank restarts.
+    """
+    inertia = run[2]["inertia"]
+    return float(inertia[-1]) if inertia.shape[0] else np.inf
+
+
+def _spawn_seeds(random_state: Optional[int], n: int) -> List[int]:
+    """
+    Derive ``n`` independent integer seeds from a single random_state.
+    """
+    children = np.random.SeedSequence(random_state).spawn(n)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def _effective_n_jobs(n_jobs: Optional[int]) -> int:
+    """
+    Resolve n_jobs: None means 1, negative values count back from the CPU count.
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a non-zero integer or None.")
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def _make_executor(backend: str, n_jobs: Optional[int]) -> Executor:
+    """
+    Create the worker pool used for parallel restarts and sweeps.
+    """
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers=_effective_n_jobs(n_jobs))
+    if backend == "process":
+        return ProcessPoolExecutor(max_workers=_effective_n_jobs(n_jobs))
+    raise ValueError(f"Unknown backend '{backend}'. Use 'thread' or 'process'.")
+
+
+def kmeans(
+    X: np.ndarray,
+    k: int,
+    max_iter: int = 300,
+    tol: float = 1e-4,
+    random_state: Optional[int] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    algorithm: str = "lloyd",
+    init: Union[str, np.ndarray] = "random",
+    return_n_iter: bool = False,
+    n_init: int = 1,
+    n_jobs: Optional[int] = None,
+    backend: str = "thread",
+    sample_weight: Optional[np.ndarray] = None,
+    label_change_tol: Optional[float] = None,
+    return_trace: bool = False,
+    return_summary: bool = False,
+):
+    """
+    Simple manual K-means implementation.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+        Sparse input is converted to CSR and never densified.
+    k : int
+        Number of clusters.
+    max_iter : int, default 300
+        Maximum number of iterations.
+    tol : float, default 1e-4
+        Convergence tolerance on centroid movement.
+    random_state : int or None
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Working-memory budget in bytes for the assignment step.
+    algorithm : {"lloyd", "elkan", "hamerly"}, default "lloyd"
+        "lloyd" recomputes every distance on every iteration. "elkan" and
+        "hamerly" keep triangle-inequality bounds to skip most distance
+        computations; they follow the same iterations as "lloyd" and give
+        the same labels (up to exact distance ties).
+    init : {"random", "k-means++", "k-means||"}, ndarray or str, default "random"
+        Centroid initialisation method, see ``init_centroids``. Passing
+        previous centroids (or a file saved by ``save_centroids``) warm-starts
+        the fit and keeps cluster ids stable between refits.
+    return_n_iter : bool, default False
+        If True, also return the number of iterations run.
+    n_init : int, default 1
+        Number of restarts from different initialisations. The run whose
+        last assignment has the lowest inertia is kept. With n_init > 1 the restart seeds are spawned
+        from random_state, so results are reproducible for a fixed seed.
+        Ignored for warm starts, whose restarts would all be identical.
+    n_jobs : int or None, default None
+        Number of workers. With n_init > 1 the restarts run in parallel;
+        with n_init == 1 the Lloyd assignment step is split into n_jobs row
+        shards on a thread pool. None means 1 and -1 means all CPUs.
+    backend : {"thread", "process"}, default "thread"
+        Worker pool used for the restarts when n_init > 1. With "process" a
+        dense X is placed in shared memory once and mapped by every worker.
+    sample_weight : ndarray of shape (n_samples,) or None
+        Non-negative weight of every sample. A sample with weight w counts
+        as w identical copies in the centroid means and the inertia.
+    label_change_tol : float or None, default None
+        Also stop once the fraction of samples whose label changed in an
+        iteration is at most this value (e.g. 0.001), which cuts the long
+        tail of iterations on plateaus. None only uses ``tol``.
+    return_trace : bool, default False
+        If True, also return the per-iteration trace of the kept run.
+    return_summary : bool, default False
+        If True, also return the ClusterSummary collected by the final
+        assignment pass, from which inertia and the quality metrics are
+        derived without another pass over X.
+
+    Returns
+    -------
+    labels : ndarray of shape (n_samples,)
+    centroids : ndarray of shape (k, n_features)
+    n_iter : int
+        Only returned if return_n_iter=True.
+    trace : dict of ndarray
+        Only returned if return_trace=True. One entry per iteration:
+        "inertia" of the assignment made in that iteration, "shift", the
+        norm of the centroid movement, "n_changed", the number of
+        samples whose label changed (all samples in the first iteration),
+        and "time", the wall time of the iteration in seconds.
+    summary : ClusterSummary
+        Only returned if return_summary=True.
+    """
+    X = _check_input(X)
+    if algorithm not in _KMEANS_ALGORITHMS:
+        raise ValueError(
+            f"Unknown algorithm '{algorithm}'. Use one of {_KMEANS_ALGORITHMS}."
+        )
+    if n_init <= 0:
+        raise ValueError("n_init must be a positive integer.")
+    if label_change_tol is not None and not 0.0 <= label_change_tol < 1.0:
+        raise ValueError("label_change_tol must be in [0, 1) or None.")
+    sample_weight = _check_sample_weight(sample_weight, X.shape[0])
+
+    args = (X, k, max_iter, tol)
+    options = (memory_budget, algorithm, init)
+    if n_init == 1 or not isinstance(init, str) or init not in _INIT_METHODS:
+        runs = [
+            _kmeans_single(
+                *args, random_state, *options, _effective_n_jobs(n_jobs), sample_weight,
+                label_change_tol,
+            )
+        ]
+    else:
+        seeds = _spawn_seeds(random_state, n_init)
+        # Process workers get X through shared memory instead of a pickled copy each
+        with shared_input(X, backend) as X_task, _make_executor(backend, n_jobs) as pool:
+            futures = [
+                pool.submit(
+                    _kmeans_single, X_task, k, max_iter, tol, seed, *options, 1,
+                    sample_weight, label_change_tol,
+                )
+                for seed in seeds
+            ]
+            runs = [future.result() for future in futures]
+
+    # Ties go to the earliest restart so the choice does not depend on scheduling
+    centroids, n_iter, trace = min(runs, key=_final_inertia)
+    # Only the kept centroids get a final pass, and a full summary only on request
+    if return_summary:
+        summary = summarise_clusters(
+            X, centroids, sample_weight=sample_weight, memory_budget=memory_budget
+        )
+        labels = summary.labels
+    else:
+        labels = assign_clusters(X, centroids, memory_budget=memory_budget)
+    result = (labels, centroids)
+    if return_n_iter:
+        result += (n_iter,)
+    if return_trace:
+        result += (trace,)
+    if return_summary:
+        result += (summary,)
+    return result
+
+
+def _open_feature_matrix(
+    source,
+    dtype=None,
+    n_features: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Open an on-disk feature matrix without reading it into memory.
+
+    ``source`` may be an ndarray/np.memmap (returned unchanged), a path to a
+    ``.npy`` file (memory-mapped read-only) or a path to a raw binary file,
+    in which case ``dtype`` and ``n_features`` describe its row layout.
+    """
+    if isinstance(source, np.ndarray):
+        X = source
+    elif isinstance(source, (str, os.PathLike)):
+        if str(source).endswith(".npy"):
+            X = np.load(source, mmap_mode="r")
+        else:
+            if dtype is None or n_features is None:
+                raise ValueError("Raw binary files need both dtype and n_features.")
+            X = np.memmap(source, dtype=dtype, mode="r").reshape(-1, n_features)
+    else:
+        raise TypeError("source must be a NumPy array, np.memmap or a file path.")
+
+    if X.ndim != 2:
+        raise ValueError("The feature matrix must be 2D (n_samples, n_features).")
+    return X
+
+
+def kmeans_out_of_core(
+    source,
+    k: int,
+    max_iter: int = 300,
+    tol: float = 1e-4,
+    random_state: Optional[int] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    init: Union[str, np.ndarray] = "random",
+    dtype=None,
+    n_features: Optional[int] = None,
+    labels_out: Optional[str] = None,
+    return_n_iter: bool = False,
+):
+    """
+    K-means over a feature matrix that does not fit in memory.
+
+    Every iteration streams X in row blocks sized to ``memory_budget``: each
+    block is assigned and folded into per-cluster sums and counts before the
+    next block is read, so only one block plus the centroids is ever held in
+    memory. Empty clusters are re-seeded from the k worst-served rows, which
+    are tracked across blocks.
+
+    Parameters
+    ----------
+    source : np.memmap, ndarray or str
+        Memory-mapped array, path to a ``.npy`` file, or path to a raw binary
+        file of row-major samples (then ``dtype`` and ``n_features`` are needed).
+    k : int
+        Number of clusters.
+    max_iter : int, default 300
+    tol : float, default 1e-4
+    random_state : int or None
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Bytes allowed for one block and its distance temporaries.
+    init : {"random", "k-means++", "k-means||"}, ndarray or str, default "random"
+        See ``init_centroids``. "k-means||" needs only a few passes and is
+        the better choice for large files; previous centroids warm-start.
+    dtype : numpy dtype or None
+        Element type of a raw binary file.
+    n_features : int or None
+        Row length of a raw binary file.
+    labels_out : str or None
+        If given, labels are written to this ``.npy`` file through a memory
+        map instead of being returned as an in-memory array.
+    return_n_iter : bool, default False
+        If True, also return the number of iterations run.
+
+    Returns
+    -------
+    labels : ndarray of shape (n_samples,)
+        A read/write np.memmap when ``labels_out`` is given.
+    centroids : ndarray of shape (k, n_features)
+    n_iter : int
+        Only returned if return_n_iter=True.
+    """
+    X = _open_feature_matrix(source, dtype=dtype, n_features=n_features)
+    n_samples, n_cols = X.shape
+    bytes_per_row = n_cols * X.itemsize + 2 * k * 8
+
+    centroids = init_centroids(
+        X, k, random_state=random_state, init=init, memory_budget=memory_budget,
+        low_memory=True,
+    )
+    centroids = np.array(centroids, dtype=np.result_type(X.dtype, np.float32))
+
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        sums = np.zeros((k, n_cols))
+        counts = np.zeros(k, dtype=np.int64)
+        far_rows = np.empty((0, n_cols), dtype=centroids.dtype)
+        far_sq = np.empty(0)
+
+        for rows in _row_blocks(n_samples, bytes_per_row, memory_budget):
+            block = np.asarray(X[rows])
+            labels, min_sq = nearest_centroids(block, centroids, memory_budget=memory_budget)
+            block_sums, block_counts = _cluster_sums(
+                block, labels, k, memory_budget=memory_budget
+            )
+            sums += block_sums
+            counts += block_counts
+
+            # Keep the k rows farthest from their centroid as re-seeding candidates
+            m = min(k, min_sq.shape[0])
+            top = np.argpartition(min_sq, -m)[-m:]
+            far_rows = np.vstack([far_rows, block[top]])
+            far_sq = np.concatenate([far_sq, min_sq[top]])
+            if far_sq.shape[0] > k:
+                top = np.argpartition(far_sq, -k)[-k:]
+                far_rows, far_sq = far_rows[top], far_sq[top]
+
+        new_centroids = _centroids_from_sums(far_rows, sums, counts, far_sq)
+        shift = np.linalg.norm(new_centroids - centroids)
+        centroids = new_centroids
+        if shift < tol:
+            break
+
+    if labels_out is not None:
+        labels = np.lib.format.open_memmap(
+            labels_out, mode="w+", dtype=np.intp, shape=(n_samples,)
+        )
+    else:
+        labels = np.empty(n_samples, dtype=np.intp)
+    for rows in _row_blocks(n_samples, bytes_per_row, memory_budget):
+        labels[rows], _ = nearest_centroids(
+            np.asarray(X[rows]), centroids, memory_budget=memory_budget
+        )
+    if labels_out is not None:
+        labels.flush()
+
+    if return_n_iter:
+        return labels, centroids, n_iter
+    return labels, centroids
+
+
+def _sq_distances(A: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Full matrix of squared Euclidean distances between rows of A and centroids.
+    """
+    sq = A @ centroids.T
+    sq *= -2.0
+    sq += _row_sq_norms(centroids)
+    sq += _row_sq_norms(A)[:, np.newaxis]
+    np.maximum(sq, 0.0, out=sq)
+    return sq
+
+
+class _KDTree:
+    """
+    Static kd-tree over the rows of X with per-cell summaries.
+
+    Nodes are stored in flat arrays in breadth-first order; every node covers
+    the contiguous range ``[start, end)`` of the reordered points ``Xp`` and
+    keeps its tight bounding box, point count and float64 coordinate sum.
+    Leaves have ``left == -1``.
+    """
+
+    def __init__(self, X: np.ndarray, leaf_size: int = 128) -> None:
+        if leaf_size <= 0:
+            raise ValueError("leaf_size must be a positive integer.")
+        n_samples = X.shape[0]
+        order = np.arange(n_samples)
+        start, end, left, depth = [0], [n_samples], [-1], [0]
+        box_lo, box_hi = [X.min(axis=0)], [X.max(axis=0)]
+
+        # Breadth-first median splits along the widest side of the cell. The
+        # split boxes only steer the choice of dimension; tight bounding boxes
+        # are computed bottom-up afterwards.
+        node = 0
+        while node < len(start):
+            s, e = start[node], end[node]
+            width = box_hi[node] - box_lo[node]
+            dim = int(np.argmax(width))
+            if e - s > leaf_size and width[dim] > 0:
+                idx = order[s:e]
+                values = X[idx, dim]
+                half = (e - s) // 2
+                part = np.argpartition(values, half)
+                order[s:e] = idx[part]
+                split = values[part[half]]
+
+                left[node] = len(start)
+                start += [s, s + half]
+                end += [s + half, e]
+                left += [-1, -1]
+                depth += [depth[node] + 1] * 2
+                hi_left, lo_right = box_hi[node].copy(), box_lo[node].copy()
+                hi_left[dim] = split
+                lo_right[dim] = split
+                box_lo += [box_lo[node], lo_right]
+                box_hi += [hi_left, box_hi[node]]
+            node += 1
+
+        self.order = order
+        self.Xp = np.ascontiguousarray(X[order])
+        self.start = np.array(start, dtype=np.intp)
+        self.end = np.array(end, dtype=np.intp)
+        self.left = np.array(left, dtype=np.intp)
+        self.count = self.end - self.start
+
+        n_nodes, n_features = len(start), X.shape[1]
+        self.lo = np.empty((n_nodes, n_features), dtype=self.Xp.dtype)
+        self.hi = np.empty((n_nodes, n_features), dtype=self.Xp.dtype)
+        self.sums = np.empty((n_nodes, n_features))
+
+        # Leaves partition the reordered points, so reduceat gives their summaries
+        leaves = np.flatnonzero(self.left < 0)
+        leaves = leaves[np.argsort(self.start[leaves])]
+        offsets = self.start[leaves]
+        self.lo[leaves] = np.minimum.reduceat(self.Xp, offsets, axis=0)
+        self.hi[leaves] = np.maximum.reduceat(self.Xp, offsets, axis=0)
+        self.sums[leaves] = np.add.reduceat(self.Xp, offsets, axis=0, dtype=np.float64)
+
+        # Internal nodes, one level at a time from the deepest
+        depth = np.array(depth)
+        for level in range(int(depth.max()) - 1, -1, -1):
+            parents = np.flatnonzero((depth == level) & (self.left >= 0))
+            a, b = self.left[parents], self.left[parents] + 1
+            self.lo[parents] = np.minimum(self.lo[a], self.lo[b])
+            self.hi[parents] = np.maximum(self.hi[a], self.hi[b])
+            self.sums[parents] = self.sums[a] + self.sums[b]
+
+    def filter(
+        self,
+        centroids: np.ndarray,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One filtering pass (Kanungo et al.): per-cluster sums and counts.
+
+        The tree is walked level by level. At each cell the candidate closest
+        to the cell midpoint is kept, and any candidate that is farther than
+        it from every corner of the cell is pruned. Cells left with a single
+        candidate contribute their summary in O(1); only leaves that still
+        have several candidates are resolved point by point.
+        """
+        k, n_features = centroids.shape
+        sums = np.zeros((k, n_features))
+        counts = np.zeros(k, dtype=np.int64)
+
+        nodes = np.zeros(1, dtype=np.intp)
+        cand = np.ones((1, k), dtype=bool)
+        while nodes.size > 0:
+            lo, hi = self.lo[nodes], self.hi[nodes]
+            dmid = _sq_distances(0.5 * (lo + hi), centroids)
+            dmid[~cand] = np.inf
+            best = np.argmin(dmid, axis=1)
+
+            bytes_per_node = 3 * k * n_features * 8
+            for block in _row_blocks(nodes.shape[0], bytes_per_node, memory_budget):
+                c_all = centroids[np.newaxis, :, :]
+                c_best = centroids[best[block]][:, np.newaxis, :]
+                # Corner of the cell furthest in the direction of (z - z*)
+                corner = np.where(c_all > c_best, hi[block][:, np.newaxis, :], lo[block][:, np.newaxis, :])
+                d_z = np.sum((c_all - corner) ** 2, axis=2)
+                d_best = np.sum((c_best - corner) ** 2, axis=2)
+                cand[block] &= d_z < d_best
+            cand[np.arange(nodes.shape[0]), best] = True
+
+            single = cand.sum(axis=1) == 1
+            if np.any(single):
+                cell_sums, _ = _cluster_sums(self.sums[nodes[single]], best[single], k)
+                sums += cell_sums
+                counts += np.bincount(best[single], weights=self.count[nodes[single]], minlength=k).astype(np.int64)
+
+            is_leaf = self.left[nodes] < 0
+            leaves = ~single & is_leaf
+            if np.any(leaves):
+                self._resolve_leaves(nodes[leaves], cand[leaves], centroids, sums, counts, memory_budget)
+
+            split = ~single & ~is_leaf
+            children = self.left[nodes[split]]
+            nodes = np.concatenate([children, children + 1])
+            cand = np.concatenate([cand[split], cand[split]])
+
+        return sums, counts
+
+    def _resolve_leaves(
+        self,
+        leaves: np.ndarray,
+        cand: np.ndarray,
+        centroids: np.ndarray,
+        sums: np.ndarray,
+        counts: np.ndarray,
+        memory_budget: int,
+    ) -> None:
+        """
+        Assign the points of leaves point by point, restricted to each leaf's candidates.
+        """
+        k = centroids.shape[0]
+        max_leaf = int(self.count[leaves].max())
+        bytes_per_leaf = max_leaf * (2 * k * 8 + self.Xp.shape[1] * self.Xp.itemsize)
+        for block in _row_blocks(leaves.shape[0], bytes_per_leaf, memory_budget):
+            starts = self.start[leaves[block]]
+            lengths = self.end[leaves[block]] - starts
+            offsets = np.cumsum(lengths) - lengths
+            points = np.arange(lengths.sum()) + np.repeat(starts - offsets, lengths)
+
+            pts = self.Xp[points]
+            sq = _sq_distances(pts, centroids)
+            sq[~np.repeat(cand[block], lengths, axis=0)] = np.inf
+            labels = np.argmin(sq, axis=1)
+            block_sums, block_counts = _cluster_sums(pts, labels, k)
+            sums += block_sums
+            counts += block_counts
+
+
+def kmeans_kdtree(
+    X: np.ndarray,
+    k: int,
+    max_iter: int = 300,
+    tol: float = 1e-4,
+    random_state: Optional[int] = None,
+    init: Union[str, np.ndarray] = "random",
+    leaf_size: int = 128,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    return_n_iter: bool = False,
+):
+    """
+    K-means with kd-tree filtering, for low-dimensional data.
+
+    A kd-tree with per-cell counts and sums is built once and reused by every
+    iteration; cells owned by a single centroid are added to its totals as a
+    whole instead of point by point. The iterations are exact Lloyd steps
+    and empty clusters are re-seeded at the worst-served points as in
+    ``kmeans``, so the result matches ``kmeans`` from the same
+    initialisation. Pruning
+    works best for roughly 2-8 features.
+
+    Parameters
+    ----------
+    X : ndarray of shape (n_samples, n_features)
+    k : int
+        Number of clusters.
+    max_iter : int, default 300
+    tol : float, default 1e-4
+    random_state : int or None
+    init : {"random", "k-means++", "k-means||"}, ndarray or str, default "random"
+        See ``init_centroids``.
+    leaf_size : int, default 128
+        Maximum number of points in a leaf cell.
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+    return_n_iter : bool, default False
+        If True, also return the number of iterations run.
+
+    Returns
+    -------
+    labels : ndarray of shape (n_samples,)
+    centroids : ndarray of shape (k, n_features)
+    n_iter : int
+        Only returned if return_n_iter=True.
+    """
+    if not isinstance(X, np.ndarray):
+        raise TypeError("X must be a NumPy array.")
+
+    centroids = init_centroids(
+        X, k, random_state=random_state, init=init, memory_budget=memory_budget
+    )
+    tree = _KDTree(X, leaf_size=leaf_size)
+
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        sums, counts = tree.filter(centroids, memory_budget=memory_budget)
+        min_sq = None
+        if np.any(counts == 0):
+            # Re-seed at the worst-served points, like kmeans; the tree does
+            # not keep per-point distances, so one exact pass provides them
+            _, min_sq = nearest_centroids(X, centroids, memory_budget=memory_budget)
+        new_centroids = _centroids_from_sums(X, sums, counts, min_sq)
+        shift = np.linalg.norm(new_centroids - centroids)
+        centroids = new_centroids
+        if shift < tol:
+            break
+
+    labels = assign_clusters(X, centroids, memory_budget=memory_budget)
+    if return_n_iter:
+        return labels, centroids, n_iter
+    return labels, centroids
+
+
+def _batched_init(
+    Xp: np.ndarray,
+    valid: np.ndarray,
+    k: int,
+    rng: np.random.RandomState,
+    init: str,
 ) -> np.ndarray:
     """
-    Initialise centroids by randomly sampling points from X without replacement.
+    Initial centroids for every problem of a padded (B, n, d) batch at once.
+
+    "random" picks k distinct valid rows per problem; "k-means++" makes the
+    k sequential draws for all problems together.
+    """
+    n_problems, n_rows, _ = Xp.shape
+    dtype = np.result_type(Xp.dtype, np.float32)
+    batch = np.arange(n_problems)
+
+    if init == "random":
+        keys = rng.random_sample((n_problems, n_rows))
+        keys[~valid] = np.inf
+        idx = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        return Xp[batch[:, np.newaxis], idx].astype(dtype)
+
+    centres = np.empty((n_problems, k, Xp.shape[2]), dtype=dtype)
+    weight = valid.astype(np.float64)
+    closest = np.ones((n_problems, n_rows))
+    x_sq = np.einsum("bnd,bnd->bn", Xp, Xp)
+    for i in range(k):
+        cumulative = np.cumsum(weight * closest, axis=1)
+        total = cumulative[:, -1]
+        # Problems whose rows all coincide with a centre draw uniformly
+        stuck = total <= 0
+        if np.any(stuck):
+            cumulative[stuck] = np.cumsum(weight[stuck], axis=1)
+            total = cumulative[:, -1]
+        target = rng.uniform(size=n_problems) * total
+        idx = np.minimum((cumulative <= target[:, np.newaxis]).sum(axis=1), n_rows - 1)
+        centres[:, i] = Xp[batch, idx]
+        new_sq = x_sq - 2.0 * np.einsum("bnd,bd->bn", Xp, centres[:, i])
+        new_sq += np.einsum("bd,bd->b", centres[:, i], centres[:, i])[:, np.newaxis]
+        np.maximum(new_sq, 0.0, out=new_sq)
+        closest = new_sq if i == 0 else np.minimum(closest, new_sq)
+    return centres
+
+
+def _batched_assign(
+    Xp: np.ndarray,
+    x_sq: np.ndarray,
+    centroids: np.ndarray,
+    problems: np.ndarray,
+    memory_budget: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nearest centroid of every row of the given problems, via batched GEMMs.
+
+    Problems are processed in groups whose (n, k) distance blocks fit in
+    ``memory_budget`` bytes. Returns labels and squared distances of shape
+    (len(problems), n).
+    """
+    n_rows, k = Xp.shape[1], centroids.shape[1]
+    dtype = np.result_type(Xp.dtype, centroids.dtype, np.float32)
+    labels = np.empty((problems.size, n_rows), dtype=np.intp)
+    min_sq = np.empty((problems.size, n_rows), dtype=dtype)
+    for group in _row_blocks(problems.size, 2 * n_rows * k * dtype.itemsize, memory_budget):
+        p = problems[group]
+        C = centroids[p]
+        sq = np.matmul(Xp[p], C.transpose(0, 2, 1))
+        sq *= -2.0
+        sq += np.einsum("bkd,bkd->bk", C, C)[:, np.newaxis, :]
+        labels[group] = np.argmin(sq, axis=2)
+        best = np.take_along_axis(sq, labels[group][:, :, np.newaxis], axis=2)[:, :, 0]
+        best += x_sq[p]
+        min_sq[group] = np.maximum(best, 0.0)
+    return labels, min_sq
+
+
+def kmeans_batched(
+    X: Union[np.ndarray, List[np.ndarray]],
+    k: int,
+    offsets: Optional[np.ndarray] = None,
+    max_iter: int = 300,
+    tol: float = 1e-4,
+    random_state: Optional[int] = None,
+    init: Union[str, np.ndarray] = "random",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    return_n_iter: bool = False,
+):
+    """
+    Lloyd K-means on many small independent datasets in one call.
+
+    All problems are iterated together: the assignment step is one batched
+    matrix product per group of problems and the update step one sparse
+    accumulation over every row, so the per-call Python overhead of looping
+    over ``kmeans`` is paid once. Each problem stops as soon as its own
+    centroid shift drops below ``tol``; converged problems are no longer
+    touched.
+
+    Parameters
+    ----------
+    X : ndarray or list of ndarray
+        The problems, in one of three layouts:
+
+        - a 3D array of shape (n_problems, n_samples, n_features);
+        - a 2D array of shape (total_samples, n_features) with ``offsets``,
+          where problem i is ``X[offsets[i]:offsets[i + 1]]``;
+        - a list of 2D arrays with the same number of features.
+
+        Ragged problems are padded to the longest one internally, so they
+        work best when the problem sizes are similar.
+    k : int
+        Number of clusters in every problem.
+    offsets : ndarray of shape (n_problems + 1,) or None
+        Row offsets for a 2D X, starting at 0 and ending at total_samples.
+    max_iter : int, default 300
+    tol : float, default 1e-4
+        Convergence tolerance on each problem's centroid movement.
+    random_state : int or None
+    init : {"random", "k-means++"} or ndarray, default "random"
+        Seeding applied to each problem independently, or starting
+        centroids of shape (n_problems, k, n_features).
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Working-memory budget in bytes for the distance blocks.
+    return_n_iter : bool, default False
+        If True, also return the iterations run by every problem.
+
+    Returns
+    -------
+    labels : ndarray or list of ndarray
+        Same layout as X: shape (n_problems, n_samples) for 3D input,
+        (total_samples,) with offsets, or a list of (n_i,) arrays.
+    centroids : ndarray of shape (n_problems, k, n_features)
+    n_iter : ndarray of shape (n_problems,)
+        Only returned if return_n_iter=True.
     """
     if k <= 0:
         raise ValueError("k must be a positive integer.")
-    n_samples = X.shape[0]
-    if k > n_samples:
-        raise ValueError("k cannot be larger than the number of samples.")
 
-    rng = np.random.RandomState(random_state)
-    indices = rng.choice(n_samples, size=k, replace=False)
-    return X[indices]
+    # Bring every layout to a padded (B, n, d) batch plus a validity mask
+    if isinstance(X, (list, tuple)):
+        if offsets is not None:
+            raise ValueError("offsets cannot be combined with a list of arrays.")
+        parts = [np.asarray(part) for part in X]
+        if not parts or any(part.ndim != 2 for part in parts):
+            raise ValueError("X must be a non-empty list of 2D arrays.")
+        lengths = np.array([part.shape[0] for part in parts])
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        X_flat = np.concatenate(parts, axis=0)
+    elif not isinstance(X, np.ndarray):
+        raise TypeError("X must be a NumPy array or a list of NumPy arrays.")
+    elif X.ndim == 3:
+        if offsets is not None:
+            raise ValueError("offsets can only be used with a 2D X.")
+        X_flat = None
+    elif X.ndim == 2:
+        if offsets is None:
+            raise ValueError("A 2D X needs offsets; use kmeans for a single problem.")
+        offsets = np.asarray(offsets, dtype=np.intp)
+        if (offsets.ndim != 1 or offsets.size < 2 or offsets[0] != 0
+                or offsets[-1] != X.shape[0] or np.any(np.diff(offsets) < 0)):
+            raise ValueError(
+                "offsets must be non-decreasing, start at 0 and end at X.shape[0]."
+            )
+        X_flat = X
+    else:
+        raise ValueError("X must be a 3D array, a 2D array with offsets or a list of arrays.")
+
+    if X_flat is None:
+        Xp = X
+        valid = np.ones(X.shape[:2], dtype=bool)
+    else:
+        lengths = np.diff(offsets)
+        problem = np.repeat(np.arange(lengths.size), lengths)
+        position = np.arange(X_flat.shape[0]) - offsets[problem]
+        Xp = np.zeros((lengths.size, max(1, lengths.max()), X_flat.shape[1]), dtype=X_flat.dtype)
+        Xp[problem, position] = X_flat
+        valid = np.zeros(Xp.shape[:2], dtype=bool)
+        valid[problem, position] = True
+
+    n_problems, n_rows, n_features = Xp.shape
+    if valid.sum(axis=1).min() < k:
+        raise ValueError("k cannot be larger than the number of samples of any problem.")
+
+    if isinstance(init, np.ndarray):
+        if init.shape != (n_problems, k, n_features):
+            raise ValueError(
+                f"init centroids must have shape ({n_problems}, {k}, {n_features}), "
+                f"got {init.shape}."
+            )
+        centroids = np.array(init, dtype=np.result_type(Xp.dtype, np.float32))
+    elif init in ("random", "k-means++"):
+        rng = np.random.RandomState(random_state)
+        centroids = _batched_init(Xp, valid, k, rng, init)
+    else:
+        raise ValueError(f"Unknown init '{init}'. Use 'random', 'k-means++' or an ndarray.")
+
+    x_sq = np.einsum("bnd,bnd->bn", Xp, Xp)
+    weight = valid.astype(np.float64)
+    n_iter = np.zeros(n_problems, dtype=np.intp)
+    active = np.arange(n_problems)
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        labels, min_sq = _batched_assign(Xp, x_sq, centroids, active, memory_budget)
+
+        # One accumulation for all active problems: cluster c of the j-th
+        # active problem is global cluster j * k + c
+        flat_labels = (labels + k * np.arange(active.size)[:, np.newaxis]).ravel()
+        sums, counts = _cluster_sums(
+            Xp[active].reshape(-1, n_features), flat_labels, active.size * k,
+            sample_weight=weight[active].ravel(),
+        )
+        sums = sums.reshape(active.size, k, n_features)
+        counts = counts.reshape(active.size, k)
+
+        new_centroids = np.zeros_like(sums)
+        non_empty = counts > 0
+        new_centroids[non_empty] = sums[non_empty] / counts[non_empty][:, np.newaxis]
+        # Empty clusters are rare: re-seed them problem by problem at the
+        # worst-served valid rows
+        for j in np.flatnonzero(~non_empty.all(axis=1)):
+            empty = np.flatnonzero(~non_empty[j])
+            dist = np.where(valid[active[j]], min_sq[j], -np.inf)
+            far = np.argsort(dist)[::-1][:empty.size]
+            new_centroids[j, empty] = Xp[active[j], np.resize(far, empty.size)]
+        new_centroids = new_centroids.astype(centroids.dtype, copy=False)
+
+        shift = np.linalg.norm((new_centroids - centroids[active]).reshape(active.size, -1), axis=1)
+        centroids[active] = new_centroids
+        n_iter[active] += 1
+        active = active[shift >= tol]
 
+    labels, _ = _batched_assign(Xp, x_sq, centroids, np.arange(n_problems), memory_budget)
 
-def assign_clusters(X: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # Return the labels in the layout of the input
+    if X_flat is not None:
+        labels = labels[valid]
+        if isinstance(X, (list, tuple)):
+            labels = np.split(labels, offsets[1:-1])
+    if return_n_iter:
+        return labels, centroids, n_iter
+    return labels, centroids
+
+
+class BisectingTree:
     """
-    Assign each sample to the nearest centroid (Euclidean distance).
+    Binary split tree produced by ``bisecting_kmeans``.
+
+    Node 0 is the root (the whole dataset); every split appends two child
+    nodes. Each internal node stores the hyperplane that separates its two
+    children, so a sample descends by one dot product per level.
+
+    Attributes
+    ----------
+    centres : ndarray of shape (n_nodes, n_features)
+        Centre of each node: the data mean for the root, and the 2-means
+        centroids for the children of every split.
+    children : ndarray of shape (n_nodes, 2)
+        Indices of the two children, or -1 for leaves.
+    labels : ndarray of shape (n_nodes,)
+        Cluster label of each leaf, or -1 for internal nodes.
+    counts : ndarray of shape (n_nodes,)
+        Number (or total weight) of training samples in each node.
+    sse : ndarray of shape (n_nodes,)
+        Sum of squared distances of the node's samples to its centre.
     """
-    # X: (n_samples, n_features)
-    # centroids: (k, n_features)
-    # Broadcast to compute distances
-    diff = X[:, np.newaxis, :] - centroids[np.newaxis, :, :]
-    distances = np.linalg.norm(diff, axis=2)  # (n_samples, k)
-    labels = np.argmin(distances, axis=1)
-    return labels
 
+    def __init__(self, n_features: int, dtype) -> None:
+        self.centres = np.empty((0, n_features), dtype=dtype)
+        self.children = np.empty((0, 2), dtype=np.intp)
+        self.labels = np.empty(0, dtype=np.intp)
+        self.counts = np.empty(0)
+        self.sse = np.empty(0)
 
-def update_centroids(
+    def _add(self, centres: np.ndarray, counts: np.ndarray, sse: np.ndarray) -> np.ndarray:
+        """Append nodes and return their indices."""
+        start = self.centres.shape[0]
+        self.centres = np.vstack([self.centres, centres])
+        self.children = np.vstack([self.children, np.full((len(counts), 2), -1)])
+        self.labels = np.concatenate([self.labels, np.full(len(counts), -1)])
+        self.counts = np.concatenate([self.counts, counts])
+        self.sse = np.concatenate([self.sse, sse])
+        return np.arange(start, start + len(counts))
+
+    @property
+    def n_leaves(self) -> int:
+        return int(np.count_nonzero(self.children[:, 0] < 0))
+
+    def _leaf_of(self, X, memory_budget: int) -> np.ndarray:
+        """Leaf node reached by every row of X."""
+        n_samples = X.shape[0]
+        left, right = self.children[:, 0], self.children[:, 1]
+        internal = left >= 0
+        # Go right when the sample is strictly closer to the right child
+        direction = np.zeros_like(self.centres)
+        threshold = np.zeros(self.centres.shape[0])
+        direction[internal] = self.centres[right[internal]] - self.centres[left[internal]]
+        threshold[internal] = 0.5 * (
+            _row_sq_norms(self.centres[right[internal]])
+            - _row_sq_norms(self.centres[left[internal]])
+        )
+
+        node = np.zeros(n_samples, dtype=np.intp)
+        bytes_per_row = 2 * X.shape[1] * max(8, self.centres.itemsize)
+        for rows in _row_blocks(n_samples, bytes_per_row, memory_budget):
+            block, block_node = X[rows], node[rows]
+            moving = np.flatnonzero(internal[block_node])
+            while moving.size > 0:
+                at = block_node[moving]
+                if sparse.issparse(block):
+                    proj = np.asarray(block[moving].multiply(direction[at]).sum(axis=1)).ravel()
+                else:
+                    proj = np.einsum("ij,ij->i", block[moving], direction[at])
+                go_right = proj > threshold[at]
+                block_node[moving] = np.where(go_right, right[at], left[at])
+                moving = moving[internal[block_node[moving]]]
+            node[rows] = block_node
+        return node
+
+    def predict(self, X, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> np.ndarray:
+        """
+        Cluster labels by descending the tree, O(depth) per sample.
+
+        At every internal node the sample moves to the nearer of the two
+        child centres. Training samples get the labels returned by the fit;
+        new samples may differ from a flat nearest-centroid search.
+        """
+        X = _check_input(X)
+        if X.ndim != 2 or X.shape[1] != self.centres.shape[1]:
+            raise ValueError(f"X must be a 2D array with {self.centres.shape[1]} features.")
+        return self.labels[self._leaf_of(X, memory_budget)]
+
+
+def _two_means(
+    X: np.ndarray,
+    x_sq: np.ndarray,
+    max_iter: int,
+    tol: float,
+    random_state: int,
+    init: str,
+    memory_budget: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lloyd 2-means specialised for bisection.
+
+    With two centres the assignment is a single hyperplane test, one
+    matrix-vector product per iteration, and the second cluster's sum is the
+    total minus the first's. The test is the one ``BisectingTree`` uses to
+    descend, so tree predictions reproduce the fitted labels exactly.
+
+    Returns the two centres, the side (0/1) of every row, and the per-side
+    counts and sums of squared distances.
+    """
+    n_samples = X.shape[0]
+    centres = init_centroids(
+        X, 2, random_state=random_state, init=init, memory_budget=memory_budget
+    ).astype(np.float64)
+    total = np.asarray(X.sum(axis=0), dtype=np.float64).ravel()
+
+    def split(centres: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        direction = centres[1] - centres[0]
+        threshold = 0.5 * (centres[1] @ centres[1] - centres[0] @ centres[0])
+        right = np.asarray(X @ direction.astype(X.dtype)).ravel() > threshold
+        n_right = float(np.count_nonzero(right))
+        right_sum = np.asarray(right.astype(np.float64) @ X, dtype=np.float64).ravel()
+        return right, right_sum, n_right
+
+    for _ in range(max_iter):
+        right, right_sum, n_right = split(centres)
+        if n_right in (0, n_samples):
+            # One side is empty: restart it at the row farthest from the other centre
+            full = 0 if n_right == 0 else 1
+            far_sq = x_sq - 2.0 * np.asarray(X @ centres[full].astype(X.dtype)).ravel()
+            new_centres = centres.copy()
+            new_centres[1 - full] = _dense_rows(X, [int(np.argmax(far_sq))])[0]
+        else:
+            new_centres = np.vstack([
+                (total - right_sum) / (n_samples - n_right),
+                right_sum / n_right,
+            ])
+        shift = np.linalg.norm(new_centres - centres)
+        centres = new_centres
+        if shift < tol:
+            break
+
+    centres = centres.astype(np.result_type(X.dtype, np.float32))
+    right, right_sum, n_right = split(centres.astype(np.float64))
+    counts = np.array([n_samples - n_right, n_right])
+    sums = np.vstack([total - right_sum, right_sum])
+    right_sq = float(x_sq[right].sum(dtype=np.float64))
+    sq = np.array([float(x_sq.sum(dtype=np.float64)) - right_sq, right_sq])
+    c64 = centres.astype(np.float64)
+    sse = sq - 2.0 * np.einsum("ij,ij->i", c64, sums) + counts * np.einsum("ij,ij->i", c64, c64)
+    return centres, right.astype(np.intp), counts, np.maximum(sse, 0.0)
+
+
+_BISECTING_STRATEGIES = ("largest_sse", "largest_cluster")
+
+
+def bisecting_kmeans(
     X: np.ndarray,
-    labels: np.ndarray,
     k: int,
+    max_iter: int = 300,
+    tol: float = 1e-4,
     random_state: Optional[int] = None,
-) -> np.ndarray:
+    init: str = "random",
+    n_init: int = 1,
+    bisecting_strategy: str = "largest_sse",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    return_tree: bool = False,
+):
     """
-    Update centroids by taking the mean of points in each cluster.
-    If a cluster becomes empty, re-initialise its centroid randomly from X.
+    Bisecting K-means: grow k clusters by repeatedly splitting one in two.
+
+    Starting from a single cluster, the cluster chosen by
+    ``bisecting_strategy`` is split with 2-means until there are k clusters.
+    Each split only touches the samples of one cluster, so a whole fit costs
+    about O(n log k) distance evaluations for balanced splits instead of
+    O(n k) per Lloyd iteration.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+    k : int
+        Number of clusters.
+    max_iter : int, default 300
+        Maximum iterations of each 2-means split.
+    tol : float, default 1e-4
+    random_state : int or None
+    init : {"random", "k-means++", "k-means||"}, default "random"
+        Initialisation of each 2-means split.
+    n_init : int, default 1
+        Restarts per split; the split with the lower SSE is kept.
+    bisecting_strategy : {"largest_sse", "largest_cluster"}, default "largest_sse"
+        Split the cluster with the highest sum of squared errors, or the one
+        with the most samples.
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+    return_tree : bool, default False
+        If True, also return the BisectingTree of the splits.
+
+    Returns
+    -------
+    labels : ndarray of shape (n_samples,)
+        Leaves are labelled 0..k-1 in depth-first order, so clusters that
+        share a parent get adjacent labels.
+    centroids : ndarray of shape (k, n_features)
+    tree : BisectingTree
+        Only returned if return_tree=True. ``tree.predict(X)`` reproduces
+        ``labels``.
     """
-    n_features = X.shape[1]
-    new_centroids = np.zeros((k, n_features), dtype=float)
+    X = _check_input(X)
+    if k <= 0:
+        raise ValueError("k must be a positive integer.")
+    if k > X.shape[0]:
+        raise ValueError("k cannot be larger than the number of samples.")
+    if bisecting_strategy not in _BISECTING_STRATEGIES:
+        raise ValueError(
+            f"Unknown bisecting_strategy '{bisecting_strategy}'. "
+            f"Use one of {_BISECTING_STRATEGIES}."
+        )
+
     rng = np.random.RandomState(random_state)
+    dtype = np.result_type(X.dtype, np.float32)
+    tree = BisectingTree(X.shape[1], dtype)
+    mean = np.asarray(X.mean(axis=0), dtype=np.float64).reshape(1, -1)
+    _, root_sq = nearest_centroids(X, mean, memory_budget=memory_budget)
+    tree._add(mean.astype(dtype), np.array([X.shape[0]], dtype=np.float64), [root_sq.sum()])
+    members = {0: np.arange(X.shape[0])}
+    x_sq = _row_sq_norms(X)
 
-    for cluster_id in range(k):
-        mask = labels == cluster_id
-        if not np.any(mask):
-            # Empty cluster: re-initialise randomly
-            idx = rng.randint(0, X.shape[0])
-            new_centroids[cluster_id] = X[idx]
+    for _ in range(k - 1):
+        leaves = [node for node, rows in members.items() if rows.size >= 2]
+        if not leaves:
+            raise ValueError("No cluster left with two or more samples to split.")
+        score = tree.sse if bisecting_strategy == "largest_sse" else tree.counts
+        node = max(leaves, key=lambda leaf: (score[leaf], -leaf))
+        rows = members.pop(node)
+
+        X_node = X[rows]
+        best = None
+        for _ in range(n_init):
+            split = _two_means(
+                X_node, x_sq[rows], max_iter, tol, rng.randint(2 ** 31 - 1), init, memory_budget
+            )
+            if best is None or split[3].sum() < best[3].sum():
+                best = split
+        centres, side, counts, sse = best
+        children = tree._add(centres, counts, sse)
+        tree.children[node] = children
+        members[children[0]] = rows[side == 0]
+        members[children[1]] = rows[side == 1]
+
+    # Label the leaves in depth-first, left-to-right order
+    stack, label = [0], 0
+    while stack:
+        node = stack.pop()
+        if tree.children[node, 0] < 0:
+            tree.labels[node] = label
+            label += 1
         else:
-            new_centroids[cluster_id] = X[mask].mean(axis=0)
+            stack.extend(tree.children[node, ::-1])
 
-    return new_centroids
+    labels = np.empty(X.shape[0], dtype=np.intp)
+    for node, rows in members.items():
+        labels[rows] = tree.labels[node]
+    leaves = np.flatnonzero(tree.labels >= 0)
+    centroids = np.empty((k, X.shape[1]), dtype=dtype)
+    centroids[tree.labels[leaves]] = tree.centres[leaves]
+
+    if return_tree:
+        return labels, centroids, tree
+    return labels, centroids
 
 
-def kmeans(
+class MiniBatchKMeans:
+    """
+    Streaming mini-batch K-means with per-centroid learning rates.
+
+    Each call to ``partial_fit`` assigns one batch to the current centroids
+    and moves every centroid towards the mean of its new points with a
+    learning rate of (points in this batch) / (points seen so far), so each
+    centroid is the running mean of everything ever assigned to it.
+
+    Parameters
+    ----------
+    k : int
+        Number of clusters.
+    tol : float, default 1e-4
+        Convergence tolerance on the mean centroid shift over the window.
+    window : int, default 10
+        Number of most recent batches used for the convergence check.
+    random_state : int or None
+        Used to pick the initial centroids from the first batch.
+    centroids : ndarray of shape (k, n_features) or None
+        Starting centroids. If None, they are sampled from the first batch.
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Working-memory budget in bytes for the assignment step.
+
+    Attributes
+    ----------
+    centroids : ndarray of shape (k, n_features) or None
+    counts : ndarray of shape (k,)
+        Number of samples assigned to each centroid so far.
+    n_batches : int
+        Number of batches seen.
+    converged : bool
+        True once the mean centroid shift over the last ``window`` batches
+        is below ``tol``.
+    """
+
+    def __init__(
+        self,
+        k: int,
+        tol: float = 1e-4,
+        window: int = 10,
+        random_state: Optional[int] = None,
+        centroids: Optional[np.ndarray] = None,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> None:
+        if k <= 0:
+            raise ValueError("k must be a positive integer.")
+        if window <= 0:
+            raise ValueError("window must be a positive integer.")
+        self.k = k
+        self.tol = tol
+        self.window = window
+        self.random_state = random_state
+        self.memory_budget = memory_budget
+        self.centroids = None if centroids is None else np.array(centroids, dtype=float)
+        self.counts = np.zeros(k, dtype=np.int64)
+        self.n_batches = 0
+        self.converged = False
+        self._shifts: deque = deque(maxlen=window)
+
+    def partial_fit(self, batch: np.ndarray) -> "MiniBatchKMeans":
+        """
+        Update the centroids with one batch of samples.
+        """
+        if not isinstance(batch, np.ndarray):
+            raise TypeError("batch must be a NumPy array.")
+        if self.centroids is None:
+            self.centroids = np.array(
+                init_centroids(batch, self.k, random_state=self.random_state), dtype=float
+            )
+
+        labels, _ = nearest_centroids(batch, self.centroids, memory_budget=self.memory_budget)
+        sums, counts = _cluster_sums(batch, labels, self.k)
+        self.counts += counts
+
+        hit = counts > 0
+        step = np.zeros_like(self.centroids)
+        step[hit] = (sums[hit] - counts[hit, np.newaxis] * self.centroids[hit]) / self.counts[
+            hit, np.newaxis
+        ]
+        self.centroids += step
+        self.n_batches += 1
+
+        self._shifts.append(float(np.linalg.norm(step)))
+        self.converged = (
+            len(self._shifts) == self.window and float(np.mean(self._shifts)) < self.tol
+        )
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Assign samples to the nearest learned centroid.
+        """
+        if self.centroids is None:
+            raise ValueError("MiniBatchKMeans has not seen any data yet.")
+        return assign_clusters(X, self.centroids, memory_budget=self.memory_budget)
+
+
+def minibatch_kmeans(
     X: np.ndarray,
     k: int,
-    max_iter: int = 300,
+    batch_size: int = 1024,
+    max_iter: int = 100,
     tol: float = 1e-4,
+    window: int = 10,
     random_state: Optional[int] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Simple manual K-means implementation.
+    Mini-batch K-means over an in-memory array.
+
+    Shuffled batches are fed to ``MiniBatchKMeans.partial_fit`` until the
+    windowed convergence check passes or ``max_iter`` passes over X are done.
 
     Parameters
     ----------
     X : ndarray of shape (n_samples, n_features)
     k : int
         Number of clusters.
-    max_iter : int, default 300
-        Maximum number of iterations.
+    batch_size : int, default 1024
+    max_iter : int, default 100
+        Maximum number of passes over X.
     tol : float, default 1e-4
-        Convergence tolerance on centroid movement.
+    window : int, default 10
     random_state : int or None
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
 
     Returns
     -------
@@ -98,28 +2356,43 @@ def kmeans(
     """
     if not isinstance(X, np.ndarray):
         raise TypeError("X must be a NumPy array.")
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer.")
 
-    centroids = init_centroids(X, k, random_state=random_state)
+    rng = np.random.RandomState(random_state)
+    model = MiniBatchKMeans(
+        k,
+        tol=tol,
+        window=window,
+        centroids=init_centroids(X, k, random_state=random_state),
+        memory_budget=memory_budget,
+    )
+    n_samples = X.shape[0]
     for _ in range(max_iter):
-        labels = assign_clusters(X, centroids)
-        new_centroids = update_centroids(X, labels, k, random_state=random_state)
-        shift = np.linalg.norm(new_centroids - centroids)
-        centroids = new_centroids
-        if shift < tol:
+        order = rng.permutation(n_samples)
+        for start in range(0, n_samples, batch_size):
+            model.partial_fit(X[order[start:start + batch_size]])
+            if model.converged:
+                break
+        if model.converged:
             break
 
-    labels = assign_clusters(X, centroids)
-    return labels, centroids
+    labels = model.predict(X)
+    return labels, model.centroids.astype(np.result_type(X.dtype, np.float32), copy=False)
 
 
 def sklearn_kmeans(
     X: np.ndarray,
     k: int,
     random_state: Optional[int] = None,
+    sample_weight: Optional[np.ndarray] = None,
+    n_init: int = 10,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Thin wrapper around scikit-learn's KMeans.
 
+    n_init is the number of restarts scikit-learn runs, keeping the best.
+
     Returns
     -------
     labels : ndarray of shape (n_samples,)
@@ -131,9 +2404,9 @@ def sklearn_kmeans(
     model = KMeans(
         n_clusters=k,
         random_state=random_state,
-        n_init=10,
+        n_init=n_init,
     )
-    model.fit(X)
+    model.fit(X, sample_weight=sample_weight)
     labels = model.labels_
     centroids = model.cluster_centers_
     return labels, centroids
\ No newline at end of file
@@ -0,0 +1,272 @@
+###
+## cluster_maker
+## James Foadi - University of Bath
+## November 2025
+###
+
+from __future__ import annotations
+
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from .algorithms import (
+    DEFAULT_MEMORY_BUDGET,
+    kmeans,
+    init_centroids,
+    nearest_centroids,
+    _check_input,
+    _cluster_sums,
+    _centroids_from_sums,
+    _row_blocks,
+    _row_sq_norms,
+)
+
+
+class IVFIndex:
+    """
+    Inverted-file index for approximate nearest-centroid search.
+
+    The centroids are grouped into ``n_lists`` cells by a coarse K-means over
+    the centroids themselves. A query is compared with the coarse centres
+    first and then only with the centroids in its ``n_probe`` nearest cells,
+    so a search costs about ``n_lists + n_probe * k / n_lists`` distances per
+    sample instead of ``k``.
+
+    Parameters
+    ----------
+    centroids : ndarray of shape (k, n_features)
+    n_lists : int or None
+        Number of coarse cells. None uses ``round(sqrt(k))``.
+    random_state : int or None
+        Seed of the coarse K-means.
+    coarse_init : ndarray of shape (n_lists, n_features) or None
+        Starting coarse centres, e.g. from the index of the previous
+        iteration, so rebuilding after small centroid moves is cheap.
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+
+    Attributes
+    ----------
+    coarse_centres : ndarray of shape (n_lists, n_features)
+    order : ndarray of shape (k,)
+        Centroid ids sorted by cell.
+    offsets : ndarray of shape (n_lists + 1,)
+        Cell ``c`` holds the centroids ``order[offsets[c]:offsets[c + 1]]``.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        n_lists: Optional[int] = None,
+        random_state: Optional[int] = None,
+        coarse_init: Optional[np.ndarray] = None,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> None:
+        centroids = np.asarray(centroids)
+        if centroids.ndim != 2:
+            raise ValueError("centroids must be a 2D array of shape (k, n_features).")
+        k = centroids.shape[0]
+        if n_lists is None:
+            n_lists = int(round(np.sqrt(k))) if coarse_init is None else coarse_init.shape[0]
+        if not 1 <= n_lists <= k:
+            raise ValueError("n_lists must be between 1 and the number of centroids.")
+
+        cells, coarse = kmeans(
+            centroids, n_lists, max_iter=20, random_state=random_state,
+            init="k-means++" if coarse_init is None else coarse_init,
+            memory_budget=memory_budget,
+        )
+        self.centroids = centroids
+        self.c_sq_norms = _row_sq_norms(centroids)
+        self.coarse_centres = coarse
+        self.order = np.argsort(cells, kind="stable")
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(cells, minlength=n_lists))])
+
+    @property
+    def n_lists(self) -> int:
+        return self.coarse_centres.shape[0]
+
+    def search(
+        self,
+        X,
+        n_probe: int = 1,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate nearest centroid of every row of X.
+
+        Parameters
+        ----------
+        X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+        n_probe : int, default 1
+            Number of nearest cells searched per sample: the recall/speed
+            knob. ``n_probe == n_lists`` is an exact search.
+        memory_budget : int, default DEFAULT_MEMORY_BUDGET
+
+        Returns
+        -------
+        labels : ndarray of shape (n_samples,)
+        min_sq_distances : ndarray of shape (n_samples,)
+            Squared distance to the returned centroid.
+        """
+        X = _check_input(X)
+        if X.ndim != 2 or X.shape[1] != self.centroids.shape[1]:
+            raise ValueError(f"X must be a 2D array with {self.centroids.shape[1]} features.")
+        if n_probe <= 0:
+            raise ValueError("n_probe must be a positive integer.")
+        n_probe = min(n_probe, self.n_lists)
+
+        n_samples = X.shape[0]
+        dtype = np.result_type(X.dtype, self.centroids.dtype, np.float32)
+        labels = np.empty(n_samples, dtype=np.intp)
+        min_sq = np.empty(n_samples, dtype=dtype)
+        coarse_sq_norms = _row_sq_norms(self.coarse_centres)
+        longest = int(np.diff(self.offsets).max())
+        bytes_per_row = 2 * (self.n_lists + n_probe * longest) * dtype.itemsize
+
+        for rows in _row_blocks(n_samples, bytes_per_row, memory_budget):
+            Xb = X[rows]
+            coarse_sq = np.asarray(Xb @ self.coarse_centres.T) * -2.0 + coarse_sq_norms
+            if n_probe < self.n_lists:
+                probes = np.argpartition(coarse_sq, n_probe - 1, axis=1)[:, :n_probe]
+            else:
+                probes = np.broadcast_to(np.arange(self.n_lists), coarse_sq.shape)
+
+            # Group the (sample, cell) pairs by cell: one GEMM per cell
+            query = np.repeat(np.arange(Xb.shape[0]), n_probe)
+            cell = probes.ravel()
+            by_cell = np.argsort(cell, kind="stable")
+            query, cell = query[by_cell], cell[by_cell]
+            bounds = np.searchsorted(cell, np.arange(self.n_lists + 1))
+
+            best = np.full(Xb.shape[0], np.inf, dtype=dtype)
+            best_label = np.zeros(Xb.shape[0], dtype=np.intp)
+            for c in np.flatnonzero(np.diff(bounds)):
+                q = query[bounds[c]:bounds[c + 1]]
+                members = self.order[self.offsets[c]:self.offsets[c + 1]]
+                if members.size == 0:
+                    continue
+                sq = np.asarray(Xb[q] @ self.centroids[members].T)
+                sq *= -2.0
+                sq += self.c_sq_norms[members]
+                j = np.argmin(sq, axis=1)
+                value = sq[np.arange(q.size), j]
+                better = value < best[q]
+                best[q[better]] = value[better]
+                best_label[q[better]] = members[j[better]]
+
+            labels[rows] = best_label
+            min_sq[rows] = np.maximum(best + _row_sq_norms(Xb), 0.0)
+        return labels, min_sq
+
+    def mismatch_fraction(
+        self,
+        X,
+        labels: np.ndarray,
+        n_check: Optional[int] = 1000,
+        random_state: Optional[int] = None,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> float:
+        """
+        Fraction of ``labels`` that differ from an exact nearest-centroid search.
+
+        The exact search is run on ``n_check`` rows drawn without replacement,
+        so the estimate costs ``n_check * k`` distances; None (or a value of
+        at least n_samples) checks every row.
+        """
+        X = _check_input(X)
+        n_samples = X.shape[0]
+        if n_check is None or n_check >= n_samples:
+            rows = np.arange(n_samples)
+        else:
+            rows = np.sort(np.random.RandomState(random_state).choice(n_samples, n_check, replace=False))
+        exact, _ = nearest_centroids(
+            X[rows], self.centroids, memory_budget=memory_budget, c_sq_norms=self.c_sq_norms
+        )
+        return float(np.mean(exact != labels[rows]))
+
+
+def kmeans_ivf(
+    X,
+    k: int,
+    n_probe: int = 8,
+    n_lists: Optional[int] = None,
+    max_iter: int = 300,
+    tol: float = 1e-4,
+    random_state: Optional[int] = None,
+    init: Union[str, np.ndarray] = "random",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    n_check: Optional[int] = 1000,
+    return_n_iter: bool = False,
+    return_mismatch: bool = False,
+):
+    """
+    K-means with approximate assignment through an IVFIndex, for very large k.
+
+    Every iteration rebuilds the coarse index over the current centroids
+    (warm-started from the previous coarse centres) and assigns each sample
+    to the nearest centroid among its ``n_probe`` nearest cells. Intended for
+    vector quantisation with thousands to tens of thousands of centroids,
+    where exact assignment against every centroid dominates the run time.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+    k : int
+        Number of clusters.
+    n_probe : int, default 8
+        Cells searched per sample. Larger values raise recall and cost.
+    n_lists : int or None
+        Number of coarse cells; None uses ``round(sqrt(k))``.
+    max_iter : int, default 300
+    tol : float, default 1e-4
+    random_state : int or None
+    init : {"random", "k-means++", "k-means||"}, ndarray or str, default "random"
+        See ``init_centroids``.
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+    n_check : int or None, default 1000
+        Rows checked against exact search for the reported mismatch.
+    return_n_iter : bool, default False
+        If True, also return the number of iterations run.
+    return_mismatch : bool, default False
+        If True, also return the estimated fraction of final labels that
+        differ from exact nearest-centroid search.
+
+    Returns
+    -------
+    labels : ndarray of shape (n_samples,)
+    centroids : ndarray of shape (k, n_features)
+    n_iter : int
+        Only returned if return_n_iter=True.
+    mismatch : float
+        Only returned if return_mismatch=True.
+    """
+    X = _check_input(X)
+    rng = np.random.RandomState(random_state)
+    centroids = init_centroids(
+        X, k, random_state=rng.randint(2 ** 31 - 1), init=init, memory_budget=memory_budget
+    )
+    index_seed = rng.randint(2 ** 31 - 1)
+
+    coarse = None
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        index = IVFIndex(centroids, n_lists, index_seed, coarse, memory_budget)
+        coarse = index.coarse_centres
+        labels, min_sq = index.search(X, n_probe, memory_budget)
+        sums, counts = _cluster_sums(X, labels, k)
+        new_centroids = _centroids_from_sums(X, sums, counts, min_sq)
+        shift = np.linalg.norm(new_centroids - centroids)
+        centroids = new_centroids
+        if shift < tol:
+            break
+
+    index = IVFIndex(centroids, n_lists, index_seed, coarse, memory_budget)
+    labels, _ = index.search(X, n_probe, memory_budget)
+
+    result = (labels, centroids)
+    if return_n_iter:
+        result += (n_iter,)
+    if return_mismatch:
+        result += (index.mismatch_fraction(X, labels, n_check, index_seed, memory_budget),)
+    return result
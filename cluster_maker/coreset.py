@@ -0,0 +1,174 @@
+###
+## cluster_maker
+## James Foadi - University of Bath
+## November 2025
+###
+
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from .algorithms import (
+    DEFAULT_MEMORY_BUDGET,
+    init_centroids,
+    nearest_centroids,
+    _row_blocks,
+    _row_sq_norms,
+)
+
+_CORESET_METHODS = ("lightweight", "sensitivity")
+
+
+def _stream_sample(
+    X: np.ndarray,
+    block_scores: Callable[[np.ndarray], np.ndarray],
+    total_score: float,
+    size: int,
+    rng: np.random.RandomState,
+    memory_budget: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw ``size`` rows i.i.d. with probability score / total_score in one pass.
+
+    Each block receives a Binomial share of the remaining draws, in proportion
+    to its share of the remaining score, and samples within itself. This is
+    equivalent to sampling from the full distribution but never needs the
+    scores of more than one block at a time.
+
+    Returns the distinct sampled row indices and their weights
+    ``(number of draws) * total_score / (size * score)``.
+    """
+    n_samples = X.shape[0]
+    picked, scores_picked = [], []
+    remaining_size, remaining_score = size, total_score
+
+    for rows in _row_blocks(n_samples, X.shape[1] * X.itemsize * 2, memory_budget):
+        if remaining_size == 0:
+            break
+        scores = block_scores(np.asarray(X[rows]))
+        block_total = float(scores.sum())
+        if rows.stop == n_samples or remaining_score <= 0:
+            share = 1.0
+        else:
+            share = min(1.0, block_total / remaining_score)
+        n_draws = rng.binomial(remaining_size, share)
+        remaining_size -= n_draws
+        remaining_score -= block_total
+        if n_draws > 0 and block_total > 0:
+            draws = rng.choice(scores.shape[0], size=n_draws, p=scores / block_total)
+            picked.append(draws + rows.start)
+            scores_picked.append(scores[draws])
+
+    idx = np.concatenate(picked)
+    scores_picked = np.concatenate(scores_picked)
+    unique, first, n_draws = np.unique(idx, return_index=True, return_counts=True)
+    weights = n_draws * total_score / (size * scores_picked[first])
+    return unique, weights
+
+
+def build_coreset(
+    X: np.ndarray,
+    size: int,
+    method: str = "lightweight",
+    k: Optional[int] = None,
+    random_state: Optional[int] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build a weighted coreset: a small weighted sample whose weighted K-means
+    cost approximates the cost on the full data for any set of centroids.
+
+    Parameters
+    ----------
+    X : ndarray of shape (n_samples, n_features)
+        May be a memory-mapped array; X is only read in row blocks.
+    size : int
+        Number of i.i.d. draws. Repeated draws are merged, so the coreset can
+        have fewer rows than this.
+    method : {"lightweight", "sensitivity"}, default "lightweight"
+        "lightweight" (Bachem et al., 2018) samples in proportion to a mix of
+        a uniform term and the squared distance to the data mean, and needs
+        two passes over X. "sensitivity" bounds each point's sensitivity
+        from a rough k-means|| solution; it needs k and a few more passes
+        but gives tighter approximations on strongly clustered data.
+    k : int or None
+        Number of clusters. Required for method="sensitivity".
+    random_state : int or None
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+
+    Returns
+    -------
+    points : ndarray of shape (m, n_features)
+    weights : ndarray of shape (m,)
+        Positive weights summing approximately to n_samples.
+    """
+    if not isinstance(X, np.ndarray):
+        raise TypeError("X must be a NumPy array.")
+    if X.ndim != 2:
+        raise ValueError("X must be a 2D array of shape (n_samples, n_features).")
+    if size <= 0:
+        raise ValueError("size must be a positive integer.")
+    if method not in _CORESET_METHODS:
+        raise ValueError(f"Unknown coreset method '{method}'. Use one of {_CORESET_METHODS}.")
+
+    n_samples = X.shape[0]
+    rng = np.random.RandomState(random_state)
+    bytes_per_row = X.shape[1] * X.itemsize
+
+    if method == "lightweight":
+        # Pass 1: mean and total squared distance to it
+        total = np.zeros(X.shape[1])
+        total_sq = 0.0
+        for rows in _row_blocks(n_samples, bytes_per_row, memory_budget):
+            block = np.asarray(X[rows], dtype=np.float64)
+            total += block.sum(axis=0)
+            total_sq += float(_row_sq_norms(block).sum())
+        mean = total / n_samples
+        spread = max(0.0, total_sq - n_samples * float(mean @ mean))
+
+        def block_scores(block: np.ndarray) -> np.ndarray:
+            diff = block - mean
+            sq = _row_sq_norms(diff)
+            scores = np.full(block.shape[0], 0.5 / n_samples)
+            if spread > 0:
+                scores += 0.5 * sq / spread
+            return scores
+
+        # Scores sum to 1 by construction
+        idx, weights = _stream_sample(X, block_scores, 1.0, size, rng, memory_budget)
+
+    else:
+        if k is None or k <= 0:
+            raise ValueError("method='sensitivity' needs a positive k.")
+        centres = init_centroids(
+            X, k, random_state=rng.randint(2 ** 31 - 1), init="k-means||",
+            memory_budget=memory_budget,
+        )
+        # Pass: per-cluster sizes and costs of the rough solution
+        sizes = np.zeros(k)
+        costs = np.zeros(k)
+        for rows in _row_blocks(n_samples, bytes_per_row, memory_budget):
+            labels, sq = nearest_centroids(np.asarray(X[rows]), centres, memory_budget=memory_budget)
+            sizes += np.bincount(labels, minlength=k)
+            costs += np.bincount(labels, weights=sq, minlength=k)
+        mean_cost = costs.sum() / n_samples
+        alpha = 16.0 * (np.log(k) + 2.0)
+        safe_sizes = np.maximum(sizes, 1.0)
+
+        def block_scores(block: np.ndarray) -> np.ndarray:
+            labels, sq = nearest_centroids(block, centres, memory_budget=memory_budget)
+            scores = 4.0 * n_samples / safe_sizes[labels]
+            if mean_cost > 0:
+                scores += alpha * sq / mean_cost
+                scores += 2.0 * alpha * costs[labels] / (safe_sizes[labels] * mean_cost)
+            return scores
+
+        # Closed-form total of the sensitivity bounds over all samples
+        total_score = 4.0 * n_samples * np.count_nonzero(sizes)
+        if mean_cost > 0:
+            total_score += 3.0 * alpha * n_samples
+        idx, weights = _stream_sample(X, block_scores, total_score, size, rng, memory_budget)
+
+    return np.asarray(X[idx]), weights
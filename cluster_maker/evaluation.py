@@ -6,38 +6,82 @@
 
 from __future__ import annotations
 
-from typing import List, Dict, Optional
+from concurrent.futures import as_completed
+from typing import Callable, List, Dict, Optional, Tuple
 
 import numpy as np
+from scipy import sparse
+from scipy.stats import norm
 from sklearn.metrics import silhouette_score
-from sklearn.metrics import davies_bouldin_score
 
-from .algorithms import kmeans, sklearn_kmeans
+from .algorithms import (
+    kmeans,
+    sklearn_kmeans,
+    nearest_centroids,
+    update_centroids,
+    DEFAULT_MEMORY_BUDGET,
+    _row_blocks,
+    _check_sample_weight,
+    _check_input,
+    _cluster_sums,
+    _row_sq_norms,
+    _make_executor,
+    _dense_rows,
+    _two_means,
+)
+from .shared import resolve, shared_input
+from .summary import ClusterStats
 
 
 def compute_inertia(
     X: np.ndarray,
     labels: np.ndarray,
     centroids: np.ndarray,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    sample_weight: Optional[np.ndarray] = None,
 ) -> float:
     """
     Compute the within-cluster sum of squared distances (inertia).
 
     Parameters
     ----------
-    X : ndarray of shape (n_samples, n_features)
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
     labels : ndarray of shape (n_samples,)
     centroids : ndarray of shape (k, n_features)
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Working-memory budget in bytes; rows are processed in blocks.
+    sample_weight : ndarray of shape (n_samples,) or None
+        If given, each squared distance is multiplied by its sample's weight.
 
     Returns
     -------
     inertia : float
     """
+    X = _check_input(X)
     if X.shape[0] != labels.shape[0]:
         raise ValueError("X and labels must have the same number of samples.")
-
-    distances = X - centroids[labels]
-    sq_dist = np.sum(distances ** 2)
+    sample_weight = _check_sample_weight(sample_weight, X.shape[0])
+    is_sparse = sparse.issparse(X)
+
+    sq_dist = 0.0
+    c_sq_norms = _row_sq_norms(centroids)
+    # Sparse blocks go through a (block, k) sparse-dense product instead
+    bytes_per_row = (centroids.shape[0] if is_sparse else X.shape[1]) * 8
+    for rows in _row_blocks(X.shape[0], bytes_per_row, memory_budget):
+        block_labels = labels[rows]
+        if is_sparse:
+            block = X[rows]
+            dots = (block @ centroids.T)[np.arange(block.shape[0]), block_labels]
+            row_sq = _row_sq_norms(block) - 2.0 * dots + c_sq_norms[block_labels]
+            np.maximum(row_sq, 0.0, out=row_sq)
+        else:
+            diff = X[rows] - centroids[block_labels]
+            row_sq = np.einsum("ij,ij->i", diff, diff)
+        # Accumulate in float64 even when X is float32
+        if sample_weight is None:
+            sq_dist += float(row_sq.sum(dtype=np.float64))
+        else:
+            sq_dist += float(np.dot(sample_weight[rows], row_sq.astype(np.float64)))
     return float(sq_dist)
 
 
@@ -58,15 +102,290 @@ def silhouette_score_sklearn(
     return float(silhouette_score(X, labels))
 
 
+_SILHOUETTE_MODES = ("auto", "exact", "sampled", "simplified")
+
+# Point-to-point distances the "auto" silhouette mode is willing to compute
+_SILHOUETTE_MAX_PAIRS = 2 * 10 ** 8
+
+
+def _euclidean_to(
+    block: np.ndarray,
+    block_sq: np.ndarray,
+    Y: np.ndarray,
+    y_sq: np.ndarray,
+) -> np.ndarray:
+    """
+    Euclidean distances between the rows of ``block`` and the rows of Y.
+    """
+    sq = block @ Y.T
+    if sparse.issparse(sq):
+        sq = sq.toarray()
+    sq = np.asarray(sq, dtype=np.float64)
+    sq *= -2.0
+    sq += y_sq
+    sq += block_sq[:, np.newaxis]
+    np.maximum(sq, 0.0, out=sq)
+    return np.sqrt(sq)
+
+
+def _silhouette_rows(
+    X: np.ndarray,
+    codes: np.ndarray,
+    sizes: np.ndarray,
+    rows: np.ndarray,
+    memory_budget: int,
+) -> np.ndarray:
+    """
+    Exact silhouette values of the samples ``rows``.
+
+    The samples are sorted by cluster once, so the distances from a block of
+    rows to every sample reduce to per-cluster sums with one ``reduceat``
+    over contiguous column ranges. Memory stays within ``memory_budget``
+    while time is O(len(rows) * n_samples).
+    """
+    n_samples = X.shape[0]
+    order = np.argsort(codes, kind="stable")
+    position = np.empty(n_samples, dtype=np.intp)
+    position[order] = np.arange(n_samples)
+    starts = np.concatenate([[0], np.cumsum(sizes.astype(np.intp))[:-1]])
+    X_sorted = X[order]
+    x_sq = _row_sq_norms(X).astype(np.float64)
+    x_sq_sorted = x_sq[order]
+    values = np.empty(rows.shape[0])
+
+    for block in _row_blocks(rows.shape[0], 2 * n_samples * 8, memory_budget):
+        idx = rows[block]
+        dist = _euclidean_to(X[idx], x_sq[idx], X_sorted, x_sq_sorted)
+        # The point itself contributes a (rounded) zero to its own cluster
+        dist[np.arange(idx.shape[0]), position[idx]] = 0.0
+        cluster_sums = np.add.reduceat(dist, starts, axis=1)
+        own = codes[idx]
+        local = np.arange(idx.shape[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = cluster_sums[local, own] / (sizes[own] - 1)
+            means = cluster_sums / sizes
+        means[local, own] = np.inf
+        b = means.min(axis=1)
+        with np.errstate(invalid="ignore"):
+            s = (b - a) / np.maximum(a, b)
+        # Singleton clusters have a silhouette of 0 by convention
+        s[sizes[own] == 1] = 0.0
+        values[block] = np.nan_to_num(s)
+    return values
+
+
+def _silhouette_mode(n_samples: int, mode: str, sample_size: int) -> str:
+    """
+    The mode ``compute_silhouette`` actually runs for ``mode``.
+    """
+    if mode == "auto":
+        if n_samples <= sample_size:
+            return "exact"
+        return "sampled" if n_samples <= 20 * sample_size else "simplified"
+    if mode == "sampled" and sample_size >= n_samples:
+        return "exact"
+    return mode
+
+
+def compute_silhouette(
+    X: np.ndarray,
+    labels: np.ndarray,
+    mode: str = "auto",
+    centroids: Optional[np.ndarray] = None,
+    sample_size: int = 10_000,
+    confidence: float = 0.95,
+    random_state: Optional[int] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    return_details: bool = False,
+) -> dict | float:
+    """
+    Mean silhouette coefficient with bounded memory.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+    labels : ndarray of shape (n_samples,)
+    mode : {"auto", "exact", "sampled", "simplified"}, default "auto"
+        - "exact": every sample, computed in row blocks; O(n_samples^2) time
+          but memory bounded by ``memory_budget``. Matches scikit-learn.
+        - "sampled": exact silhouettes of a sample stratified by cluster
+          (proportional allocation, at least two rows per cluster), with a
+          normal-approximation confidence interval for the mean;
+          O(sample_size * n_samples).
+        - "simplified": distances to centroids instead of to every sample:
+          a = distance to the own centroid, b = distance to the nearest
+          other centroid; O(n_samples * k).
+        - "auto": "exact" up to ``sample_size`` samples, "sampled" up to
+          ``20 * sample_size`` samples, "simplified" above. The sample is
+          shrunk so that at most 2e8 point-to-point distances are computed.
+    centroids : ndarray of shape (k, n_features) or None
+        Centroids for the simplified mode, in the order of the sorted
+        unique labels. Computed as cluster means if None.
+    sample_size : int, default 10000
+        Number of sampled rows for the "sampled" mode.
+    confidence : float, default 0.95
+        Confidence level of the interval reported by the "sampled" mode.
+    random_state : int or None
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+    return_details : bool, default False
+        If True, return a dictionary with additional information.
+
+    Returns
+    -------
+    float or dict
+        If return_details=False:
+            silhouette : float
+        If return_details=True:
+            {
+                "silhouette": float,
+                "mode": str (the mode used, never "auto"),
+                "ci": (low, high) for "sampled", otherwise None,
+                "n_evaluated": int (samples whose silhouette was computed)
+            }
+    """
+    X = _check_input(X)
+    labels = np.asarray(labels)
+    if X.ndim != 2 or labels.ndim != 1 or X.shape[0] != labels.shape[0]:
+        raise ValueError("X and labels must have shapes (n_samples, n_features) and (n_samples,).")
+    if mode not in _SILHOUETTE_MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Use one of {_SILHOUETTE_MODES}.")
+    if sample_size < 2:
+        raise ValueError("sample_size must be at least 2.")
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence must be between 0 and 1.")
+
+    unique, codes = np.unique(labels, return_inverse=True)
+    codes = codes.reshape(-1)
+    k = unique.shape[0]
+    if k < 2 or k >= X.shape[0]:
+        raise ValueError("Silhouette score requires 2 <= n_clusters <= n_samples - 1.")
+    n_samples = X.shape[0]
+    sizes = np.bincount(codes, minlength=k).astype(np.float64)
+
+    if mode == "auto" and _silhouette_mode(n_samples, mode, sample_size) == "sampled":
+        mode = "sampled"
+        sample_size = max(2 * k, min(sample_size, _SILHOUETTE_MAX_PAIRS // n_samples))
+    mode = _silhouette_mode(n_samples, mode, sample_size)
+
+    ci = None
+    if mode == "exact":
+        values = _silhouette_rows(X, codes, sizes, np.arange(n_samples), memory_budget)
+        score, n_evaluated = float(values.mean()), n_samples
+
+    elif mode == "sampled":
+        rng = np.random.RandomState(random_state)
+        share = np.maximum(2, np.round(sample_size * sizes / n_samples)).astype(int)
+        share = np.minimum(share, sizes.astype(int))
+        order = np.argsort(codes, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(sizes.astype(int))])
+        strata = [
+            rng.choice(order[starts[c]:starts[c + 1]], share[c], replace=False)
+            for c in range(k)
+        ]
+        rows = np.concatenate(strata)
+        values = _silhouette_rows(X, codes, sizes, rows, memory_budget)
+
+        # Stratified mean and its variance, with finite-population correction
+        weights = sizes / n_samples
+        bounds = np.concatenate([[0], np.cumsum(share)])
+        means = np.array([values[bounds[c]:bounds[c + 1]].mean() for c in range(k)])
+        variances = np.array([
+            values[bounds[c]:bounds[c + 1]].var(ddof=1) if share[c] > 1 else 0.0
+            for c in range(k)
+        ])
+        score = float(weights @ means)
+        fpc = 1.0 - share / sizes
+        stderr = float(np.sqrt(np.sum(weights ** 2 * variances / share * fpc)))
+        z = float(norm.ppf(0.5 + confidence / 2.0))
+        ci = (score - z * stderr, score + z * stderr)
+        n_evaluated = int(rows.shape[0])
+
+    else:
+        if centroids is None:
+            centroids = update_centroids(X, codes, k)
+        centroids = np.asarray(centroids, dtype=np.float64)
+        if centroids.shape != (k, X.shape[1]):
+            raise ValueError(f"centroids must have shape ({k}, {X.shape[1]}).")
+        c_sq = _row_sq_norms(centroids)
+        x_sq = _row_sq_norms(X).astype(np.float64)
+        total = 0.0
+        for rows in _row_blocks(n_samples, 2 * k * 8, memory_budget):
+            dist = _euclidean_to(X[rows], x_sq[rows], centroids, c_sq)
+            local = np.arange(dist.shape[0])
+            own = codes[rows]
+            a = dist[local, own].copy()
+            dist[local, own] = np.inf
+            b = dist.min(axis=1)
+            denom = np.maximum(a, b)
+            s = np.divide(b - a, denom, out=np.zeros_like(a), where=denom > 0)
+            s[sizes[own] == 1] = 0.0
+            total += float(s.sum())
+        score, n_evaluated = total / n_samples, n_samples
+
+    if return_details:
+        return {"silhouette": score, "mode": mode, "ci": ci, "n_evaluated": n_evaluated}
+    return score
+
+
+def _elbow_seeds(random_state: Optional[int], k: int, n_init: int) -> List[int]:
+    """
+    Restart seeds for one k of an elbow sweep.
+
+    The seeds depend only on (random_state, k, restart), not on the other k
+    values or on the order in which workers finish, so a sweep gives the
+    same result serially and in parallel.
+    """
+    base = np.random.SeedSequence(random_state)
+    return [
+        int(np.random.SeedSequence(base.entropy, spawn_key=(k, r)).generate_state(1)[0])
+        for r in range(n_init)
+    ]
+
+
+def _elbow_inertia(
+    X: np.ndarray,
+    k: int,
+    random_state: int,
+    use_sklearn: bool,
+    sample_weight: Optional[np.ndarray],
+) -> float:
+    """
+    Fit one restart of one k of an elbow sweep and return its inertia.
+
+    X may be a SharedArrayHandle when called in a process-pool worker.
+    """
+    X = resolve(X)
+    if use_sklearn:
+        labels, centroids = sklearn_kmeans(
+            X, k, random_state=random_state, sample_weight=sample_weight, n_init=1
+        )
+        return compute_inertia(X, labels, centroids, sample_weight=sample_weight)
+    # The final assignment pass of kmeans already measured the inertia
+    _, _, summary = kmeans(
+        X, k, random_state=random_state, sample_weight=sample_weight, return_summary=True
+    )
+    return summary.inertia()
+
+
 def elbow_curve(
     X: np.ndarray,
     k_values: List[int],
     random_state: Optional[int] = None,
     use_sklearn: bool = True,
+    sample_weight: Optional[np.ndarray] = None,
+    n_jobs: Optional[int] = None,
+    backend: str = "thread",
+    n_init: Optional[int] = None,
+    callback: Optional[Callable[[int, float], None]] = None,
 ) -> Dict[int, float]:
     """
     Compute inertia values for multiple K values (elbow method).
 
+    Every (k, restart) pair is an independent task with its own seed derived
+    from (random_state, k, restart); the inertia of a k is the best over its
+    restarts. Results are identical whether the tasks run serially or on a
+    worker pool.
+
     Parameters
     ----------
     X : ndarray
@@ -74,42 +393,368 @@ def elbow_curve(
     random_state : int or None
     use_sklearn : bool, default True
         If True, use scikit-learn KMeans; otherwise use manual kmeans.
+    sample_weight : ndarray of shape (n_samples,) or None
+        Per-sample weights used both for fitting and for the inertia.
+    n_jobs : int or None, default None
+        Number of workers running the (k, restart) tasks in parallel. None
+        runs them one after another; -1 uses all CPUs.
+    backend : {"thread", "process"}, default "thread"
+        Worker pool used when n_jobs is given. With "process" a dense X is
+        placed in shared memory once and mapped by every worker.
+    n_init : int or None, default None
+        Restarts per k. None means 10 with use_sklearn (scikit-learn's
+        usual setting) and 1 otherwise.
+    callback : callable or None, default None
+        Called as ``callback(k, inertia)`` in the calling process as soon as
+        all restarts of a k have finished, e.g. to update a plot during a
+        long sweep. With a pool, k values are reported in completion order.
 
     Returns
     -------
     inertia_dict : dict
-        Mapping from k to inertia.
+        Mapping from k to inertia, in the order of k_values.
     """
-    inertia_dict: Dict[int, float] = {}
+    if any(k <= 0 for k in k_values):
+        raise ValueError("All k values must be positive integers.")
+    if n_init is None:
+        n_init = 10 if use_sklearn else 1
+    if n_init <= 0:
+        raise ValueError("n_init must be a positive integer.")
+
+    unique_k = list(dict.fromkeys(k_values))
+    tasks = [(k, seed) for k in unique_k for seed in _elbow_seeds(random_state, k, n_init)]
+    best: Dict[int, float] = {}
+    pending = {k: n_init for k in unique_k}
+
+    def collect(k: int, inertia: float) -> None:
+        best[k] = min(inertia, best.get(k, np.inf))
+        pending[k] -= 1
+        if pending[k] == 0 and callback is not None:
+            callback(k, best[k])
+
+    if n_jobs is None:
+        for k, seed in tasks:
+            collect(k, _elbow_inertia(X, k, seed, use_sklearn, sample_weight))
+    else:
+        with shared_input(X, backend) as X_task, _make_executor(backend, n_jobs) as pool:
+            futures = {
+                pool.submit(_elbow_inertia, X_task, k, seed, use_sklearn, sample_weight): k
+                for k, seed in tasks
+            }
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
 
-    for k in k_values:
-        if k <= 0:
-            raise ValueError("All k values must be positive integers.")
-        if use_sklearn:
-            labels, centroids = sklearn_kmeans(X, k, random_state=random_state)
-        else:
-            labels, centroids = kmeans(X, k, random_state=random_state)
-        inertia = compute_inertia(X, labels, centroids)
-        inertia_dict[k] = inertia
+    return {k: best[k] for k in k_values}
 
-    return inertia_dict
 
+def find_knee(
+    k_values: List[int],
+    inertias: List[float],
+) -> Optional[int]:
+    """
+    Locate the knee of an elbow curve.
 
-def compute_davies_bouldin(
+    The inertia is taken on a log scale (when all values are positive), so
+    the knee is where the relative improvement flattens out. Both axes are
+    then scaled to [0, 1] and the knee is the point farthest below the
+    straight line joining the first and last points of the curve.
+
+    Parameters
+    ----------
+    k_values : list of int
+        Increasing k values.
+    inertias : list of float
+        Inertia for each k.
+
+    Returns
+    -------
+    knee : int or None
+        The k at the knee, or None if the curve has fewer than three points
+        or no point lies below the line.
+    """
+    x = np.asarray(k_values, dtype=np.float64)
+    y = np.asarray(inertias, dtype=np.float64)
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("k_values and inertias must be 1D and of the same length.")
+    if x.shape[0] < 3 or np.any(np.diff(x) <= 0):
+        if x.shape[0] >= 3:
+            raise ValueError("k_values must be strictly increasing.")
+        return None
+    if np.all(y > 0):
+        y = np.log(y)
+    span = y.max() - y.min()
+    if span <= 0:
+        return None
+    x = (x - x[0]) / (x[-1] - x[0])
+    y = (y - y.min()) / span
+    gap = y[0] + (y[-1] - y[0]) * x - y
+    best = int(np.argmax(gap))
+    if gap[best] <= 0:
+        return None
+    return int(k_values[best])
+
+
+_NEW_CENTROID_METHODS = ("split", "k-means++")
+
+# The knee is confirmed once the mean log-inertia drop per k after it is
+# below this fraction of the mean drop per k before it
+_KNEE_FLATNESS = 0.2
+
+
+def incremental_elbow_curve(
     X: np.ndarray,
+    k_max: int,
+    random_state: Optional[int] = None,
+    new_centroid: str = "split",
+    stop_at_knee: bool = True,
+    patience: int = 3,
+    max_iter: int = 300,
+    tol: float = 1e-4,
+    sample_weight: Optional[np.ndarray] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    return_details: bool = False,
+) -> dict:
+    """
+    Elbow sweep over k = 1, 2, ... where each k starts from the k-1 solution.
+
+    The converged (k-1)-centroids plus one new centroid warm-start the
+    k-means for k, so each step only needs a few iterations instead of a
+    full run from scratch.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+    k_max : int
+        Largest k of the sweep.
+    random_state : int or None
+    new_centroid : {"split", "k-means++"}, default "split"
+        "split" replaces the centroid of the cluster with the highest SSE by
+        the two centres of a quick 2-means on that cluster. "k-means++"
+        draws ``2 + log(k)`` samples with probability proportional to their
+        (weighted) squared distance to the nearest centroid and adds the one
+        that lowers the inertia most.
+    stop_at_knee : bool, default True
+        Stop once the knee (see ``find_knee``) is confirmed: it has not
+        moved for ``patience`` consecutive k values and the curve after it
+        is flat, i.e. the mean drop in log-inertia per k after the knee is
+        below a fifth of the mean drop before it.
+    patience : int, default 3
+    max_iter : int, default 300
+    tol : float, default 1e-4
+    sample_weight : ndarray of shape (n_samples,) or None
+        Weights used for fitting and for the inertia. The "split" seeding
+        itself is unweighted; the weighted k-means refines it.
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+    return_details : bool, default False
+        If True, return a dictionary with additional information.
+
+    Returns
+    -------
+    dict
+        If return_details=False:
+            inertia_dict : mapping from k to inertia, for k = 1 up to k_max
+            or up to the k at which the sweep stopped.
+        If return_details=True:
+            {
+                "inertias": dict mapping k to inertia,
+                "knee": int or None,
+                "n_iter": dict mapping k to the iterations of its fit,
+                "stopped_early": bool
+            }
+    """
+    X = _check_input(X)
+    if k_max <= 0 or k_max > X.shape[0]:
+        raise ValueError("k_max must be between 1 and the number of samples.")
+    if new_centroid not in _NEW_CENTROID_METHODS:
+        raise ValueError(
+            f"Unknown new_centroid '{new_centroid}'. Use one of {_NEW_CENTROID_METHODS}."
+        )
+    if patience <= 0:
+        raise ValueError("patience must be a positive integer.")
+    sample_weight = _check_sample_weight(sample_weight, X.shape[0])
+    rng = np.random.RandomState(random_state)
+    x_sq = _row_sq_norms(X)
+    weight = np.ones(X.shape[0]) if sample_weight is None else sample_weight
+
+    # k = 1 has a closed-form solution: the (weighted) mean
+    centroids = np.asarray(
+        sparse.csr_matrix(weight / weight.sum()) @ X, dtype=np.result_type(X.dtype, np.float32)
+    ).reshape(1, -1)
+    labels, min_sq = nearest_centroids(X, centroids, memory_budget=memory_budget)
+    inertias = {1: float(np.dot(weight, min_sq))}
+    n_iters = {1: 0}
+    knee, knee_since, stopped_early = None, 0, False
+
+    for k in range(2, k_max + 1):
+        if new_centroid == "split":
+            sse = np.bincount(labels, weights=weight * min_sq, minlength=k - 1)
+            worst = int(np.argmax(sse))
+            rows = np.flatnonzero(labels == worst)
+            if rows.shape[0] >= 2:
+                halves, _, _, _ = _two_means(
+                    X[rows], x_sq[rows], max_iter, tol, rng.randint(2 ** 31 - 1),
+                    "random", memory_budget,
+                )
+                centroids = np.vstack([centroids, halves[1:]])
+                centroids[worst] = halves[0]
+            else:
+                centroids = np.vstack([centroids, _dense_rows(X, [int(np.argmax(min_sq))])])
+        else:
+            # Greedy k-means++: keep the best of a few D^2-weighted draws
+            p = weight * min_sq
+            total = p.sum()
+            n_trials = 2 + int(np.log(k))
+            if total > 0:
+                candidates = rng.choice(X.shape[0], size=n_trials, p=p / total)
+            else:
+                candidates = rng.randint(X.shape[0], size=n_trials)
+            best, best_cost = candidates[0], np.inf
+            for idx in candidates:
+                _, new_sq = nearest_centroids(X, _dense_rows(X, [idx]), memory_budget=memory_budget)
+                cost = float(np.dot(weight, np.minimum(min_sq, new_sq)))
+                if cost < best_cost:
+                    best, best_cost = idx, cost
+            centroids = np.vstack([centroids, _dense_rows(X, [best])])
+
+        labels, centroids, n_iter, summary = kmeans(
+            X, k, max_iter=max_iter, tol=tol, init=centroids, memory_budget=memory_budget,
+            sample_weight=sample_weight, return_n_iter=True, return_summary=True,
+        )
+        min_sq = summary.min_sq_distances
+        inertias[k] = summary.inertia()
+        n_iters[k] = n_iter
+
+        new_knee = find_knee(list(inertias), list(inertias.values()))
+        knee_since = knee_since + 1 if new_knee is not None and new_knee == knee else 0
+        knee = new_knee
+        if stop_at_knee and knee_since >= patience and k < k_max and knee > 1:
+            log_inertia = np.log(np.maximum([inertias[1], inertias[knee], inertias[k]], 1e-300))
+            before = (log_inertia[0] - log_inertia[1]) / (knee - 1)
+            after = (log_inertia[1] - log_inertia[2]) / (k - knee)
+            if after < _KNEE_FLATNESS * before:
+                stopped_early = True
+                break
+
+    if return_details:
+        return {
+            "inertias": inertias,
+            "knee": knee,
+            "n_iter": n_iters,
+            "stopped_early": stopped_early,
+        }
+    return inertias
+
+
+def cluster_stats(
+    X,
     labels: np.ndarray,
+    centres: Optional[np.ndarray] = None,
+    sample_weight: Optional[np.ndarray] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> ClusterStats:
+    """
+    Per-cluster sufficient statistics of X, accumulated in row blocks.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+    labels : ndarray of shape (n_samples,)
+        With ``centres``, indices into centres. Without, arbitrary cluster
+        labels; cluster i is then the i-th sorted unique label.
+    centres : ndarray of shape (k, n_features) or None
+        Reference centres. If None, the cluster means are computed first
+        (one extra pass over X), which makes the indices match their
+        textbook definitions exactly.
+    sample_weight : ndarray of shape (n_samples,) or None
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+
+    Returns
+    -------
+    stats : ClusterStats
+        Merge it with the statistics of other chunks or shards built with
+        the same centres to evaluate a clustering of the combined data.
+    """
+    X = _check_input(X)
+    labels = np.asarray(labels)
+    if X.ndim != 2 or labels.shape != (X.shape[0],):
+        raise ValueError("X and labels must have shapes (n_samples, n_features) and (n_samples,).")
+    sample_weight = _check_sample_weight(sample_weight, X.shape[0])
+    if centres is None:
+        unique, labels = np.unique(labels, return_inverse=True)
+        labels = labels.reshape(-1)
+        sums, counts = _cluster_sums(X, labels, unique.shape[0], sample_weight=sample_weight)
+        centres = np.zeros_like(sums)
+        np.divide(sums, counts[:, np.newaxis], out=centres, where=counts[:, np.newaxis] > 0)
+
+    stats = ClusterStats(centres)
+    for rows in _row_blocks(X.shape[0], 3 * X.shape[1] * 8, memory_budget):
+        weight = None if sample_weight is None else sample_weight[rows]
+        stats.update(X[rows], labels[rows], sample_weight=weight)
+    return stats
+
+
+def _as_stats(X, labels, memory_budget: int) -> ClusterStats:
+    """
+    Validate the input of a validity index and return its ClusterStats.
+    """
+    if isinstance(X, ClusterStats):
+        if labels is not None:
+            raise ValueError("labels must be None when X is a ClusterStats.")
+        return X
+
+    if not isinstance(X, np.ndarray) and not sparse.issparse(X):
+        raise TypeError("X must be a NumPy array, a scipy.sparse matrix or a ClusterStats.")
+
+    if not isinstance(labels, np.ndarray):
+        raise TypeError("labels must be a NumPy array.")
+
+    if X.ndim != 2:
+        raise ValueError("X must be a 2D array of shape (n_samples, n_features).")
+
+    if labels.ndim != 1:
+        raise ValueError("labels must be a 1D array of shape (n_samples,).")
+
+    if X.shape[0] != labels.shape[0]:
+        raise ValueError("X and labels must contain the same number of samples.")
+
+    return cluster_stats(X, labels, memory_budget=memory_budget)
+
+
+def _separation(stats: ClusterStats, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distances between the non-empty centres, and from each one to the
+    nearest other.
+    """
+    distances = stats.centre_distances()[np.ix_(present, present)]
+    masked = distances + np.diag(np.full(distances.shape[0], np.inf))
+    return distances, masked.min(axis=1)
+
+
+def compute_davies_bouldin(
+    X,
+    labels: Optional[np.ndarray] = None,
     return_details: bool = False,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
 ) -> dict | float:
     """
     Compute the Davies–Bouldin Index (DBI) with validation and optional detail.
 
+    The index is computed natively from per-cluster sufficient statistics
+    (see ``ClusterStats``): the mean distance of every cluster to its centre
+    and the distances between centres. From X and labels it matches
+    scikit-learn's ``davies_bouldin_score``.
+
     Parameters
     ----------
-    X : ndarray of shape (n_samples, n_features)
-    labels : ndarray of shape (n_samples,)
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features), or ClusterStats
+        The data, or statistics accumulated over chunks or merged across
+        shards (labels must then be None).
+    labels : ndarray of shape (n_samples,) or None
         Cluster labels.
     return_details : bool, default False
         If True, return a dictionary with additional diagnostic information.
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        Working-memory budget in bytes when X is an array.
 
     Returns
     -------
@@ -120,44 +765,179 @@ def compute_davies_bouldin(
             {
                 "dbi": float,
                 "clusters": int,
-                "valid": bool
+                "valid": bool,
+                "scatter": ndarray (mean distance to the centre per cluster),
+                "separation": ndarray (distance to the nearest other centre
+                              per cluster)
             }
+        The per-cluster arrays cover the non-empty clusters, in order.
 
     Notes
     -----
     DBI is undefined for a single cluster. In that case, the function
     returns np.nan and marks valid=False in details mode.
     """
+    stats = _as_stats(X, labels, memory_budget)
+    present = stats.counts > 0
+    n_clusters = int(np.count_nonzero(present))
+    scatter = stats.dist_sums[present] / stats.counts[present]
+    distances, separation = _separation(stats, present)
 
-    # --------- Validate inputs ----------
-    if not isinstance(X, np.ndarray):
-        raise TypeError("X must be a NumPy array.")
+    # Need at least two clusters
+    if n_clusters < 2:
+        dbi, valid = np.nan, False
+    elif np.allclose(scatter, 0.0) or np.allclose(distances, 0.0):
+        dbi, valid = 0.0, True
+    else:
+        distances = np.where(distances == 0.0, np.inf, distances)
+        ratio = (scatter[:, np.newaxis] + scatter[np.newaxis, :]) / distances
+        np.fill_diagonal(ratio, -np.inf)
+        dbi, valid = float(np.mean(ratio.max(axis=1))), True
 
-    if not isinstance(labels, np.ndarray):
-        raise TypeError("labels must be a NumPy array.")
+    if return_details:
+        return {
+            "dbi": dbi,
+            "clusters": n_clusters,
+            "valid": valid,
+            "scatter": scatter,
+            "separation": separation,
+        }
+    return dbi
+
+
+def compute_calinski_harabasz(
+    X,
+    labels: Optional[np.ndarray] = None,
+    return_details: bool = False,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> dict | float:
+    """
+    Compute the Calinski–Harabasz index (variance ratio criterion).
 
-    if X.ndim != 2:
-        raise ValueError("X must be a 2D array of shape (n_samples, n_features).")
+    Computed natively from per-cluster counts, feature sums and sums of
+    squared distances to the centres. The dispersion about the centres is
+    moved to the cluster means by the parallel-axis theorem, so the index is
+    exact for any reference centres and matches scikit-learn's
+    ``calinski_harabasz_score``. Higher is better.
 
-    if labels.ndim != 1:
-        raise ValueError("labels must be a 1D array of shape (n_samples,).")
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features), or ClusterStats
+    labels : ndarray of shape (n_samples,) or None
+    return_details : bool, default False
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
 
-    if X.shape[0] != labels.shape[0]:
-        raise ValueError("X and labels must contain the same number of samples.")
+    Returns
+    -------
+    float or dict
+        If return_details=True:
+            {
+                "ch": float,
+                "clusters": int,
+                "valid": bool,
+                "scatter": ndarray (within-cluster sum of squares about the
+                           cluster mean, per cluster),
+                "separation": ndarray (count times squared distance from the
+                              cluster mean to the overall mean, per cluster)
+            }
+        np.nan (valid=False) for fewer than two clusters.
+    """
+    stats = _as_stats(X, labels, memory_budget)
+    present = stats.counts > 0
+    n_clusters = int(np.count_nonzero(present))
+    counts = stats.counts[present]
+    n_samples = float(counts.sum())
+    means = stats.sums[present] / counts[:, np.newaxis]
+    overall = stats.sums[present].sum(axis=0) / n_samples if n_clusters else 0.0
+
+    offset = means - stats.centres[present]
+    scatter = stats.sq_sums[present] - counts * np.einsum("ij,ij->i", offset, offset)
+    scatter = np.maximum(scatter, 0.0)
+    separation = counts * np.sum((means - overall) ** 2, axis=1)
+
+    within, between = float(scatter.sum()), float(separation.sum())
+    if n_clusters < 2:
+        ch, valid = np.nan, False
+    elif within <= 0.0:
+        ch, valid = 1.0, True
+    else:
+        ch = between * (n_samples - n_clusters) / (within * (n_clusters - 1))
+        valid = True
 
-    unique_labels = np.unique(labels)
-    n_clusters = len(unique_labels)
+    if return_details:
+        return {
+            "ch": ch,
+            "clusters": n_clusters,
+            "valid": valid,
+            "scatter": scatter,
+            "separation": separation,
+        }
+    return ch
+
+
+def compute_dunn(
+    X,
+    labels: Optional[np.ndarray] = None,
+    return_details: bool = False,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> dict | float:
+    """
+    Compute a conservative Dunn index from cluster centres and radii.
 
-    # Need at least two clusters
-    if n_clusters < 2:
-        if return_details:
-            return {"dbi": np.nan, "clusters": n_clusters, "valid": False}
-        return np.nan
+    Every sample of a cluster lies within its radius (the largest distance
+    to the centre) of the centre, so two clusters are at least
+    ``max(0, ||c_i - c_j|| - r_i - r_j)`` apart and a cluster's diameter is
+    at most ``2 r_i``. The smallest such gap divided by the largest diameter
+    bound is therefore never larger than the Dunn index of the original
+    definition. Centres and radii are mergeable statistics, so the index
+    works over chunks and shards without the O(n_samples^2) pairwise
+    distances. Higher is better.
 
-    # --------- Compute DBI ----------
-    dbi = davies_bouldin_score(X, labels)
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features), or ClusterStats
+    labels : ndarray of shape (n_samples,) or None
+    return_details : bool, default False
+    memory_budget : int, default DEFAULT_MEMORY_BUDGET
 
-    if return_details:
-        return {"dbi": float(dbi), "clusters": n_clusters, "valid": True}
+    Returns
+    -------
+    float or dict
+        If return_details=True:
+            {
+                "dunn": float,
+                "clusters": int,
+                "valid": bool,
+                "scatter": ndarray (diameter bound per cluster),
+                "separation": ndarray (lower bound on the distance to the
+                              nearest other cluster, per cluster)
+            }
+        np.nan (valid=False) for fewer than two clusters; np.inf if every
+        cluster is a single point.
+    """
+    stats = _as_stats(X, labels, memory_budget)
+    present = stats.counts > 0
+    n_clusters = int(np.count_nonzero(present))
+    radii = stats.max_dists[present]
+    scatter = 2.0 * radii
+    distances, _ = _separation(stats, present)
+    gaps = np.maximum(distances - radii[:, np.newaxis] - radii[np.newaxis, :], 0.0)
+    np.fill_diagonal(gaps, np.inf)
+    separation = gaps.min(axis=1) if n_clusters > 1 else np.full(n_clusters, np.inf)
 
-    return float(dbi)
\ No newline at end of file
+    if n_clusters < 2:
+        dunn, valid = np.nan, False
+    else:
+        largest = float(scatter.max())
+        dunn = float(separation.min()) / largest if largest > 0 else np.inf
+        valid = True
+
+    if return_details:
+        return {
+            "dunn": dunn,
+            "clusters": n_clusters,
+            "valid": valid,
+            "scatter": scatter,
+            "separation": separation,
+        }
+    return dunn
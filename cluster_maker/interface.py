@@ -6,14 +6,31 @@
 
 from __future__ import annotations
 
-from typing import Dict, Any, List, Optional
+import os
+from typing import Dict, Any, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 
 from .preprocessing import select_features, standardise_features
-from .algorithms import kmeans, sklearn_kmeans
-from .evaluation import compute_inertia, elbow_curve, silhouette_score_sklearn, compute_davies_bouldin
+from .algorithms import (
+    kmeans,
+    kmeans_kdtree,
+    bisecting_kmeans,
+    sklearn_kmeans,
+    minibatch_kmeans,
+    load_centroids,
+    summarise_clusters,
+)
+from .coreset import build_coreset
+from .model import KMeansModel
+from .evaluation import (
+    compute_inertia,
+    elbow_curve,
+    find_knee,
+    compute_silhouette,
+    _silhouette_mode,
+)
 from .plotting_clustered import plot_clusters_2d, plot_elbow
 from .data_exporter import export_to_csv
 
@@ -31,6 +48,13 @@ def run_clustering(
     random_state: Optional[int] = None,
     compute_elbow: bool = False,
     elbow_k_values: Optional[List[int]] = None,
+    dtype: str = "float64",
+    init: Union[str, np.ndarray, KMeansModel] = "random",
+    model_path: Optional[str] = None,
+    coreset_size: Optional[int] = None,
+    coreset_method: str = "lightweight",
+    deduplicate: bool = False,
+    silhouette_mode: str = "auto",
 ) -> Dict[str, Any]:
     """
     High-level function to run the full clustering workflow.
@@ -50,7 +74,11 @@ def run_clustering(
         Path to the input CSV file.
     feature_cols : list of str
         Names of feature columns to use.
-    algorithm : {"kmeans", "sklearn_kmeans"}, default "kmeans"
+    algorithm : {"kmeans", "sklearn_kmeans", "minibatch", "kdtree", "bisecting"}, default "kmeans"
+        "kdtree" runs kd-tree filtering K-means, which gives the same result
+        as "kmeans" but is much faster on low-dimensional data. "bisecting"
+        grows the clusters by repeated 2-means splits, which is cheap for
+        large k.
     k : int, default 3
         Number of clusters.
     standardise : bool, default True
@@ -62,6 +90,34 @@ def run_clustering(
     elbow_k_values : list of int or None, default None
         k-values for elbow curve. If None and compute_elbow is True, defaults
         to range 1..(k+5).
+    dtype : {"float64", "float32"}, default "float64"
+        Floating-point type used for the feature matrix in every stage.
+        float32 halves memory and speeds up the distance computations;
+        sums and inertia are still accumulated in float64.
+    init : {"random", "k-means++", "k-means||"}, ndarray, KMeansModel or str, default "random"
+        Initialisation for algorithm="kmeans". An ndarray of centroids, a
+        KMeansModel, or the path of a model saved through ``model_path``,
+        warm-starts the fit from previous centroids and keeps cluster ids
+        stable.
+    model_path : str or None, default None
+        If provided, the fitted model is saved to this ``.npz`` file (see
+        ``KMeansModel.save``) so that a later run can warm-start from it or
+        an online scorer can load it.
+    coreset_size : int or None, default None
+        If provided, a weighted coreset of about this many rows is built from
+        the features, the algorithm ("kmeans" or "sklearn_kmeans") runs on
+        the coreset, and a final pass labels the full data.
+    coreset_method : {"lightweight", "sensitivity"}, default "lightweight"
+        Coreset construction, see ``build_coreset``.
+    deduplicate : bool, default False
+        If True, identical feature vectors are collapsed into unique rows
+        weighted by their multiplicity before clustering (and for the elbow
+        curve), and labels are expanded back to every original row. Only
+        supported with "kmeans" and "sklearn_kmeans".
+    silhouette_mode : {"auto", "exact", "sampled", "simplified"}, default "auto"
+        How the silhouette is computed, see ``compute_silhouette``. "auto"
+        picks the exact score for small data, a stratified sample for
+        medium data and the centroid-based simplified score for large data.
 
     Returns
     -------
@@ -70,49 +126,180 @@ def run_clustering(
         - "data": DataFrame with added "cluster" column
         - "labels": ndarray of cluster labels
         - "centroids": ndarray of cluster centroids
-        - "metrics": dict with "inertia" and optional "silhouette" and optional "pca_variance"
+        - "model": KMeansModel holding the centroids, the standardisation and
+          PCA parameters and the fit metadata, ready to ``predict`` raw
+          feature rows
+        - "metrics": dict with "inertia" and optional "silhouette" and optional "pca_variance";
+          for algorithm="kmeans" also "n_iter", and "iterations_saved" for warm
+          starts from a saved model (iterations of the original cold fit minus
+          this fit's iterations); with a coreset also "coreset", a dict with
+          its "size", "method", weighted "inertia" and "approximation_ratio"
+          (coreset inertia / full-data inertia for the fitted centroids); with
+          deduplicate=True also "unique_rows"; "silhouette_mode" is the
+          silhouette mode used and "silhouette_ci" its confidence interval
+          (sampled mode only); with compute_quality=True also
+          "davies_bouldin", "calinski_harabasz" and "dunn". Inertia, the quality
+          indices and the simplified silhouette are all derived from one
+          ClusterSummary (the final kmeans pass, or one pass over X for the
+          other algorithms)
         - "fig_cluster": Figure for the cluster plot
         - "fig_elbow": Figure for the elbow plot or None
         - "elbow_inertias": dict mapping k -> inertia (if computed)
+        - "elbow_knee": knee of the elbow curve (see ``find_knee``) or None
     """
+    if dtype not in ("float64", "float32"):
+        raise ValueError(f"Unknown dtype '{dtype}'. Use 'float64' or 'float32'.")
+
+    # Warm start from a saved model
+    cold_n_iter: Optional[int] = None
+    if isinstance(init, KMeansModel):
+        init, cold_n_iter = init.centroids, init.cold_n_iter
+    elif isinstance(init, (str, os.PathLike)) and str(init).endswith(".npz"):
+        init, saved_info = load_centroids(init)
+        cold_n_iter = saved_info["cold_n_iter"]
+    warm_start = isinstance(init, np.ndarray)
+    if algorithm != "kmeans" and (warm_start or init != "random"):
+        raise ValueError("init is only supported with algorithm='kmeans'.")
+
     # Load data
     df = pd.read_csv(input_path)
 
     # Select and optionally standardise features
     X_df = select_features(df, feature_cols)
-    X = X_df.to_numpy(dtype=float)
+    X = X_df.to_numpy(dtype=dtype)
 
+    # Keep the preprocessing parameters for the fitted model
+    mean = scale = pca = None
     if standardise:
+        mean = X.mean(axis=0, dtype=np.float64)
+        scale = X.std(axis=0, dtype=np.float64)
+        scale[scale == 0.0] = 1.0
         X = standardise_features(X)
         
     if use_pca:
         from .preprocessing import apply_pca
-        X, explained_var = apply_pca(X, n_components=pca_components)
+        X, explained_var, pca = apply_pca(X, n_components=pca_components, return_pca=True)
+
+    # Optionally collapse duplicates or summarise the data by a weighted coreset
+    X_fit, weights = X, None
+    if deduplicate:
+        if algorithm not in ("kmeans", "sklearn_kmeans"):
+            raise ValueError("deduplicate is only supported with 'kmeans' or 'sklearn_kmeans'.")
+        if coreset_size is not None:
+            raise ValueError("deduplicate and coreset_size cannot be combined.")
+        X_fit, inverse, counts = np.unique(X, axis=0, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+        weights = counts.astype(np.float64)
+    if coreset_size is not None:
+        if algorithm not in ("kmeans", "sklearn_kmeans"):
+            raise ValueError("coreset_size is only supported with 'kmeans' or 'sklearn_kmeans'.")
+        X_fit, weights = build_coreset(
+            X, coreset_size, method=coreset_method, k=k, random_state=random_state
+        )
 
     # Run clustering
+    n_iter: Optional[int] = None
+    summary = None
     if algorithm == "kmeans":
-        labels, centroids = kmeans(X, k=k, random_state=random_state)
+        labels, centroids, n_iter, summary = kmeans(
+            X_fit, k=k, random_state=random_state, init=init, return_n_iter=True,
+            sample_weight=weights, return_summary=True,
+        )
     elif algorithm == "sklearn_kmeans":
-        labels, centroids = sklearn_kmeans(X, k=k, random_state=random_state)
+        labels, centroids = sklearn_kmeans(
+            X_fit, k=k, random_state=random_state, sample_weight=weights
+        )
+    elif algorithm == "minibatch":
+        labels, centroids = minibatch_kmeans(X, k=k, random_state=random_state)
+    elif algorithm == "kdtree":
+        labels, centroids, n_iter = kmeans_kdtree(
+            X, k=k, random_state=random_state, return_n_iter=True
+        )
+    elif algorithm == "bisecting":
+        labels, centroids = bisecting_kmeans(X, k=k, random_state=random_state)
     else:
-        raise ValueError(f"Unknown algorithm '{algorithm}'. Use 'kmeans' or 'sklearn_kmeans'.")
+        raise ValueError(
+            f"Unknown algorithm '{algorithm}'. "
+            "Use 'kmeans', 'sklearn_kmeans', 'minibatch', 'kdtree' or 'bisecting'."
+        )
+
+    # Expand labels back to every original row
+    if deduplicate:
+        labels = labels[inverse]
+
+    # Final labelling pass over the full data
+    if coreset_size is not None:
+        coreset_labels = labels
+        summary = summarise_clusters(X, centroids)
+        labels = summary.labels
+
+    # Distances and per-cluster statistics shared by all metrics. The kmeans
+    # summary of unique rows weighted by multiplicity describes X exactly.
+    if summary is None:
+        summary = summarise_clusters(X, centroids, labels=labels)
 
     # Compute metrics
-    inertia = compute_inertia(X, labels, centroids)
+    inertia = summary.inertia()
     metrics: Dict[str, Any] = {"inertia": inertia}
+
+    if coreset_size is not None:
+        coreset_inertia = compute_inertia(X_fit, coreset_labels, centroids, sample_weight=weights)
+        metrics["coreset"] = {
+            "size": X_fit.shape[0],
+            "method": coreset_method,
+            "inertia": coreset_inertia,
+            "approximation_ratio": coreset_inertia / inertia if inertia > 0 else np.nan,
+        }
+
+    if deduplicate:
+        metrics["unique_rows"] = X_fit.shape[0]
+    if n_iter is not None:
+        metrics["n_iter"] = n_iter
+    if warm_start:
+        metrics["iterations_saved"] = (
+            None if cold_n_iter is None else max(0, cold_n_iter - n_iter)
+        )
+    model = KMeansModel(
+        centroids,
+        mean=mean,
+        scale=scale,
+        pca_mean=None if pca is None else pca.mean_,
+        pca_components=None if pca is None else pca.components_,
+        feature_names=feature_cols,
+        n_iter=n_iter,
+        cold_n_iter=cold_n_iter if warm_start else n_iter,
+        inertia=inertia,
+    )
+    if model_path is not None:
+        model.save(model_path)
     
     if use_pca:
         metrics["pca_variance"] = explained_var
 
     try:
-        sil = silhouette_score_sklearn(X, labels)
+        if _silhouette_mode(X.shape[0], silhouette_mode, 10_000) == "simplified":
+            if not 2 <= summary.n_clusters < X.shape[0]:
+                raise ValueError("Silhouette score requires 2 <= n_clusters <= n_samples - 1.")
+            sil_details = {
+                "silhouette": summary.simplified_silhouette(), "mode": "simplified", "ci": None,
+            }
+        else:
+            present = np.unique(labels)
+            sil_details = compute_silhouette(
+                X, labels, mode=silhouette_mode, centroids=centroids[present],
+                random_state=random_state, return_details=True,
+            )
     except ValueError:
-        sil = None
-    metrics["silhouette"] = sil
+        sil_details = {"silhouette": None, "mode": None, "ci": None}
+    metrics["silhouette"] = sil_details["silhouette"]
+    metrics["silhouette_mode"] = sil_details["mode"]
+    metrics["silhouette_ci"] = sil_details["ci"]
     
     # Optional: compute quality diagnostics
     if compute_quality:
-        metrics["davies_bouldin"] = compute_davies_bouldin(X, labels)
+        metrics["davies_bouldin"] = summary.davies_bouldin()
+        metrics["calinski_harabasz"] = summary.calinski_harabasz()
+        metrics["dunn"] = summary.dunn()
 
     # Add labels to DataFrame
     df = df.copy()
@@ -128,28 +315,34 @@ def run_clustering(
     # Optional elbow curve
     fig_elbow = None
     elbow_inertias: Optional[Dict[int, float]] = None
+    elbow_knee: Optional[int] = None
     if compute_elbow:
         if elbow_k_values is None:
             max_k = max(2, k + 5)
             elbow_k_values = list(range(1, max_k + 1))
         elbow_inertias = elbow_curve(
-            X,
+            X_fit if deduplicate else X,
             k_values=elbow_k_values,
             random_state=random_state,
             use_sklearn=(algorithm == "sklearn_kmeans"),
+            sample_weight=weights if deduplicate else None,
         )
         fig_elbow, _ = plot_elbow(
             elbow_k_values,
             [elbow_inertias[val] for val in elbow_k_values],
         )
+        knee_k = sorted(elbow_inertias)
+        elbow_knee = find_knee(knee_k, [elbow_inertias[val] for val in knee_k])
 
     result: Dict[str, Any] = {
         "data": df,
         "labels": labels,
         "centroids": centroids,
+        "model": model,
         "metrics": metrics,
         "fig_cluster": fig_cluster,
         "fig_elbow": fig_elbow,
-        "elbow_inertias": elbow_inertias
+        "elbow_inertias": elbow_inertias,
+        "elbow_knee": elbow_knee,
     }
     return result
\ No newline at end of file
@@ -0,0 +1,256 @@
+###
+## cluster_maker
+## James Foadi - University of Bath
+## November 2025
+###
+
+from __future__ import annotations
+
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .algorithms import (
+    DEFAULT_MEMORY_BUDGET,
+    nearest_centroids,
+    _check_input,
+    _row_blocks,
+    _row_sq_norms,
+)
+from .ann import IVFIndex
+
+# Version of the .npz layout written by KMeansModel.save
+MODEL_FORMAT_VERSION = 1
+
+_OPTIONAL_ARRAYS = ("mean", "scale", "pca_mean", "pca_components")
+_OPTIONAL_INTS = ("n_iter", "cold_n_iter")
+
+
+class KMeansModel:
+    """
+    A fitted K-means model for fast scoring of new samples.
+
+    The model keeps the centroids together with their precomputed squared
+    norms, the preprocessing that was applied before clustering and some
+    fit metadata, so ``predict`` only has to preprocess the input and run
+    one blocked distance pass.
+
+    Parameters
+    ----------
+    centroids : ndarray of shape (k, n_features)
+        Centroids in the preprocessed feature space.
+    mean, scale : ndarray of shape (n_input_features,) or None
+        Standardisation applied first: ``(X - mean) / scale``.
+    pca_mean : ndarray of shape (n_input_features,) or None
+    pca_components : ndarray of shape (n_features, n_input_features) or None
+        PCA projection applied after standardisation:
+        ``(X - pca_mean) @ pca_components.T``.
+    feature_names : sequence of str or None
+        Names of the input columns, in order.
+    n_iter : int or None
+        Iterations the fit took.
+    cold_n_iter : int or None
+        Iterations of the cold-started fit this model descends from.
+    inertia : float or None
+        Inertia of the fit.
+    """
+
+    __slots__ = (
+        "centroids",
+        "centroid_sq_norms",
+        "mean",
+        "scale",
+        "pca_mean",
+        "pca_components",
+        "feature_names",
+        "n_iter",
+        "cold_n_iter",
+        "inertia",
+        "_index",
+    )
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        mean: Optional[np.ndarray] = None,
+        scale: Optional[np.ndarray] = None,
+        pca_mean: Optional[np.ndarray] = None,
+        pca_components: Optional[np.ndarray] = None,
+        feature_names: Optional[Sequence[str]] = None,
+        n_iter: Optional[int] = None,
+        cold_n_iter: Optional[int] = None,
+        inertia: Optional[float] = None,
+    ) -> None:
+        centroids = np.asarray(centroids)
+        if centroids.ndim != 2:
+            raise ValueError("centroids must be a 2D array of shape (k, n_features).")
+        if (mean is None) != (scale is None):
+            raise ValueError("mean and scale must be given together.")
+        if (pca_mean is None) != (pca_components is None):
+            raise ValueError("pca_mean and pca_components must be given together.")
+
+        self.centroids = centroids
+        self.centroid_sq_norms = _row_sq_norms(centroids)
+        self.mean = None if mean is None else np.asarray(mean)
+        self.scale = None if scale is None else np.asarray(scale)
+        self.pca_mean = None if pca_mean is None else np.asarray(pca_mean)
+        self.pca_components = None if pca_components is None else np.asarray(pca_components)
+        self.feature_names = None if feature_names is None else tuple(feature_names)
+        self.n_iter = n_iter
+        self.cold_n_iter = n_iter if cold_n_iter is None else cold_n_iter
+        self.inertia = inertia
+        self._index: Optional[IVFIndex] = None
+
+    @property
+    def k(self) -> int:
+        """Number of clusters."""
+        return self.centroids.shape[0]
+
+    @property
+    def n_input_features(self) -> int:
+        """Number of columns expected by ``predict``/``transform``."""
+        if self.mean is not None:
+            return self.mean.shape[0]
+        if self.pca_mean is not None:
+            return self.pca_mean.shape[0]
+        return self.centroids.shape[1]
+
+    def preprocess(self, X: np.ndarray) -> np.ndarray:
+        """
+        Apply the stored standardisation and PCA projection to raw samples.
+        """
+        X = _check_input(X)
+        if X.ndim != 2 or X.shape[1] != self.n_input_features:
+            raise ValueError(
+                f"X must be a 2D array with {self.n_input_features} features."
+            )
+        if self.mean is not None or self.pca_mean is not None:
+            if not isinstance(X, np.ndarray):
+                raise TypeError("Sparse input is only supported without preprocessing.")
+            dtype = np.result_type(X.dtype, np.float32)
+            if self.mean is not None:
+                X = (X - self.mean.astype(dtype)) / self.scale.astype(dtype)
+            if self.pca_mean is not None:
+                X = (X - self.pca_mean.astype(dtype)) @ self.pca_components.T.astype(dtype)
+        return X
+
+    def predict(
+        self,
+        X: np.ndarray,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        n_probe: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Label raw samples with their nearest centroid.
+
+        Parameters
+        ----------
+        X : ndarray of shape (n_samples, n_input_features)
+        memory_budget : int, default DEFAULT_MEMORY_BUDGET
+        n_probe : int or None, default None
+            If given, search approximately through an IVFIndex over the
+            centroids (built on first use and kept), probing this many
+            coarse cells. Worth it for thousands of centroids or more.
+
+        Returns
+        -------
+        labels : ndarray of shape (n_samples,)
+        """
+        if n_probe is not None:
+            if self._index is None:
+                self._index = IVFIndex(self.centroids, memory_budget=memory_budget)
+            labels, _ = self._index.search(self.preprocess(X), n_probe, memory_budget)
+            return labels
+        labels, _ = nearest_centroids(
+            self.preprocess(X),
+            self.centroids,
+            memory_budget=memory_budget,
+            c_sq_norms=self.centroid_sq_norms,
+        )
+        return labels
+
+    def transform(
+        self,
+        X: np.ndarray,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> np.ndarray:
+        """
+        Euclidean distance from every raw sample to every centroid.
+
+        Returns
+        -------
+        distances : ndarray of shape (n_samples, k)
+        """
+        X = self.preprocess(X)
+        dtype = np.result_type(X.dtype, self.centroids.dtype, np.float32)
+        out = np.empty((X.shape[0], self.k), dtype=dtype)
+        for rows in _row_blocks(X.shape[0], 2 * self.k * dtype.itemsize, memory_budget):
+            block = X[rows]
+            sq = block @ self.centroids.T
+            sq *= -2.0
+            sq += self.centroid_sq_norms
+            sq += _row_sq_norms(block)[:, np.newaxis]
+            np.maximum(sq, 0.0, out=sq)
+            out[rows] = np.sqrt(sq)
+        return out
+
+    def save(self, path: str) -> None:
+        """
+        Save the model to an uncompressed ``.npz`` file.
+
+        The file is also readable by ``load_centroids``, so a saved model can
+        be passed as ``init`` to warm-start a refit.
+        """
+        arrays = {
+            "format_version": np.int64(MODEL_FORMAT_VERSION),
+            "centroids": self.centroids,
+            "inertia": np.float64(np.nan if self.inertia is None else self.inertia),
+        }
+        for name in _OPTIONAL_INTS:
+            value = getattr(self, name)
+            arrays[name] = np.int64(-1 if value is None else value)
+        for name in _OPTIONAL_ARRAYS:
+            value = getattr(self, name)
+            if value is not None:
+                arrays[name] = value
+        if self.feature_names is not None:
+            arrays["feature_names"] = np.array(self.feature_names, dtype=str)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "KMeansModel":
+        """
+        Load a model written by ``save``.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file does not exist.
+        ValueError
+            If the file was written by a newer, unsupported format version.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No such file: '{path}'")
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["format_version"]) if "format_version" in data else 0
+            if version > MODEL_FORMAT_VERSION:
+                raise ValueError(
+                    f"Model format version {version} is newer than the supported "
+                    f"version {MODEL_FORMAT_VERSION}."
+                )
+            kwargs = {name: data[name] for name in _OPTIONAL_ARRAYS if name in data}
+            for name in _OPTIONAL_INTS:
+                if name in data and int(data[name]) >= 0:
+                    kwargs[name] = int(data[name])
+            if "inertia" in data and not np.isnan(data["inertia"]):
+                kwargs["inertia"] = float(data["inertia"])
+            if "feature_names" in data:
+                kwargs["feature_names"] = [str(name) for name in data["feature_names"]]
+            return cls(data["centroids"], **kwargs)
+
+    def __repr__(self) -> str:
+        return (
+            f"KMeansModel(k={self.k}, n_features={self.centroids.shape[1]}, "
+            f"n_iter={self.n_iter}, inertia={self.inertia})"
+        )
@@ -10,6 +10,7 @@ from typing import List
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 
@@ -58,28 +59,36 @@ def standardise_features(X: np.ndarray) -> np.ndarray:
 
     Parameters
     ----------
-    X : ndarray of shape (n_samples, n_features)
+    X : ndarray or scipy.sparse matrix of shape (n_samples, n_features)
+        float32 input is kept in float32. Sparse input is only scaled to
+        unit variance (centring would destroy sparsity) and stays sparse.
 
     Returns
     -------
-    X_scaled : ndarray of shape (n_samples, n_features)
+    X_scaled : ndarray or scipy.sparse CSR matrix of shape (n_samples, n_features)
     """
+    if sparse.issparse(X):
+        scaler = StandardScaler(with_mean=False)
+        return sparse.csr_matrix(scaler.fit_transform(X))
     if not isinstance(X, np.ndarray):
-        raise TypeError("X must be a NumPy array.")
+        raise TypeError("X must be a NumPy array or a scipy.sparse matrix.")
     scaler = StandardScaler()
     return scaler.fit_transform(X)
 
 
-def apply_pca(X: np.ndarray, n_components: int = 2):
+def apply_pca(X: np.ndarray, n_components: int = 2, return_pca: bool = False):
     """
     Apply PCA dimensionality reduction using scikit-learn.
 
     Parameters
     ----------
     X : ndarray (n_samples, n_features)
-        Numeric data matrix.
+        Numeric data matrix. float32 input is kept in float32.
     n_components : int, default 2
         Number of principal components to retain.
+    return_pca : bool, default False
+        If True, also return the fitted scikit-learn PCA object, e.g. to
+        project new data with the same components.
 
     Returns
     -------
@@ -87,6 +96,8 @@ def apply_pca(X: np.ndarray, n_components: int = 2):
         Transformed data in the reduced PCA space.
     explained_variance_ratio : ndarray
         Variance explained by each selected component.
+    pca : sklearn.decomposition.PCA
+        Only returned if return_pca=True.
 
     Raises
     ------
@@ -115,4 +126,6 @@ def apply_pca(X: np.ndarray, n_components: int = 2):
     pca = PCA(n_components=n_components)
     X_pca = pca.fit_transform(X)
 
+    if return_pca:
+        return X_pca, pca.explained_variance_ratio_, pca
     return X_pca, pca.explained_variance_ratio_
\ No newline at end of file
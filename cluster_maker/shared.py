@@ -0,0 +1,98 @@
+###
+## cluster_maker
+## James Foadi - University of Bath
+## November 2025
+###
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, NamedTuple, Tuple, Union
+
+import numpy as np
+
+
+class SharedArrayHandle(NamedTuple):
+    """Picklable reference to an array placed in shared memory."""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """
+    Owner of a copy of an ndarray in shared memory.
+
+    Process-pool workers receive the small picklable ``handle`` instead of
+    the array, and ``attach`` maps the block read-only once per worker, so X
+    is copied once in total rather than pickled for every task. The owner
+    unlinks the block; use it as a context manager to do so on exit::
+
+        with SharedArray(X) as shared:
+            pool.submit(work, shared.handle, ...)
+    """
+
+    def __init__(self, array: np.ndarray) -> None:
+        array = np.ascontiguousarray(array)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)
+        view[...] = array
+        del view
+        self.handle = SharedArrayHandle(self._shm.name, array.shape, array.dtype.str)
+
+    def close(self) -> None:
+        """Release the block. Workers that still map it keep a valid view."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Per-process cache of attached blocks: name -> (block, read-only view)
+_ATTACHED: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+def attach(handle: SharedArrayHandle) -> np.ndarray:
+    """
+    Read-only view of a shared array, mapped once per process.
+    """
+    if handle.name not in _ATTACHED:
+        shm = shared_memory.SharedMemory(name=handle.name)
+        array = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        _ATTACHED[handle.name] = (shm, array)
+    return _ATTACHED[handle.name][1]
+
+
+def resolve(X: Union[np.ndarray, SharedArrayHandle, object]):
+    """
+    Return X itself, or the attached array if X is a SharedArrayHandle.
+    """
+    if isinstance(X, SharedArrayHandle):
+        return attach(X)
+    return X
+
+
+@contextmanager
+def shared_input(X, backend: str) -> Iterator[Union[np.ndarray, SharedArrayHandle, object]]:
+    """
+    Yield what to send to pool workers in place of X.
+
+    With the process backend a dense in-memory ndarray is placed in shared
+    memory for the duration of the block and its handle is yielded. In every
+    other case (threads, sparse matrices, memory-mapped arrays, which are
+    already backed by a file) X is yielded unchanged.
+    """
+    if backend != "process" or type(X) is not np.ndarray:
+        yield X
+        return
+    with SharedArray(X) as shared:
+        yield shared.handle
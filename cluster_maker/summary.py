@@ -0,0 +1,273 @@
+###
+## cluster_maker
+## James Foadi - University of Bath
+## November 2025
+###
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+
+class ClusterStats:
+    """
+    Mergeable per-cluster sufficient statistics about fixed reference centres.
+
+    Every statistic is a sum (or a maximum) over samples, measured against
+    ``centres`` that do not change while data is added. Statistics of
+    separate chunks or shards, built with the same centres, therefore
+    combine exactly with ``merge``, and the cluster-validity indices in
+    ``cluster_maker.evaluation`` can be computed from data that never sits
+    in memory at once::
+
+        stats = ClusterStats(centroids)
+        for X_chunk, labels_chunk in chunks:
+            stats.update(X_chunk, labels_chunk)
+
+    Parameters
+    ----------
+    centres : ndarray of shape (k, n_features)
+        Reference centre of every cluster, e.g. the K-means centroids.
+
+    Attributes
+    ----------
+    counts : ndarray of shape (k,)
+        Samples (or total weight) per cluster.
+    sums : ndarray of shape (k, n_features)
+        Per-cluster feature sums.
+    sq_sums : ndarray of shape (k,)
+        Per-cluster sums of squared distances to the centre.
+    dist_sums : ndarray of shape (k,)
+        Per-cluster sums of distances to the centre.
+    max_dists : ndarray of shape (k,)
+        Largest distance of a (positively weighted) sample to its centre.
+    """
+
+    __slots__ = ("centres", "counts", "sums", "sq_sums", "dist_sums", "max_dists")
+
+    def __init__(self, centres: np.ndarray) -> None:
+        centres = np.asarray(centres)
+        if centres.ndim != 2:
+            raise ValueError("centres must be a 2D array of shape (k, n_features).")
+        k = centres.shape[0]
+        self.centres = centres
+        self.counts = np.zeros(k)
+        self.sums = np.zeros(centres.shape)
+        self.sq_sums = np.zeros(k)
+        self.dist_sums = np.zeros(k)
+        self.max_dists = np.zeros(k)
+
+    @property
+    def k(self) -> int:
+        """Number of centres."""
+        return self.centres.shape[0]
+
+    @property
+    def n_clusters(self) -> int:
+        """Number of non-empty clusters."""
+        return int(np.count_nonzero(self.counts > 0))
+
+    def update(
+        self,
+        X,
+        labels: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> "ClusterStats":
+        """
+        Add a chunk of samples in place and return self.
+
+        Parameters
+        ----------
+        X : ndarray or scipy.sparse matrix of shape (n_chunk, n_features)
+        labels : ndarray of shape (n_chunk,)
+            Indices into ``centres``.
+        sample_weight : ndarray of shape (n_chunk,) or None
+        """
+        labels = np.asarray(labels, dtype=np.intp)
+        if X.ndim != 2 or X.shape[1] != self.centres.shape[1]:
+            raise ValueError(f"X must be a 2D array with {self.centres.shape[1]} features.")
+        if labels.shape != (X.shape[0],):
+            raise ValueError("labels must have shape (n_samples,).")
+        if labels.size and (labels.min() < 0 or labels.max() >= self.k):
+            raise ValueError("labels must be indices into centres.")
+
+        n_samples = X.shape[0]
+        if sample_weight is None:
+            weight = np.ones(n_samples)
+        else:
+            weight = np.asarray(sample_weight, dtype=np.float64)
+        if weight.shape != (n_samples,):
+            raise ValueError("sample_weight must have shape (n_samples,).")
+
+        own = self.centres[labels]
+        if sparse.issparse(X):
+            x_sq = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+            dot = np.asarray(X.multiply(own).sum(axis=1)).ravel()
+            sq = np.maximum(x_sq - 2.0 * dot + np.einsum("ij,ij->i", own, own), 0.0)
+        else:
+            diff = np.asarray(X, dtype=np.float64) - own
+            sq = np.einsum("ij,ij->i", diff, diff)
+        one_hot = sparse.csr_matrix(
+            (weight, (labels, np.arange(n_samples))), shape=(self.k, n_samples)
+        )
+        sums = one_hot @ X
+        sums = sums.toarray() if sparse.issparse(sums) else np.asarray(sums, dtype=np.float64)
+        counts = np.bincount(labels, weights=weight, minlength=self.k)
+        return self._add(labels, sq, sums, counts, weight)
+
+    def _add(
+        self,
+        labels: np.ndarray,
+        sq_distances: np.ndarray,
+        sums: np.ndarray,
+        counts: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> "ClusterStats":
+        """
+        Accumulate samples whose squared distances to their centres, and
+        whose per-cluster sums and counts, are already known.
+        """
+        k = self.k
+        weight = np.ones(labels.shape[0]) if sample_weight is None else sample_weight
+        dist = np.sqrt(sq_distances.astype(np.float64))
+        self.counts += counts
+        self.sums += sums
+        self.sq_sums += np.bincount(labels, weights=weight * sq_distances, minlength=k)
+        self.dist_sums += np.bincount(labels, weights=weight * dist, minlength=k)
+        positive = weight > 0
+        np.maximum.at(self.max_dists, labels[positive], dist[positive])
+        return self
+
+    def merge(self, other: "ClusterStats") -> "ClusterStats":
+        """
+        Statistics of the union of the samples behind self and other.
+        """
+        if not np.array_equal(self.centres, other.centres):
+            raise ValueError("Only statistics about the same centres can be merged.")
+        merged = ClusterStats(self.centres)
+        merged.counts = self.counts + other.counts
+        merged.sums = self.sums + other.sums
+        merged.sq_sums = self.sq_sums + other.sq_sums
+        merged.dist_sums = self.dist_sums + other.dist_sums
+        merged.max_dists = np.maximum(self.max_dists, other.max_dists)
+        return merged
+
+    def centre_distances(self) -> np.ndarray:
+        """Matrix of Euclidean distances between centres."""
+        c = self.centres.astype(np.float64)
+        sq_norms = np.einsum("ij,ij->i", c, c)
+        sq = sq_norms[:, np.newaxis] - 2.0 * c @ c.T + sq_norms[np.newaxis, :]
+        np.maximum(sq, 0.0, out=sq)
+        np.fill_diagonal(sq, 0.0)
+        return np.sqrt(sq)
+
+
+class ClusterSummary:
+    """
+    Distances and per-cluster statistics of a clustering, computed once.
+
+    A summary is produced by the final assignment pass of ``kmeans`` (with
+    ``return_summary=True``) or by ``summarise_clusters``. Inertia,
+    Davies–Bouldin, Calinski–Harabasz, Dunn and the simplified silhouette
+    are then derived from it without another pass over X: the per-cluster
+    metrics cost O(k^2 + k * n_features), the silhouette O(n_samples).
+
+    All distances are measured to ``centroids``. For a converged K-means
+    these are the cluster means, and the metrics agree with computing them
+    from X and the labels.
+
+    Parameters
+    ----------
+    labels : ndarray of shape (n_samples,)
+    min_sq_distances : ndarray of shape (n_samples,)
+        Squared distance of each sample to its own centroid.
+    second_sq_distances : ndarray of shape (n_samples,)
+        Squared distance of each sample to the nearest other centroid
+        (inf when k == 1).
+    stats : ClusterStats
+        Per-cluster statistics about the centroids.
+    sample_weight : ndarray of shape (n_samples,) or None
+
+    Attributes
+    ----------
+    centroids : ndarray of shape (k, n_features)
+    centroid_distances : ndarray of shape (k, k)
+        Euclidean distances between centroids.
+    """
+
+    __slots__ = (
+        "labels",
+        "min_sq_distances",
+        "second_sq_distances",
+        "stats",
+        "sample_weight",
+        "centroid_distances",
+    )
+
+    def __init__(
+        self,
+        labels: np.ndarray,
+        min_sq_distances: np.ndarray,
+        second_sq_distances: np.ndarray,
+        stats: ClusterStats,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> None:
+        self.labels = labels
+        self.min_sq_distances = min_sq_distances
+        self.second_sq_distances = second_sq_distances
+        self.stats = stats
+        self.sample_weight = sample_weight
+        self.centroid_distances = stats.centre_distances()
+
+    @property
+    def centroids(self) -> np.ndarray:
+        return self.stats.centres
+
+    @property
+    def k(self) -> int:
+        """Number of centroids."""
+        return self.stats.k
+
+    @property
+    def n_clusters(self) -> int:
+        """Number of non-empty clusters."""
+        return self.stats.n_clusters
+
+    def inertia(self) -> float:
+        """Sum of (weighted) squared distances to the own centroid."""
+        return float(self.stats.sq_sums.sum())
+
+    def davies_bouldin(self) -> float:
+        """Davies–Bouldin index, see ``compute_davies_bouldin``."""
+        from .evaluation import compute_davies_bouldin
+        return compute_davies_bouldin(self.stats)
+
+    def calinski_harabasz(self) -> float:
+        """Calinski–Harabasz index, see ``compute_calinski_harabasz``."""
+        from .evaluation import compute_calinski_harabasz
+        return compute_calinski_harabasz(self.stats)
+
+    def dunn(self) -> float:
+        """Dunn index, see ``compute_dunn``."""
+        from .evaluation import compute_dunn
+        return compute_dunn(self.stats)
+
+    def simplified_silhouette(self) -> float:
+        """
+        Mean simplified silhouette: a = distance to the own centroid, b =
+        distance to the nearest other centroid. Samples of singleton clusters
+        score 0. Returns np.nan for fewer than two centroids.
+        """
+        if self.k < 2:
+            return np.nan
+        a = np.sqrt(self.min_sq_distances.astype(np.float64))
+        b = np.sqrt(self.second_sq_distances.astype(np.float64))
+        denom = np.maximum(a, b)
+        s = np.divide(b - a, denom, out=np.zeros_like(a), where=denom > 0)
+        s[self.stats.counts[self.labels] == 1] = 0.0
+        if self.sample_weight is None:
+            return float(s.mean())
+        return float(np.dot(self.sample_weight, s) / self.sample_weight.sum())
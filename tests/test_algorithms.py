@@ -0,0 +1,591 @@
+###
+## cluster_maker – tests for the clustering algorithms
+## University of Bath
+## November 2025
+###
+
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from cluster_maker import (
+    assign_clusters,
+    nearest_centroids,
+    update_centroids,
+    kmeans,
+    compute_inertia,
+    MiniBatchKMeans,
+    minibatch_kmeans,
+    init_centroids,
+    kmeans_out_of_core,
+    kmeans_kdtree,
+    kmeans_batched,
+    bisecting_kmeans,
+)
+
+
+def _brute_force_sq_distances(X, centroids):
+    diff = X[:, np.newaxis, :] - centroids[np.newaxis, :, :]
+    return np.sum(diff ** 2, axis=2)
+
+
+class TestDistanceEngine(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.normal(size=(500, 4))
+        self.centroids = rng.normal(size=(7, 4))
+
+    def test_nearest_centroids_matches_brute_force(self):
+        labels, min_sq = nearest_centroids(self.X, self.centroids)
+        sq = _brute_force_sq_distances(self.X, self.centroids)
+        np.testing.assert_array_equal(labels, np.argmin(sq, axis=1))
+        np.testing.assert_allclose(min_sq, sq.min(axis=1), atol=1e-10)
+
+    def test_small_memory_budget_gives_same_result(self):
+        """Blocking must not change the answer, even with one row per block."""
+        labels_full, min_full = nearest_centroids(self.X, self.centroids)
+        labels_tiny, min_tiny = nearest_centroids(self.X, self.centroids, memory_budget=1)
+        np.testing.assert_array_equal(labels_full, labels_tiny)
+        np.testing.assert_allclose(min_full, min_tiny)
+        np.testing.assert_array_equal(
+            assign_clusters(self.X, self.centroids, memory_budget=200), labels_full
+        )
+
+    def test_integer_input(self):
+        """Integer features give the same clustering as their float copy."""
+        X_int = np.random.RandomState(0).randint(0, 20, size=(300, 3))
+        X_float = X_int.astype(float)
+        np.testing.assert_array_equal(
+            assign_clusters(X_int, X_int[:3]), assign_clusters(X_float, X_float[:3])
+        )
+        for algorithm in ("lloyd", "elkan", "hamerly"):
+            labels, centroids = kmeans(X_int, 3, random_state=0, algorithm=algorithm)
+            labels_f, centroids_f = kmeans(X_float, 3, random_state=0, algorithm=algorithm)
+            self.assertEqual(centroids.dtype, np.float64)
+            np.testing.assert_array_equal(labels, labels_f)
+            np.testing.assert_allclose(centroids, centroids_f)
+        labels, centroids = kmeans_kdtree(X_int, 3, random_state=0)
+        np.testing.assert_allclose(centroids, kmeans_kdtree(X_float, 3, random_state=0)[1])
+
+    def test_invalid_shapes(self):
+        with self.assertRaises(ValueError):
+            nearest_centroids(self.X, self.centroids[:, :3])
+        with self.assertRaises(ValueError):
+            nearest_centroids(self.X, self.centroids, memory_budget=0)
+
+    def test_inertia_matches_min_distances(self):
+        labels, centroids = kmeans(self.X, 5, random_state=1, memory_budget=1024)
+        _, min_sq = nearest_centroids(self.X, centroids)
+        inertia = compute_inertia(self.X, labels, centroids, memory_budget=256)
+        self.assertAlmostEqual(inertia, float(min_sq.sum()), places=8)
+
+
+class TestUpdateCentroids(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        self.X = rng.normal(size=(300, 3))
+        self.labels = rng.randint(0, 6, size=300)
+
+    def test_matches_per_cluster_mean(self):
+        centroids, counts, sums = update_centroids(self.X, self.labels, 6, return_stats=True)
+        for c in range(6):
+            mask = self.labels == c
+            np.testing.assert_allclose(centroids[c], self.X[mask].mean(axis=0))
+            np.testing.assert_allclose(sums[c], self.X[mask].sum(axis=0))
+            self.assertEqual(counts[c], mask.sum())
+
+    def test_empty_cluster_uses_farthest_points(self):
+        """Empty clusters are re-seeded at the worst-served samples."""
+        min_sq = np.zeros(300)
+        min_sq[[10, 20]] = [5.0, 9.0]
+        centroids, counts, _ = update_centroids(
+            self.X, self.labels, 8, min_sq_distances=min_sq, return_stats=True
+        )
+        self.assertEqual(counts[6], 0)
+        self.assertEqual(counts[7], 0)
+        np.testing.assert_array_equal(centroids[6], self.X[20])
+        np.testing.assert_array_equal(centroids[7], self.X[10])
+
+
+class TestBoundedKMeans(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(2)
+        centres = rng.uniform(-10, 10, size=(8, 3))
+        self.X = np.vstack([c + rng.normal(scale=0.8, size=(150, 3)) for c in centres])
+
+    def test_elkan_and_hamerly_match_lloyd(self):
+        labels, centroids = kmeans(self.X, 8, random_state=3, algorithm="lloyd")
+        for algorithm in ("elkan", "hamerly"):
+            other_labels, other_centroids = kmeans(
+                self.X, 8, random_state=3, algorithm=algorithm
+            )
+            np.testing.assert_array_equal(labels, other_labels)
+            np.testing.assert_allclose(centroids, other_centroids)
+
+    def test_single_cluster(self):
+        for algorithm in ("elkan", "hamerly"):
+            labels, centroids = kmeans(self.X, 1, random_state=0, algorithm=algorithm)
+            self.assertTrue(np.all(labels == 0))
+            np.testing.assert_allclose(centroids[0], self.X.mean(axis=0))
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            kmeans(self.X, 3, algorithm="fast")
+
+
+class TestMiniBatchKMeans(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(4)
+        self.centres = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+        self.X = np.vstack([c + rng.normal(scale=0.5, size=(400, 2)) for c in self.centres])
+        rng.shuffle(self.X)
+
+    def test_partial_fit_on_stream(self):
+        model = MiniBatchKMeans(3, random_state=0)
+        for start in range(0, self.X.shape[0], 100):
+            model.partial_fit(self.X[start:start + 100])
+        self.assertEqual(model.n_batches, 12)
+        self.assertEqual(model.counts.sum(), self.X.shape[0])
+        # Every true centre should have a learned centroid close by
+        for centre in self.centres:
+            self.assertLess(np.min(np.linalg.norm(model.centroids - centre, axis=1)), 0.5)
+
+    def test_minibatch_kmeans_converges(self):
+        labels, centroids = minibatch_kmeans(self.X, 3, batch_size=64, random_state=0)
+        self.assertEqual(labels.shape, (self.X.shape[0],))
+        self.assertEqual(centroids.shape, (3, 2))
+        self.assertEqual(len(np.unique(labels)), 3)
+
+    def test_predict_before_fit(self):
+        with self.assertRaises(ValueError):
+            MiniBatchKMeans(3).predict(self.X)
+
+
+class TestInitialisation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(5)
+        self.centres = np.array([[0.0, 0.0], [20.0, 0.0], [0.0, 20.0], [20.0, 20.0]])
+        self.X = np.vstack([c + rng.normal(scale=0.3, size=(100, 2)) for c in self.centres])
+
+    def test_seeding_covers_separated_blobs(self):
+        """Distance-weighted seeding should place one centroid per blob."""
+        for init in ("k-means++", "k-means||"):
+            centroids = init_centroids(self.X, 4, random_state=0, init=init)
+            self.assertEqual(centroids.shape, (4, 2))
+            nearest_blob = np.argmin(
+                np.linalg.norm(centroids[:, np.newaxis] - self.centres, axis=2), axis=1
+            )
+            self.assertEqual(len(np.unique(nearest_blob)), 4)
+
+    def test_kmeans_reports_iterations(self):
+        labels, centroids, n_iter = kmeans(
+            self.X, 4, random_state=0, init="k-means++", return_n_iter=True
+        )
+        self.assertGreaterEqual(n_iter, 1)
+        self.assertLessEqual(n_iter, 300)
+
+    def test_unknown_init(self):
+        with self.assertRaises(ValueError):
+            init_centroids(self.X, 4, init="furthest")
+
+
+class TestRestarts(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(6)
+        self.X = rng.normal(size=(400, 3))
+
+    def test_restarts_are_reproducible_across_backends(self):
+        labels_t, centroids_t = kmeans(self.X, 6, random_state=7, n_init=4, n_jobs=2)
+        labels_t2, centroids_t2 = kmeans(self.X, 6, random_state=7, n_init=4, n_jobs=3)
+        labels_p, centroids_p = kmeans(
+            self.X, 6, random_state=7, n_init=4, n_jobs=2, backend="process"
+        )
+        np.testing.assert_array_equal(labels_t, labels_t2)
+        np.testing.assert_array_equal(labels_t, labels_p)
+        np.testing.assert_allclose(centroids_t, centroids_p)
+
+    def test_restarts_keep_best_inertia(self):
+        from cluster_maker.algorithms import _spawn_seeds
+
+        labels, centroids = kmeans(self.X, 6, random_state=7, n_init=5)
+        best = compute_inertia(self.X, labels, centroids)
+        single = []
+        for seed in _spawn_seeds(7, 5):
+            l1, c1 = kmeans(self.X, 6, random_state=seed)
+            single.append(compute_inertia(self.X, l1, c1))
+        self.assertAlmostEqual(best, min(single))
+
+    def test_invalid_restart_options(self):
+        with self.assertRaises(ValueError):
+            kmeans(self.X, 3, n_init=0)
+        with self.assertRaises(ValueError):
+            kmeans(self.X, 3, n_init=2, backend="gpu")
+
+
+class TestShardedAssignment(unittest.TestCase):
+
+    def test_sharded_lloyd_matches_serial(self):
+        rng = np.random.RandomState(8)
+        X = rng.normal(size=(1000, 5))
+        labels, centroids = kmeans(X, 10, random_state=0)
+        for n_jobs in (2, 3, -1):
+            labels_p, centroids_p = kmeans(X, 10, random_state=0, n_jobs=n_jobs)
+            np.testing.assert_array_equal(labels, labels_p)
+            np.testing.assert_allclose(centroids, centroids_p)
+
+    def test_invalid_n_jobs(self):
+        with self.assertRaises(ValueError):
+            kmeans(np.zeros((10, 2)), 2, n_jobs=0)
+
+
+class TestFloat32(unittest.TestCase):
+    """
+    Document how far the float32 path deviates from float64.
+
+    The float32 run starts from the same rows, so the two runs only differ
+    by rounding: labels should essentially agree and the inertia should
+    match to about float32 precision.
+    """
+
+    def test_float32_matches_float64(self):
+        rng = np.random.RandomState(9)
+        centres = rng.uniform(-5, 5, size=(6, 8))
+        X64 = np.vstack([c + rng.normal(size=(500, 8)) for c in centres])
+        X32 = X64.astype(np.float32)
+
+        labels64, centroids64 = kmeans(X64, 6, random_state=0, init="k-means++")
+        labels32, centroids32 = kmeans(X32, 6, random_state=0, init="k-means++")
+        self.assertEqual(centroids32.dtype, np.float32)
+
+        agreement = np.mean(labels64 == labels32)
+        self.assertGreaterEqual(agreement, 0.999)
+        np.testing.assert_allclose(centroids32, centroids64, rtol=1e-4, atol=1e-4)
+
+        inertia64 = compute_inertia(X64, labels64, centroids64)
+        inertia32 = compute_inertia(X32, labels32, centroids32)
+        self.assertLess(abs(inertia32 - inertia64) / inertia64, 1e-5)
+
+    def test_float32_never_copies_X_to_float64(self):
+        """Only one block at a time may be upcast when accumulating the sums."""
+        import tracemalloc
+
+        X32 = np.random.RandomState(9).normal(size=(100_000, 32)).astype(np.float32)
+        tracemalloc.start()
+        try:
+            kmeans(X32, 8, random_state=0, max_iter=3, memory_budget=1024 ** 2)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # A float64 copy of X alone would be twice the size of X
+        self.assertLess(peak, X32.nbytes)
+
+
+class TestOutOfCore(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(10)
+        centres = rng.uniform(-8, 8, size=(5, 3))
+        self.X = np.vstack([c + rng.normal(size=(300, 3)) for c in centres])
+
+    def test_npy_file_matches_in_memory_kmeans(self):
+        labels, centroids = kmeans(self.X, 5, random_state=0)
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "features.npy")
+            np.save(path, self.X)
+            # A tiny budget forces many blocks per pass
+            labels_ooc, centroids_ooc = kmeans_out_of_core(
+                path, 5, random_state=0, memory_budget=2048
+            )
+        np.testing.assert_array_equal(labels, labels_ooc)
+        np.testing.assert_allclose(centroids, centroids_ooc)
+
+    def test_raw_binary_with_labels_out(self):
+        with TemporaryDirectory() as tmpdir:
+            raw = os.path.join(tmpdir, "features.bin")
+            self.X.astype(np.float32).tofile(raw)
+            labels_path = os.path.join(tmpdir, "labels.npy")
+            labels, centroids = kmeans_out_of_core(
+                raw, 5, random_state=0, dtype=np.float32, n_features=3,
+                labels_out=labels_path, init="k-means||",
+            )
+            self.assertEqual(centroids.dtype, np.float32)
+            np.testing.assert_array_equal(np.load(labels_path), labels)
+            del labels
+
+        with self.assertRaises(ValueError):
+            kmeans_out_of_core("features.bin", 5)
+
+    def test_initialisation_keeps_no_per_sample_arrays(self):
+        """Seeding must stay within one block, like the Lloyd passes."""
+        import tracemalloc
+
+        n_samples = 100_000
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "features.npy")
+            np.save(path, np.random.RandomState(0).normal(size=(n_samples, 8)))
+            labels_path = os.path.join(tmpdir, "labels.npy")
+            for init in ("random", "k-means++", "k-means||"):
+                tracemalloc.start()
+                try:
+                    labels, _ = kmeans_out_of_core(
+                        path, 5, random_state=0, memory_budget=128 * 1024,
+                        init=init, max_iter=2, labels_out=labels_path,
+                    )
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                del labels
+                # Less than a single float64 vector over all samples
+                self.assertLess(peak, n_samples * 8, msg=init)
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(11)
+        centres = rng.uniform(-6, 6, size=(4, 2))
+        self.X = np.vstack([c + rng.normal(size=(200, 2)) for c in centres])
+
+    def test_warm_start_from_converged_centroids(self):
+        labels, centroids, n_iter = kmeans(self.X, 4, random_state=0, return_n_iter=True)
+        # Slightly perturbed data, as in a nightly refit
+        X_new = self.X + np.random.RandomState(1).normal(scale=0.01, size=self.X.shape)
+        warm_labels, warm_centroids, warm_iter = kmeans(
+            X_new, 4, init=centroids, return_n_iter=True
+        )
+        self.assertLessEqual(warm_iter, n_iter)
+        self.assertLessEqual(warm_iter, 3)
+        # Cluster ids are kept
+        self.assertGreater(np.mean(warm_labels == labels), 0.99)
+
+    def test_warm_start_from_saved_centroids(self):
+        from cluster_maker import save_centroids, load_centroids
+
+        _, centroids, n_iter = kmeans(self.X, 4, random_state=0, return_n_iter=True)
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.npz")
+            save_centroids(path, centroids, n_iter=n_iter)
+            loaded, info = load_centroids(path)
+            _, warm_centroids = kmeans(self.X, 4, init=path)
+        np.testing.assert_array_equal(loaded, centroids)
+        self.assertEqual(info, {"n_iter": n_iter, "cold_n_iter": n_iter})
+        np.testing.assert_allclose(warm_centroids, centroids)
+
+    def test_warm_start_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            kmeans(self.X, 4, init=np.zeros((3, 2)))
+
+
+class TestKDTreeKMeans(unittest.TestCase):
+
+    def test_matches_lloyd(self):
+        rng = np.random.RandomState(12)
+        centres = rng.uniform(-10, 10, size=(6, 2))
+        X = np.vstack([c + rng.normal(size=(2000, 2)) for c in centres])
+        labels, centroids = kmeans(X, 6, random_state=0)
+        for leaf_size in (1, 16, 128):
+            tree_labels, tree_centroids = kmeans_kdtree(X, 6, random_state=0, leaf_size=leaf_size)
+            np.testing.assert_array_equal(labels, tree_labels)
+            np.testing.assert_allclose(centroids, tree_centroids)
+
+        # A far-away centroid empties its cluster in the first iteration
+        X = rng.rand(2000, 2)
+        init = np.vstack([X[:3], [[50.0, 50.0]]])
+        labels, centroids = kmeans(X, 4, init=init)
+        tree_labels, tree_centroids = kmeans_kdtree(X, 4, init=init, leaf_size=16)
+        np.testing.assert_array_equal(labels, tree_labels)
+        np.testing.assert_allclose(centroids, tree_centroids)
+
+    def test_duplicate_points(self):
+        """Cells that cannot be split (identical points) become leaves."""
+        X = np.vstack([np.zeros((300, 3)), np.ones((300, 3))])
+        labels, centroids = kmeans_kdtree(X, 2, init="k-means++", random_state=0, leaf_size=4)
+        self.assertEqual(len(np.unique(labels)), 2)
+        np.testing.assert_allclose(np.sort(centroids[:, 0]), [0.0, 1.0])
+
+
+class TestSparseInput(unittest.TestCase):
+
+    def setUp(self):
+        from scipy import sparse
+
+        self.X_sparse = sparse.random(600, 50, density=0.05, format="csr", random_state=13)
+        self.X_dense = self.X_sparse.toarray()
+
+    def test_kmeans_matches_dense(self):
+        for algorithm in ("lloyd", "hamerly"):
+            labels_s, centroids_s = kmeans(
+                self.X_sparse, 6, random_state=0, init="k-means++", algorithm=algorithm
+            )
+            labels_d, centroids_d = kmeans(
+                self.X_dense, 6, random_state=0, init="k-means++", algorithm=algorithm
+            )
+            np.testing.assert_array_equal(labels_s, labels_d)
+            np.testing.assert_allclose(centroids_s, centroids_d, atol=1e-12)
+
+    def test_kmeans_parallel_init_matches_dense(self):
+        """k-means|| seeding passes must keep sparse blocks sparse."""
+        labels_s, centroids_s = kmeans(self.X_sparse, 5, random_state=0, init="k-means||")
+        labels_d, centroids_d = kmeans(self.X_dense, 5, random_state=0, init="k-means||")
+        np.testing.assert_array_equal(labels_s, labels_d)
+        np.testing.assert_allclose(centroids_s, centroids_d, atol=1e-12)
+
+    def test_assignment_and_inertia(self):
+        centroids = self.X_dense[:5]
+        np.testing.assert_array_equal(
+            assign_clusters(self.X_sparse, centroids), assign_clusters(self.X_dense, centroids)
+        )
+        labels = assign_clusters(self.X_dense, centroids)
+        self.assertAlmostEqual(
+            compute_inertia(self.X_sparse, labels, centroids, memory_budget=512),
+            compute_inertia(self.X_dense, labels, centroids),
+        )
+
+    def test_standardise_keeps_sparsity(self):
+        from scipy import sparse
+        from cluster_maker import standardise_features
+
+        scaled = standardise_features(self.X_sparse)
+        self.assertTrue(sparse.issparse(scaled))
+        self.assertEqual(scaled.nnz, self.X_sparse.nnz)
+        np.testing.assert_allclose(scaled.toarray().std(axis=0)[self.X_dense.std(axis=0) > 0], 1.0)
+
+
+class TestConvergenceTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.X = np.random.RandomState(16).normal(size=(2000, 4))
+
+    def test_trace_contents(self):
+        labels, centroids, n_iter, trace = kmeans(
+            self.X, 8, random_state=0, return_n_iter=True, return_trace=True
+        )
+        for key in ("inertia", "shift", "n_changed", "time"):
+            self.assertEqual(trace[key].shape, (n_iter,))
+        self.assertEqual(trace["n_changed"][0], self.X.shape[0])
+        # Lloyd never increases the inertia
+        self.assertTrue(np.all(np.diff(trace["inertia"]) <= 1e-9))
+        self.assertLess(trace["shift"][-1], 1e-4)
+        self.assertTrue(np.all(trace["time"] >= 0))
+
+    def test_bounded_algorithms_follow_the_same_iterations(self):
+        _, _, lloyd = kmeans(self.X, 8, random_state=0, return_trace=True)
+        for algorithm in ("elkan", "hamerly"):
+            _, _, trace = kmeans(
+                self.X, 8, random_state=0, algorithm=algorithm, return_trace=True
+            )
+            np.testing.assert_array_equal(trace["n_changed"], lloyd["n_changed"])
+            # The bounded modes record the exact inertia, not a bound
+            np.testing.assert_allclose(trace["inertia"], lloyd["inertia"], rtol=1e-9)
+
+    def test_label_change_early_stop(self):
+        _, _, n_full, trace = kmeans(
+            self.X, 8, random_state=0, return_n_iter=True, return_trace=True
+        )
+        for algorithm in ("lloyd", "hamerly"):
+            _, _, n_early = kmeans(
+                self.X, 8, random_state=0, algorithm=algorithm,
+                label_change_tol=0.01, return_n_iter=True,
+            )
+            expected = 1 + np.flatnonzero(trace["n_changed"] <= 0.01 * self.X.shape[0])[0]
+            self.assertEqual(n_early, min(expected, n_full))
+        with self.assertRaises(ValueError):
+            kmeans(self.X, 8, label_change_tol=1.5)
+
+
+class TestBatchedKMeans(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(14)
+        self.X = rng.normal(size=(20, 60, 3)) + 4 * rng.randint(0, 3, size=(20, 60, 1))
+        self.init = self.X[:, :4].copy()
+
+    def test_matches_per_problem_kmeans(self):
+        labels, centroids, n_iter = kmeans_batched(
+            self.X, 4, init=self.init, memory_budget=4096, return_n_iter=True
+        )
+        self.assertEqual(labels.shape, (20, 60))
+        for b in range(20):
+            ref_labels, ref_centroids, ref_iter = kmeans(
+                self.X[b], 4, init=self.init[b], return_n_iter=True
+            )
+            np.testing.assert_array_equal(labels[b], ref_labels)
+            np.testing.assert_allclose(centroids[b], ref_centroids)
+            # Convergence is tracked per problem
+            self.assertEqual(n_iter[b], ref_iter)
+
+    def test_ragged_layouts(self):
+        parts = [self.X[b, :20 + 2 * b] for b in range(20)]
+        offsets = np.concatenate([[0], np.cumsum([p.shape[0] for p in parts])])
+        labels_list, centroids = kmeans_batched(parts, 4, init=self.init)
+        labels_flat, centroids_flat = kmeans_batched(
+            np.concatenate(parts), 4, offsets=offsets, init=self.init
+        )
+        np.testing.assert_array_equal(np.concatenate(labels_list), labels_flat)
+        np.testing.assert_allclose(centroids, centroids_flat)
+        for b, part in enumerate(parts):
+            np.testing.assert_array_equal(labels_list[b], kmeans(part, 4, init=self.init[b])[0])
+
+    def test_seeding_and_validation(self):
+        for init in ("random", "k-means++"):
+            labels, centroids = kmeans_batched(self.X, 4, init=init, random_state=0)
+            self.assertEqual(centroids.shape, (20, 4, 3))
+            self.assertTrue(all(len(np.unique(row)) == 4 for row in labels))
+        with self.assertRaises(ValueError):
+            kmeans_batched(self.X[0], 4)
+        with self.assertRaises(ValueError):
+            kmeans_batched(self.X[0], 4, offsets=[0, 30, 20])
+        with self.assertRaises(ValueError):
+            kmeans_batched([self.X[0, :3]], 4)
+
+
+class TestBisectingKMeans(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(15)
+        centres = 12.0 * np.array([[i, j] for i in range(4) for j in range(2)])
+        self.X = np.vstack([c + rng.normal(size=(100, 2)) for c in centres])
+
+    def test_tree_predict_reproduces_labels(self):
+        labels, centroids, tree = bisecting_kmeans(
+            self.X, 8, random_state=0, n_init=3, return_tree=True
+        )
+        self.assertEqual(centroids.shape, (8, 2))
+        self.assertEqual(tree.n_leaves, 8)
+        self.assertEqual(tree.children.shape, (15, 2))
+        np.testing.assert_array_equal(tree.predict(self.X, memory_budget=256), labels)
+        # Leaf statistics describe the fitted clusters
+        leaves = np.flatnonzero(tree.labels >= 0)
+        np.testing.assert_array_equal(
+            tree.counts[leaves], np.bincount(labels, minlength=8)[tree.labels[leaves]]
+        )
+        self.assertAlmostEqual(
+            tree.sse[leaves].sum(), compute_inertia(self.X, labels, centroids)
+        )
+
+    def test_recovers_separated_blobs(self):
+        labels, _ = bisecting_kmeans(self.X, 8, random_state=0, n_init=3)
+        truth = np.repeat(np.arange(8), 100)
+        for blob in range(8):
+            self.assertEqual(len(np.unique(labels[truth == blob])), 1)
+        self.assertEqual(len(np.unique(labels)), 8)
+
+    def test_strategy_and_validation(self):
+        labels, _ = bisecting_kmeans(self.X, 5, bisecting_strategy="largest_cluster", random_state=0)
+        self.assertEqual(len(np.unique(labels)), 5)
+        with self.assertRaises(ValueError):
+            bisecting_kmeans(self.X, 5, bisecting_strategy="smallest")
+        with self.assertRaises(ValueError):
+            bisecting_kmeans(self.X[:3], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
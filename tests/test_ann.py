@@ -0,0 +1,82 @@
+###
+## cluster_maker – tests for approximate nearest-centroid search
+## University of Bath
+## November 2025
+###
+
+import unittest
+
+import numpy as np
+
+from cluster_maker import IVFIndex, kmeans_ivf, kmeans, nearest_centroids, compute_inertia, KMeansModel
+
+
+class TestIVFIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.centroids = rng.normal(size=(400, 6))
+        self.X = self.centroids[rng.randint(0, 400, 3000)] + rng.normal(scale=0.3, size=(3000, 6))
+        self.exact, self.exact_sq = nearest_centroids(self.X, self.centroids)
+
+    def test_index_structure(self):
+        index = IVFIndex(self.centroids, random_state=0)
+        self.assertEqual(index.n_lists, 20)
+        self.assertEqual(index.offsets[-1], 400)
+        np.testing.assert_array_equal(np.sort(index.order), np.arange(400))
+
+    def test_probing_every_cell_is_exact(self):
+        index = IVFIndex(self.centroids, n_lists=10, random_state=0)
+        labels, min_sq = index.search(self.X, n_probe=10, memory_budget=4096)
+        np.testing.assert_array_equal(labels, self.exact)
+        np.testing.assert_allclose(min_sq, self.exact_sq, atol=1e-9)
+        self.assertEqual(index.mismatch_fraction(self.X, labels, n_check=None), 0.0)
+
+    def test_recall_grows_with_n_probe(self):
+        index = IVFIndex(self.centroids, random_state=0)
+        mismatch = []
+        for n_probe in (1, 3, 8):
+            labels, min_sq = index.search(self.X, n_probe=n_probe)
+            # An approximate answer is never closer than the exact one
+            self.assertTrue(np.all(min_sq >= self.exact_sq - 1e-9))
+            mismatch.append(np.mean(labels != self.exact))
+            estimate = index.mismatch_fraction(self.X, labels, n_check=1000, random_state=0)
+            self.assertAlmostEqual(estimate, mismatch[-1], delta=0.05)
+        self.assertEqual(mismatch, sorted(mismatch, reverse=True))
+        self.assertLess(mismatch[-1], 0.05)
+
+    def test_model_approximate_predict(self):
+        model = KMeansModel(self.centroids)
+        labels = model.predict(self.X, n_probe=20)
+        np.testing.assert_array_equal(labels, self.exact)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            IVFIndex(self.centroids, n_lists=0)
+        index = IVFIndex(self.centroids, random_state=0)
+        with self.assertRaises(ValueError):
+            index.search(self.X, n_probe=0)
+        with self.assertRaises(ValueError):
+            index.search(self.X[:, :3])
+
+
+class TestKMeansIVF(unittest.TestCase):
+
+    def test_close_to_exact_kmeans(self):
+        rng = np.random.RandomState(1)
+        centres = rng.uniform(-10, 10, size=(50, 4))
+        X = np.vstack([c + rng.normal(scale=0.5, size=(60, 4)) for c in centres])
+        init = X[rng.choice(X.shape[0], 50, replace=False)]
+        labels, centroids = kmeans(X, 50, init=init)
+        ivf_labels, ivf_centroids, n_iter, mismatch = kmeans_ivf(
+            X, 50, n_probe=3, init=init, random_state=0,
+            return_n_iter=True, return_mismatch=True,
+        )
+        self.assertGreaterEqual(n_iter, 1)
+        self.assertLess(mismatch, 0.05)
+        exact_inertia = compute_inertia(X, labels, centroids)
+        self.assertLess(compute_inertia(X, ivf_labels, ivf_centroids), 1.05 * exact_inertia)
+
+
+if __name__ == "__main__":
+    unittest.main()
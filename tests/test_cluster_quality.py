@@ -11,7 +11,10 @@
 import unittest
 import numpy as np
 
-from cluster_maker import compute_davies_bouldin
+from cluster_maker import compute_davies_bouldin, compute_silhouette
+from cluster_maker import elbow_curve, find_knee, incremental_elbow_curve
+from cluster_maker import ClusterStats, cluster_stats, compute_calinski_harabasz, compute_dunn
+from cluster_maker import kmeans
 from cluster_maker import run_clustering
 
 
@@ -69,5 +72,162 @@ class TestQuality(unittest.TestCase):
         self.assertIn("davies_bouldin", result["metrics"])
 
 
+class TestSilhouette(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        centres = np.array([[0, 0], [4, 0], [0, 4]])
+        sizes = (300, 200, 100)
+        self.X = np.vstack([rng.normal(c, 1.0, size=(n, 2)) for c, n in zip(centres, sizes)])
+        self.labels = np.repeat([3, 7, 9], sizes)
+
+    def test_exact_matches_sklearn(self):
+        from sklearn.metrics import silhouette_score
+
+        expected = silhouette_score(self.X, self.labels)
+        # A tiny budget forces many row blocks
+        score = compute_silhouette(self.X, self.labels, mode="exact", memory_budget=50_000)
+        self.assertAlmostEqual(score, expected, places=10)
+
+    def test_sampled_interval_covers_exact(self):
+        exact = compute_silhouette(self.X, self.labels, mode="exact")
+        details = compute_silhouette(
+            self.X, self.labels, mode="sampled", sample_size=150,
+            random_state=0, return_details=True,
+        )
+        self.assertEqual(details["mode"], "sampled")
+        self.assertEqual(details["n_evaluated"], 150)
+        low, high = details["ci"]
+        self.assertLessEqual(low, exact)
+        self.assertGreaterEqual(high, exact)
+
+    def test_simplified_and_auto(self):
+        simplified = compute_silhouette(self.X, self.labels, mode="simplified")
+        self.assertGreater(simplified, compute_silhouette(self.X, self.labels, mode="exact"))
+        self.assertLessEqual(simplified, 1.0)
+        modes = [
+            compute_silhouette(self.X, self.labels, sample_size=size, return_details=True)["mode"]
+            for size in (1000, 100, 10)
+        ]
+        self.assertEqual(modes, ["exact", "sampled", "simplified"])
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            compute_silhouette(self.X, np.zeros(600))
+        with self.assertRaises(ValueError):
+            compute_silhouette(self.X, self.labels, mode="fast")
+
+
+class TestIncrementalElbow(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        centres = rng.uniform(-20, 20, size=(6, 4))
+        self.X = np.vstack([c + rng.normal(size=(300, 4)) for c in centres])
+
+    def test_find_knee(self):
+        self.assertEqual(find_knee([1, 2, 3, 4, 5, 6], [1000, 400, 100, 90, 85, 82]), 3)
+        self.assertIsNone(find_knee([1, 2], [10, 5]))
+        self.assertIsNone(find_knee([1, 2, 3], [5, 5, 5]))
+        with self.assertRaises(ValueError):
+            find_knee([1, 3, 2], [10, 5, 4])
+
+    def test_stops_after_knee(self):
+        for method in ("split", "k-means++"):
+            details = incremental_elbow_curve(
+                self.X, 30, random_state=0, new_centroid=method, return_details=True
+            )
+            self.assertEqual(details["knee"], 6)
+            self.assertTrue(details["stopped_early"])
+            self.assertLess(max(details["inertias"]), 30)
+
+    def test_matches_independent_sweep(self):
+        details = incremental_elbow_curve(
+            self.X, 10, random_state=0, stop_at_knee=False, return_details=True
+        )
+        self.assertEqual(sorted(details["inertias"]), list(range(1, 11)))
+        scratch = elbow_curve(self.X, [6], random_state=0)
+        self.assertAlmostEqual(details["inertias"][6], scratch[6], delta=1e-6 * scratch[6])
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            incremental_elbow_curve(self.X, 0)
+        with self.assertRaises(ValueError):
+            incremental_elbow_curve(self.X, 5, new_centroid="random")
+
+
+class TestValidityIndices(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        centres = rng.uniform(-5, 5, size=(4, 3))
+        self.X = np.vstack([c + rng.normal(size=(150, 3)) for c in centres])
+        self.labels, self.centroids = kmeans(self.X, 4, random_state=0)
+
+    def test_match_sklearn(self):
+        from scipy import sparse
+        from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score
+
+        labels = self.labels * 3 + 1   # arbitrary label values
+        self.assertAlmostEqual(
+            compute_davies_bouldin(self.X, labels), davies_bouldin_score(self.X, labels), places=10
+        )
+        self.assertAlmostEqual(
+            compute_calinski_harabasz(sparse.csr_matrix(self.X), labels, memory_budget=1000),
+            calinski_harabasz_score(self.X, labels),
+            places=6,
+        )
+
+    def test_merged_shards_match_full_data(self):
+        full = cluster_stats(self.X, self.labels, self.centroids)
+        merged = cluster_stats(self.X[:250], self.labels[:250], self.centroids)
+        merged = merged.merge(cluster_stats(self.X[250:], self.labels[250:], self.centroids))
+        for index in (compute_davies_bouldin, compute_calinski_harabasz, compute_dunn):
+            self.assertAlmostEqual(index(merged), index(full), places=10)
+
+    def test_dunn_is_conservative(self):
+        # Centroid distance 11 but points only 1 apart: the true index is 1/10
+        X = np.array([[0.0, 0.0], [-10.0, 0.0], [1.0, 0.0], [11.0, 0.0]])
+        self.assertAlmostEqual(compute_dunn(X, np.array([0, 0, 1, 1])), 0.1)
+
+        from scipy.spatial.distance import cdist
+
+        rng = np.random.RandomState(1)
+        centres = np.array([[0.0, 0.0], [12.0, 0.0], [0.0, 12.0]])
+        X = np.vstack([c + rng.normal(size=(100, 2)) for c in centres])
+        labels = np.repeat(np.arange(3), 100)
+        pair = cdist(X, X)
+        same = labels[:, np.newaxis] == labels[np.newaxis, :]
+        exact = pair[~same].min() / pair[same].max()
+        dunn = compute_dunn(X, labels)
+        self.assertGreater(dunn, 0.0)
+        self.assertLessEqual(dunn, exact)
+        self.assertGreater(dunn, compute_dunn(X, np.arange(300) % 3))
+
+    def test_details(self):
+        details = compute_dunn(self.X, self.labels, return_details=True)
+        self.assertTrue(details["valid"])
+        self.assertEqual(details["clusters"], 4)
+        self.assertAlmostEqual(
+            details["dunn"], details["separation"].min() / details["scatter"].max()
+        )
+        details = compute_calinski_harabasz(self.X, self.labels, return_details=True)
+        self.assertEqual(details["scatter"].shape, (4,))
+        details = compute_davies_bouldin(self.X, np.zeros(600, dtype=int), return_details=True)
+        self.assertFalse(details["valid"])
+        self.assertTrue(np.isnan(details["dbi"]))
+
+    def test_invalid_input(self):
+        stats = cluster_stats(self.X, self.labels, self.centroids)
+        with self.assertRaises(ValueError):
+            compute_dunn(stats, self.labels)
+        with self.assertRaises(ValueError):
+            stats.merge(ClusterStats(self.centroids + 1.0))
+        with self.assertRaises(ValueError):
+            stats.update(self.X[:5], np.full(5, 4))
+        with self.assertRaises(TypeError):
+            compute_calinski_harabasz([[0.0, 1.0]], np.array([0]))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+###
+## cluster_maker – tests for coreset construction
+## University of Bath
+## November 2025
+###
+
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pandas as pd
+
+from cluster_maker import build_coreset, kmeans, compute_inertia, assign_clusters, run_clustering
+
+
+class TestCoreset(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        centres = rng.uniform(-10, 10, size=(5, 3))
+        self.X = np.vstack([c + rng.normal(size=(2000, 3)) for c in centres])
+
+    def test_coreset_cost_approximates_full_cost(self):
+        """For fixed centroids, the weighted coreset cost tracks the full cost."""
+        centroids = self.X[np.random.RandomState(1).choice(self.X.shape[0], 5)]
+        full = compute_inertia(self.X, assign_clusters(self.X, centroids), centroids)
+        for method in ("lightweight", "sensitivity"):
+            points, weights = build_coreset(
+                self.X, 800, method=method, k=5, random_state=0, memory_budget=4096
+            )
+            self.assertLessEqual(points.shape[0], 800)
+            self.assertAlmostEqual(weights.sum() / self.X.shape[0], 1.0, delta=0.15)
+            approx = compute_inertia(
+                points, assign_clusters(points, centroids), centroids, sample_weight=weights
+            )
+            self.assertAlmostEqual(approx / full, 1.0, delta=0.15)
+
+    def test_weighted_kmeans_equals_repeated_rows(self):
+        """An integer weight w must act like w copies of the row."""
+        X = self.X[:300]
+        weights = np.random.RandomState(2).randint(1, 4, size=300)
+        repeated = np.repeat(X, weights, axis=0)
+        init = X[:4]
+        labels_w, centroids_w = kmeans(X, 4, init=init, sample_weight=weights)
+        _, centroids_r = kmeans(repeated, 4, init=init)
+        np.testing.assert_allclose(centroids_w, centroids_r)
+        self.assertAlmostEqual(
+            compute_inertia(X, labels_w, centroids_w, sample_weight=weights),
+            compute_inertia(repeated, assign_clusters(repeated, centroids_r), centroids_r),
+        )
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            build_coreset(self.X, 0)
+        with self.assertRaises(ValueError):
+            build_coreset(self.X, 100, method="uniform")
+        with self.assertRaises(ValueError):
+            build_coreset(self.X, 100, method="sensitivity")
+        with self.assertRaises(ValueError):
+            kmeans(self.X, 3, sample_weight=-np.ones(self.X.shape[0]))
+
+    def test_run_clustering_with_coreset(self):
+        df = pd.DataFrame(self.X, columns=["a", "b", "c"])
+        with TemporaryDirectory() as tmpdir:
+            temp_csv = os.path.join(tmpdir, "temp.csv")
+            df.to_csv(temp_csv, index=False)
+            result = run_clustering(
+                input_path=temp_csv,
+                feature_cols=["a", "b", "c"],
+                k=5,
+                random_state=0,
+                coreset_size=500,
+            )
+        coreset = result["metrics"]["coreset"]
+        self.assertEqual(result["labels"].shape, (self.X.shape[0],))
+        self.assertLessEqual(coreset["size"], 500)
+        self.assertAlmostEqual(coreset["approximation_ratio"], 1.0, delta=0.2)
+
+
+class TestDeduplicate(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(3)
+        unique = np.vstack([rng.normal(0, 1, (20, 2)), rng.normal(6, 1, (20, 2))])
+        self.X = np.repeat(unique, rng.randint(1, 20, size=40), axis=0)
+        rng.shuffle(self.X)
+
+    def test_weighted_elbow_matches_full_data(self):
+        from cluster_maker import elbow_curve
+
+        unique, counts = np.unique(self.X, axis=0, return_counts=True)
+        full = elbow_curve(self.X, [1, 2], random_state=0, use_sklearn=False)
+        weighted = elbow_curve(
+            unique, [1, 2], random_state=0, use_sklearn=False, sample_weight=counts
+        )
+        self.assertAlmostEqual(full[1], weighted[1])
+        self.assertLessEqual(weighted[2], weighted[1])
+
+    def test_run_clustering_deduplicate(self):
+        df = pd.DataFrame(self.X, columns=["x", "y"])
+        with TemporaryDirectory() as tmpdir:
+            temp_csv = os.path.join(tmpdir, "temp.csv")
+            df.to_csv(temp_csv, index=False)
+            result = run_clustering(
+                input_path=temp_csv, feature_cols=["x", "y"], k=2,
+                standardise=False, random_state=0, deduplicate=True,
+                compute_elbow=True, elbow_k_values=[1, 2, 3],
+            )
+            with self.assertRaises(ValueError):
+                run_clustering(
+                    input_path=temp_csv, feature_cols=["x", "y"], k=2,
+                    deduplicate=True, coreset_size=10,
+                )
+
+        labels = result["labels"]
+        self.assertEqual(labels.shape, (self.X.shape[0],))
+        self.assertEqual(result["metrics"]["unique_rows"], 40)
+        # Identical rows always share a label
+        for row in np.unique(self.X, axis=0):
+            same = np.all(self.X == row, axis=1)
+            self.assertEqual(len(np.unique(labels[same])), 1)
+        inertia = result["metrics"]["inertia"]
+        self.assertAlmostEqual(inertia, result["elbow_inertias"][2], delta=1e-6 * inertia)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,7 @@
 
 import unittest
 import os
+import numpy as np
 import pandas as pd
 from tempfile import TemporaryDirectory
 
@@ -84,6 +85,80 @@ class TestInterfaceAndExport(unittest.TestCase):
             self.assertIn("feature", str(context.exception).lower())
             self.assertIn("missing", str(context.exception).lower())
 
+    def test_run_clustering_native_engines(self):
+        """algorithm="minibatch"/"kdtree" should run the native engines."""
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({
+            "x": np.concatenate([rng.normal(0, 0.3, 50), rng.normal(5, 0.3, 50)]),
+            "y": np.concatenate([rng.normal(0, 0.3, 50), rng.normal(5, 0.3, 50)]),
+        })
+
+        with TemporaryDirectory() as tmpdir:
+            temp_csv = os.path.join(tmpdir, "temp.csv")
+            df.to_csv(temp_csv, index=False)
+
+            for algorithm in ("minibatch", "kdtree"):
+                result = run_clustering(
+                    input_path=temp_csv,
+                    feature_cols=["x", "y"],
+                    algorithm=algorithm,
+                    k=2,
+                    random_state=0,
+                )
+                self.assertEqual(result["centroids"].shape, (2, 2))
+                self.assertEqual(len(np.unique(result["labels"])), 2)
+
+    def test_run_clustering_float32(self):
+        """dtype="float32" should be carried through to the centroids."""
+        rng = np.random.RandomState(1)
+        df = pd.DataFrame({"x": rng.normal(size=60), "y": rng.normal(size=60)})
+
+        with TemporaryDirectory() as tmpdir:
+            temp_csv = os.path.join(tmpdir, "temp.csv")
+            df.to_csv(temp_csv, index=False)
+
+            result = run_clustering(
+                input_path=temp_csv,
+                feature_cols=["x", "y"],
+                k=3,
+                use_pca=True,
+                random_state=0,
+                dtype="float32",
+            )
+            with self.assertRaises(ValueError):
+                run_clustering(input_path=temp_csv, feature_cols=["x", "y"], dtype="int8")
+
+        self.assertEqual(result["centroids"].dtype, np.float32)
+        self.assertIsInstance(result["metrics"]["inertia"], float)
+
+    def test_run_clustering_warm_start_from_saved_model(self):
+        """A refit from a saved model should report the iterations it saved."""
+        rng = np.random.RandomState(2)
+        df = pd.DataFrame({
+            "x": np.concatenate([rng.normal(0, 0.5, 80), rng.normal(4, 0.5, 80)]),
+            "y": np.concatenate([rng.normal(0, 0.5, 80), rng.normal(4, 0.5, 80)]),
+        })
+
+        with TemporaryDirectory() as tmpdir:
+            temp_csv = os.path.join(tmpdir, "temp.csv")
+            model = os.path.join(tmpdir, "model.npz")
+            df.to_csv(temp_csv, index=False)
+
+            cold = run_clustering(
+                input_path=temp_csv, feature_cols=["x", "y"], k=2,
+                random_state=0, model_path=model,
+            )
+            warm = run_clustering(
+                input_path=temp_csv, feature_cols=["x", "y"], k=2, init=model,
+            )
+
+        self.assertNotIn("iterations_saved", cold["metrics"])
+        self.assertEqual(
+            warm["metrics"]["iterations_saved"],
+            cold["metrics"]["n_iter"] - warm["metrics"]["n_iter"],
+        )
+        np.testing.assert_array_equal(warm["labels"], cold["labels"])
+
     # ------------------------------------------------------------------
     # PART (b): Tests for exporting functions
     # ------------------------------------------------------------------
@@ -0,0 +1,93 @@
+###
+## cluster_maker – tests for the fitted KMeansModel
+## University of Bath
+## November 2025
+###
+
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pandas as pd
+
+from cluster_maker import KMeansModel, kmeans, assign_clusters, load_centroids, run_clustering
+
+
+class TestKMeansModel(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        centres = rng.uniform(-5, 5, size=(4, 3))
+        self.X = np.vstack([c + rng.normal(size=(200, 3)) for c in centres])
+        self.labels, self.centroids, self.n_iter = kmeans(
+            self.X, 4, random_state=0, return_n_iter=True
+        )
+
+    def test_predict_and_transform(self):
+        model = KMeansModel(self.centroids, n_iter=self.n_iter)
+        np.testing.assert_array_equal(model.predict(self.X), self.labels)
+        np.testing.assert_array_equal(
+            model.predict(self.X, memory_budget=64), assign_clusters(self.X, self.centroids)
+        )
+        distances = model.transform(self.X, memory_budget=256)
+        expected = np.linalg.norm(self.X[:, np.newaxis] - self.centroids, axis=2)
+        np.testing.assert_allclose(distances, expected, atol=1e-6)
+
+    def test_save_load_round_trip(self):
+        model = KMeansModel(
+            self.centroids,
+            mean=np.ones(3),
+            scale=np.full(3, 2.0),
+            feature_names=["a", "b", "c"],
+            n_iter=self.n_iter,
+            inertia=12.5,
+        )
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.npz")
+            model.save(path)
+            loaded = KMeansModel.load(path)
+            # The file stays readable as plain saved centroids
+            centroids, info = load_centroids(path)
+
+        np.testing.assert_array_equal(loaded.centroids, self.centroids)
+        np.testing.assert_array_equal(loaded.scale, model.scale)
+        self.assertIsNone(loaded.pca_components)
+        self.assertEqual(loaded.feature_names, ("a", "b", "c"))
+        self.assertEqual(loaded.n_iter, self.n_iter)
+        self.assertEqual(loaded.inertia, 12.5)
+        np.testing.assert_array_equal(loaded.predict(self.X), model.predict(self.X))
+        np.testing.assert_array_equal(centroids, self.centroids)
+        self.assertEqual(info["n_iter"], self.n_iter)
+
+    def test_invalid_inputs(self):
+        model = KMeansModel(self.centroids)
+        with self.assertRaises(ValueError):
+            model.predict(self.X[:, :2])
+        with self.assertRaises(ValueError):
+            KMeansModel(self.centroids, mean=np.zeros(3))
+        with self.assertRaises(AttributeError):
+            model.labels = self.labels
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "future.npz")
+            np.savez(path, format_version=99, centroids=self.centroids)
+            with self.assertRaises(ValueError):
+                KMeansModel.load(path)
+
+    def test_run_clustering_model_predicts_raw_features(self):
+        """The returned model applies the run's standardisation and PCA itself."""
+        df = pd.DataFrame(self.X, columns=["x", "y", "z"])
+        with TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "data.csv")
+            df.to_csv(csv_path, index=False)
+            result = run_clustering(
+                input_path=csv_path, feature_cols=["x", "y", "z"], k=4,
+                use_pca=True, random_state=0,
+            )
+        model = result["model"]
+        self.assertEqual(model.feature_names, ("x", "y", "z"))
+        np.testing.assert_array_equal(model.predict(df.to_numpy()), result["labels"])
+
+
+if __name__ == "__main__":
+    unittest.main()
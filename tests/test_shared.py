@@ -0,0 +1,81 @@
+###
+## cluster_maker – tests for the shared-memory handoff to worker processes
+## University of Bath
+## November 2025
+###
+
+import pickle
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from cluster_maker import elbow_curve, kmeans
+from cluster_maker.shared import SharedArray, attach, resolve, shared_input
+
+
+class TestSharedArray(unittest.TestCase):
+
+    def setUp(self):
+        self.X = np.random.RandomState(0).normal(size=(300, 4)).astype(np.float32)
+
+    def test_round_trip_and_cleanup(self):
+        with SharedArray(self.X) as shared:
+            handle = pickle.loads(pickle.dumps(shared.handle))
+            view = attach(handle)
+            np.testing.assert_array_equal(view, self.X)
+            self.assertEqual(view.dtype, np.float32)
+            self.assertFalse(view.flags.writeable)
+            self.assertIs(resolve(handle), view)
+        # The owner unlinked the block on exit
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handle.name)
+
+    def test_shared_input_only_for_dense_process_work(self):
+        with shared_input(self.X, "thread") as X_task:
+            self.assertIs(X_task, self.X)
+        with shared_input(self.X, "process") as X_task:
+            self.assertNotIsInstance(X_task, np.ndarray)
+            np.testing.assert_array_equal(resolve(X_task), self.X)
+
+
+class TestProcessPoolHandoff(unittest.TestCase):
+
+    def setUp(self):
+        self.X = np.random.RandomState(1).normal(size=(400, 3))
+
+    def test_elbow_curve_process_pool_matches_serial(self):
+        serial = elbow_curve(self.X, [1, 2, 3, 4], random_state=0, use_sklearn=False)
+        for backend in ("thread", "process"):
+            parallel = elbow_curve(
+                self.X, [1, 2, 3, 4], random_state=0, use_sklearn=False,
+                n_jobs=2, backend=backend,
+            )
+            self.assertEqual(parallel, serial)
+
+    def test_elbow_restarts_callback_and_seeds(self):
+        reported = []
+        serial = elbow_curve(self.X, [2, 3, 4], random_state=0, n_init=3)
+        parallel = elbow_curve(
+            self.X, [2, 3, 4], random_state=0, n_init=3, n_jobs=3, backend="process",
+            callback=lambda k, inertia: reported.append((k, inertia)),
+        )
+        self.assertEqual(parallel, serial)
+        self.assertEqual(list(parallel), [2, 3, 4])
+        self.assertEqual(sorted(reported), sorted(serial.items()))
+        # A k gets the same seeds whatever else is in the sweep
+        self.assertEqual(elbow_curve(self.X, [3], random_state=0, n_init=3)[3], serial[3])
+        with self.assertRaises(ValueError):
+            elbow_curve(self.X, [2], n_init=0)
+
+    def test_kmeans_restarts_in_processes(self):
+        labels_t, centroids_t = kmeans(self.X, 4, random_state=2, n_init=3, n_jobs=2)
+        labels_p, centroids_p = kmeans(
+            self.X, 4, random_state=2, n_init=3, n_jobs=2, backend="process"
+        )
+        np.testing.assert_array_equal(labels_t, labels_p)
+        np.testing.assert_allclose(centroids_t, centroids_p)
+
+
+if __name__ == "__main__":
+    unittest.main()
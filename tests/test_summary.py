@@ -0,0 +1,124 @@
+###
+## cluster_maker – tests for the shared ClusterSummary
+## University of Bath
+## November 2025
+###
+
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score
+
+from cluster_maker import (
+    ClusterSummary,
+    compute_dunn,
+    compute_inertia,
+    compute_silhouette,
+    kmeans,
+    run_clustering,
+    summarise_clusters,
+)
+
+
+class TestClusterSummary(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        centres = rng.uniform(-5, 5, size=(5, 3))
+        self.X = np.vstack([c + rng.normal(size=(200, 3)) for c in centres])
+        self.labels, self.centroids, self.summary = kmeans(
+            self.X, 5, random_state=0, tol=1e-10, return_summary=True
+        )
+
+    def test_metrics_match_direct_computation(self):
+        summary = self.summary
+        self.assertIsInstance(summary, ClusterSummary)
+        np.testing.assert_array_equal(summary.labels, self.labels)
+        self.assertAlmostEqual(
+            summary.inertia(), compute_inertia(self.X, self.labels, self.centroids), places=6
+        )
+        self.assertAlmostEqual(
+            summary.davies_bouldin(), davies_bouldin_score(self.X, self.labels), places=8
+        )
+        self.assertAlmostEqual(
+            summary.calinski_harabasz(), calinski_harabasz_score(self.X, self.labels), places=6
+        )
+        self.assertAlmostEqual(summary.dunn(), compute_dunn(self.X, self.labels), places=6)
+        self.assertAlmostEqual(
+            summary.simplified_silhouette(),
+            compute_silhouette(self.X, self.labels, mode="simplified", centroids=self.centroids),
+            places=10,
+        )
+
+    def test_summary_only_for_kept_restart(self):
+        """Restarts are ranked by their trace; the kept one alone is summarised."""
+        labels, centroids, trace, summary = kmeans(
+            self.X, 5, random_state=0, n_init=4, return_trace=True, return_summary=True
+        )
+        plain_labels, plain_centroids = kmeans(self.X, 5, random_state=0, n_init=4)
+        np.testing.assert_array_equal(plain_labels, labels)
+        np.testing.assert_array_equal(plain_centroids, centroids)
+        np.testing.assert_array_equal(summary.labels, labels)
+        np.testing.assert_allclose(summary.centroids, centroids)
+        # The final pass can only improve on the last traced assignment
+        self.assertLessEqual(summary.inertia(), trace["inertia"][-1] + 1e-9)
+
+    def test_given_labels_and_weights(self):
+        # Labels that are not nearest-centroid assignments are kept as given
+        labels = self.labels.copy()
+        labels[:10] = (labels[:10] + 1) % 5
+        summary = summarise_clusters(self.X, self.centroids, labels=labels, memory_budget=500)
+        np.testing.assert_array_equal(summary.labels, labels)
+        self.assertAlmostEqual(
+            summary.inertia(), compute_inertia(self.X, labels, self.centroids), places=6
+        )
+
+        # Integer weights behave like repeated rows
+        weights = np.random.RandomState(1).randint(1, 4, size=self.X.shape[0])
+        weighted = summarise_clusters(self.X, self.centroids, sample_weight=weights)
+        repeated = summarise_clusters(np.repeat(self.X, weights, axis=0), self.centroids)
+        for metric in ("inertia", "davies_bouldin", "calinski_harabasz", "simplified_silhouette"):
+            self.assertAlmostEqual(
+                getattr(weighted, metric)(), getattr(repeated, metric)(), places=6
+            )
+
+    def test_degenerate_and_invalid(self):
+        single = summarise_clusters(self.X, self.centroids[:1])
+        self.assertTrue(np.isnan(single.davies_bouldin()))
+        self.assertTrue(np.isnan(single.calinski_harabasz()))
+        self.assertTrue(np.isnan(single.simplified_silhouette()))
+        with self.assertRaises(ValueError):
+            summarise_clusters(self.X, self.centroids[:, :2])
+        with self.assertRaises(ValueError):
+            summarise_clusters(self.X, self.centroids, labels=np.full(self.X.shape[0], 5))
+
+    def test_run_clustering_metrics(self):
+        df = pd.DataFrame(self.X, columns=["x", "y", "z"])
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.csv")
+            df.to_csv(path, index=False)
+            for algorithm in ("kmeans", "bisecting"):
+                result = run_clustering(
+                    input_path=path, feature_cols=["x", "y", "z"], k=5, algorithm=algorithm,
+                    standardise=False, random_state=0, compute_quality=True,
+                    silhouette_mode="simplified",
+                )
+                metrics, labels = result["metrics"], result["labels"]
+                self.assertAlmostEqual(
+                    metrics["inertia"],
+                    compute_inertia(self.X, labels, result["centroids"]),
+                    places=6,
+                )
+                self.assertAlmostEqual(
+                    metrics["calinski_harabasz"],
+                    calinski_harabasz_score(self.X, labels),
+                    places=6,
+                )
+                self.assertEqual(metrics["silhouette_mode"], "simplified")
+
+
+if __name__ == "__main__":
+    unittest.main()